@@ -0,0 +1,220 @@
+"""
+Offline ingestion benchmark: ComprehensiveMarketFetcher.update_all_products
+against replayed HTTP fixtures.
+
+Every request the fetchers make is answered by data_sources.http_replay,
+with the injected latency and error rate of each scenario. This measures
+throughput and failure handling without network access or API keys. Use
+fixtures recorded with HTTP_FIXTURES=record, or --synthetic to generate
+Agmarknet and OpenWeather fixtures for the tracked products. USDA requests
+have no synthetic fixtures, so those products exercise the fallback path.
+
+Usage (from the "AIML Project - ML Model" directory):
+    python benchmarks/bench_ingestion.py --synthetic
+    python benchmarks/bench_ingestion.py --synthetic --latency-ms 0 50 200 --error-rate 0 0.05 0.2
+    python benchmarks/bench_ingestion.py --fixtures-dir data/http_fixtures --mongo-uri mongodb://localhost:27017/
+
+⚠️ update_all_products replaces market_analyzer.sales: without --mongo-uri an
+in-memory mongomock database is used; only point --mongo-uri at a throwaway mongod.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+if str(PROJECT_DIR) not in sys.path:
+    sys.path.insert(0, str(PROJECT_DIR))
+
+AGMARKNET_URL = "https://api.data.gov.in/resource/9ef84268-d588-465a-a308-a864a43d0070"
+WEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
+PLACEHOLDER_KEY = "replay"
+
+
+def configure_environment(fixtures_dir):
+    """Must run before any data_sources module is imported: they read these at import time."""
+    os.environ["HTTP_FIXTURES"] = "replay"
+    os.environ["HTTP_FIXTURES_DIR"] = str(fixtures_dir)
+    os.environ["HTTP_CACHE_MODE"] = "off"
+    for name in ("AGMARKNET_API_KEY", "OPENWEATHER_API_KEY", "USDA_API_KEY"):
+        os.environ[name] = PLACEHOLDER_KEY
+
+
+def _url(base, params):
+    import requests
+
+    prepared = requests.models.PreparedRequest()
+    prepared.prepare(method="GET", url=base, params=params)
+    return prepared.url
+
+
+def synthesize_fixtures(fixtures_dir, products, days, coverage, seed):
+    """
+    Agmarknet bulk pages for the last `days` arrival dates, covering a
+    `coverage` share of products, plus one OpenWeather reading per city.
+    Returns the number of fixtures written.
+    """
+    from data_sources.agmarknet_bulk import AGMARKNET_CONCURRENCY, AGMARKNET_PAGE_SIZE
+    from data_sources.http_replay import save_fixture
+    from data_sources.weather_fetcher import WeatherFetcher
+
+    rng = random.Random(seed)
+    covered = [product for product in products if rng.random() < coverage]
+    headers = {"Content-Type": "application/json"}
+    written = 0
+    end = datetime.now()
+    for day in range(days):
+        arrival_date = (end - timedelta(days=day)).strftime("%d/%m/%Y")
+        records = [
+            {
+                "state": "Maharashtra",
+                "market": f"Market {market}",
+                "commodity": product,
+                "arrival_date": arrival_date,
+                "modal_price": str(rng.randint(800, 6000)),
+                "arrivals": str(rng.randint(5, 500)),
+            }
+            for product in covered
+            for market in range(3)
+        ]
+        # Cover the whole last wave of concurrent pages, including the empty ones past the end.
+        pages = len(records) // AGMARKNET_PAGE_SIZE + 1
+        pages = -(-pages // AGMARKNET_CONCURRENCY) * AGMARKNET_CONCURRENCY
+        for page in range(pages):
+            offset = page * AGMARKNET_PAGE_SIZE
+            params = {
+                "api-key": PLACEHOLDER_KEY,
+                "format": "json",
+                "limit": AGMARKNET_PAGE_SIZE,
+                "offset": offset,
+                "filters[arrival_date]": arrival_date,
+            }
+            body = {"total": len(records), "records": records[offset:offset + AGMARKNET_PAGE_SIZE]}
+            save_fixture(fixtures_dir, "GET", _url(AGMARKNET_URL, params), 200, headers, json.dumps(body).encode())
+            written += 1
+
+    for city in WeatherFetcher().indian_cities:
+        params = {"q": f"{city},IN", "appid": PLACEHOLDER_KEY, "units": "metric"}
+        body = {
+            "main": {"temp": round(rng.uniform(18, 38), 1), "humidity": rng.randint(40, 95)},
+            "rain": {"1h": round(rng.uniform(0, 5), 1)},
+        }
+        save_fixture(fixtures_dir, "GET", _url(WEATHER_URL, params), 200, headers, json.dumps(body).encode())
+        written += 1
+    return written
+
+
+def run_scenario(latency_ms, error_rate, days, product_limit, seed):
+    from pymongo import MongoClient
+
+    from data_sources import weather_cache
+    from data_sources.comprehensive_market_fetcher import ComprehensiveMarketFetcher
+    from data_sources.http_replay import get_replay_adapter
+
+    adapter = get_replay_adapter()
+    adapter.latency_ms = latency_ms
+    adapter.error_rate = error_rate
+    adapter._random.seed(seed)
+    adapter.reset_stats()
+
+    # Start every scenario with a cold weather cache, so it fetches through the transport too.
+    database = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))["market_analyzer"]
+    database[weather_cache.WEATHER_COLLECTION].drop()
+    weather_cache._caches.clear()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        fetcher = ComprehensiveMarketFetcher()
+        if product_limit:
+            fetcher.products_180 = fetcher.products_180[:product_limit]
+        started = time.perf_counter()
+        saved = fetcher.update_all_products(days=days)
+        seconds = time.perf_counter() - started
+
+    sources = {
+        item["_id"]: item["count"]
+        for item in fetcher.collection.aggregate([{"$group": {"_id": "$source", "count": {"$sum": 1}}}])
+    }
+    return {
+        "latency_ms": latency_ms,
+        "error_rate": error_rate,
+        "products": len(fetcher.products_180),
+        "seconds": round(seconds, 3),
+        "products_per_second": round(len(fetcher.products_180) / seconds, 1) if seconds else None,
+        "records_saved": saved,
+        "transport": dict(adapter.stats),
+        "sources": sources,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark update_all_products against replayed HTTP fixtures")
+    parser.add_argument("--fixtures-dir", help="Recorded fixtures (default: a temporary directory with --synthetic)")
+    parser.add_argument("--synthetic", action="store_true", help="Generate Agmarknet and OpenWeather fixtures first")
+    parser.add_argument("--coverage", type=float, default=0.8, help="Share of products with synthetic Agmarknet records")
+    parser.add_argument("--latency-ms", type=float, nargs="+", default=[0, 50])
+    parser.add_argument("--error-rate", type=float, nargs="+", default=[0, 0.1])
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--products", type=int, default=0, help="Only the first N tracked products (0 = all)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mongo-uri", help="Throwaway mongod; mongomock when omitted")
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    if not args.fixtures_dir and not args.synthetic:
+        parser.error("pass --fixtures-dir with recorded fixtures, or --synthetic")
+    fixtures_dir = Path(args.fixtures_dir or tempfile.mkdtemp(prefix="http_fixtures_"))
+    configure_environment(fixtures_dir)
+    if args.mongo_uri:
+        os.environ["MONGO_URI"] = args.mongo_uri
+    else:
+        from benchmarks.run_benchmarks import use_mongomock
+        use_mongomock()
+
+    from data_sources.product_catalog import TRACKED_PRODUCTS
+
+    print("\n" + "=" * 70)
+    print("🎞️  INGESTION BENCHMARK (replayed HTTP)")
+    print("=" * 70)
+    if args.synthetic:
+        products = list(TRACKED_PRODUCTS)[:args.products or None]
+        written = synthesize_fixtures(fixtures_dir, products, args.days, args.coverage, args.seed)
+        print(f"🧪 Wrote {written:,} synthetic fixtures to {fixtures_dir}")
+
+    results = []
+    for latency_ms in args.latency_ms:
+        for error_rate in args.error_rate:
+            result = run_scenario(latency_ms, error_rate, args.days, args.products, args.seed)
+            results.append(result)
+            transport = result["transport"]
+            print(f"   ⏱️  latency {latency_ms:6.0f} ms, errors {error_rate:4.0%}: "
+                  f"{result['seconds']:7.2f}s, {result['products_per_second']:7.1f} products/s, "
+                  f"{result['records_saved']:,} records | {transport['requests']} requests, "
+                  f"{transport['timeouts']} timeouts, {transport['server_errors']} 503s, "
+                  f"{transport['missing']} without fixture")
+
+    if args.output:
+        report = {
+            "meta": {
+                "timestamp": datetime.now().isoformat(),
+                "fixtures_dir": str(fixtures_dir),
+                "synthetic": args.synthetic,
+                "days": args.days,
+                "seed": args.seed,
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
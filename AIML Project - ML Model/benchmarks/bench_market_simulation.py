@@ -0,0 +1,89 @@
+"""
+Micro-benchmark for the deterministic market simulation in data_sources/price_catalog.py.
+
+Compares the original per-cell random.Random(f"{product}:{date}:{day}") draws
+with one vectorized MarketSimulation pass for a products x days populate, and
+checks that the simulation is reproducible and independent of the grid it
+was computed in.
+
+Usage (from the "AIML Project - ML Model" directory):
+    python benchmarks/bench_market_simulation.py
+    python benchmarks/bench_market_simulation.py --products 2000 --days 365
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+if str(PROJECT_DIR) not in sys.path:
+    sys.path.insert(0, str(PROJECT_DIR))
+
+import numpy as np  # noqa: E402
+
+from data_sources.price_catalog import infer_price_range, simulate_market  # noqa: E402
+from data_sources.synthetic_market import catalog_products  # noqa: E402
+
+DATE_SEED = "2024-01-01"
+
+
+def per_cell_populate(products, days):
+    """The original string-seeded draws: three random.Random instances per row."""
+    rows = []
+    for product in products:
+        min_price, max_price = infer_price_range(product)
+        midpoint = (min_price + max_price) / 2
+        for day in range(days):
+            rng = random.Random(f"{product}:{DATE_SEED}:{day}")
+            price = max(min_price, min(max_price, midpoint * rng.uniform(0.95, 1.05)))
+            quantity = random.Random(f"{product}:quantity:{DATE_SEED}:{day}").uniform(90, 360)
+            weather = random.Random(f"{product}:weather")
+            rows.append((round(price, 2), round(quantity, 1), weather.uniform(20, 32), weather.uniform(0, 18)))
+    return rows
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized market simulation")
+    parser.add_argument("--products", type=int, default=180)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    products = catalog_products(args.products)
+    cells = len(products) * args.days
+
+    simulation = simulate_market(products, range(args.days), DATE_SEED)
+    again = simulate_market(products, range(args.days), DATE_SEED)
+    subset = simulate_market(products[::7], range(3, args.days), DATE_SEED)
+    reproducible = np.array_equal(simulation.price, again.price) and np.array_equal(simulation.quantity, again.quantity)
+    independent = np.array_equal(simulation.price[::7, 3:], subset.price) and np.array_equal(
+        simulation.temperature[::7], subset.temperature
+    )
+
+    print("\n" + "=" * 70)
+    print("🏁 MARKET SIMULATION BENCHMARK")
+    print("=" * 70)
+    print(f"📊 {len(products)} products × {args.days} days = {cells:,} cells")
+    print(f"{'✅' if reproducible else '❌'} Reproducible across runs")
+    print(f"{'✅' if independent else '❌'} Cells independent of the simulated grid")
+
+    legacy = best_of(lambda: per_cell_populate(products, args.days), args.repeat)
+    vectorized = best_of(lambda: simulate_market(products, range(args.days), DATE_SEED), args.repeat)
+    print(f"   {'per-cell random.Random':30s} {legacy * 1000:10.1f} ms  {legacy / cells * 1e6:8.2f} µs/cell")
+    print(f"   {'MarketSimulation (Philox)':30s} {vectorized * 1000:10.1f} ms  {vectorized / cells * 1e6:8.2f} µs/cell")
+    print(f"⚡ Speedup: x{legacy / vectorized:.0f}")
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Micro-benchmark for the product classifier in data_sources/price_catalog.py.
+
+Classifies a stream of product names (catalog names plus unseen market
+names, the mix sanitize_market_record sees) with the original linear
+keyword scans, the compiled classifier without its cache, and the cached
+infer_category / infer_price_range, and reports the per-record cost along
+with the single-record, list and columnar sanitizers in mongodb_utils.
+
+Usage (from the "AIML Project - ML Model" directory):
+    python benchmarks/bench_product_classifier.py
+    python benchmarks/bench_product_classifier.py --records 1000000 --unseen 5000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+if str(PROJECT_DIR) not in sys.path:
+    sys.path.insert(0, str(PROJECT_DIR))
+
+import pandas as pd  # noqa: E402
+
+from data_sources import price_catalog  # noqa: E402
+from data_sources.mongodb_utils import (  # noqa: E402
+    sanitize_market_batch,
+    sanitize_market_record,
+    sanitize_market_records,
+)
+
+
+def linear_category(product_name):
+    if product_name in price_catalog.PRODUCT_CATEGORIES:
+        return price_catalog.PRODUCT_CATEGORIES[product_name]
+    lower_name = product_name.lower()
+    for keywords, category in price_catalog.CATEGORY_RULES:
+        if any(keyword in lower_name for keyword in keywords):
+            return category
+    return "vegetable"
+
+
+def linear_price_range(product_name):
+    if product_name in price_catalog.PRODUCT_PRICE_RANGES:
+        return price_catalog.PRODUCT_PRICE_RANGES[product_name]
+    lower_name = product_name.lower()
+    for keywords, price_range in price_catalog.PRICE_RANGE_RULES:
+        if any(keyword in lower_name for keyword in keywords):
+            return price_range
+    return (40, 120) if linear_category(product_name) == "vegetable" else (70, 180)
+
+
+def build_names(records, unseen, seed):
+    """Catalog names plus `unseen` market-style variants, sampled `records` times."""
+    rng = random.Random(seed)
+    catalog = list(price_catalog.PRODUCT_PRICE_RANGES)
+    qualifiers = ["Local", "Desi", "Hybrid", "Organic", "Premium", "Ooty", "Nasik", "(Loose)", "Grade A"]
+    variants = [f"{rng.choice(qualifiers)} {rng.choice(catalog)} {index}" for index in range(unseen)]
+    pool = catalog + variants
+    return [rng.choice(pool) for _ in range(records)]
+
+
+def report(label, elapsed, count):
+    print(f"   {label:34s} {elapsed:8.2f}s  {elapsed / count * 1e6:8.2f} µs/record")
+
+
+def measure(label, items, func):
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    elapsed = time.perf_counter() - start
+    report(label, elapsed, len(items))
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the product category / price range classifier")
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--unseen", type=int, default=2000, help="Distinct non-catalog names in the stream")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-sanitize", action="store_true", help="Skip the sanitizer passes")
+    args = parser.parse_args()
+
+    names = build_names(args.records, args.unseen, args.seed)
+    distinct = set(names)
+    mismatches = sum(
+        price_catalog.infer_category(name) != linear_category(name)
+        or price_catalog.infer_price_range(name) != linear_price_range(name)
+        for name in distinct
+    )
+
+    print("\n" + "=" * 70)
+    print("🏁 PRODUCT CLASSIFIER BENCHMARK")
+    print("=" * 70)
+    print(f"📊 Records: {len(names):,} ({len(distinct):,} distinct names)")
+    print(f"{'✅' if not mismatches else '❌'} Compiled classifier matches linear scans on {len(distinct) - mismatches}/{len(distinct)} names")
+
+    category_classify = price_catalog._CATEGORY_CLASSIFIER.classify
+    uncached = price_catalog.infer_price_range.__wrapped__
+
+    def compiled(name):
+        category_classify(name)
+        uncached(name)
+
+    def cached(name):
+        price_catalog.infer_category(name)
+        price_catalog.infer_price_range(name)
+
+    def linear(name):
+        linear_category(name)
+        linear_price_range(name)
+
+    baseline = measure("linear keyword scans", names, linear)
+    measure("compiled regex (no cache)", names, compiled)
+    price_catalog.infer_category.cache_clear()
+    price_catalog.infer_price_range.cache_clear()
+    fastest = measure("compiled regex + LRU cache", names, cached)
+    print(f"⚡ Speedup: x{baseline / fastest:.1f}")
+
+    if not args.skip_sanitize:
+        records = [{"product": name, "price": 50, "quantity": 100} for name in names]
+        measure("sanitize_market_record", records, sanitize_market_record)
+
+        start = time.perf_counter()
+        sanitize_market_records(records)
+        report("sanitize_market_records", time.perf_counter() - start, len(records))
+
+        batch = pd.DataFrame(records)
+        start = time.perf_counter()
+        sanitize_market_batch(batch)
+        report("sanitize_market_batch (DataFrame)", time.perf_counter() - start, len(records))
+
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Storage and query benchmark: plain sales collection vs time-series collection.
+
+Seeds the same synthetic market into market_analyzer_bench.sales and
+market_analyzer_bench.sales_timeseries, then reports the storage size of
+each layout and the latency of the range scans and aggregations the API
+and the model pipeline run.
+
+Time-series collections need a real mongod (5.0+), so unlike
+run_benchmarks.py there is no mongomock mode.
+
+Usage (from the "AIML Project - ML Model" directory):
+    python benchmarks/bench_sales_storage.py --mongo-uri mongodb://localhost:27017/
+    python benchmarks/bench_sales_storage.py --mongo-uri mongodb://localhost:27017/ --products 500 --years 3
+
+⚠️ Drops and reseeds the market_analyzer_bench database on the target server.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+if str(PROJECT_DIR) not in sys.path:
+    sys.path.insert(0, str(PROJECT_DIR))
+
+import pandas as pd  # noqa: E402
+from pymongo import MongoClient  # noqa: E402
+
+from data_sources.sales_storage import (  # noqa: E402
+    PLAIN_COLLECTION,
+    TIMESERIES_COLLECTION,
+    TIMESERIES_OPTIONS,
+    from_storage_documents,
+    sales_indexes,
+    to_storage_documents,
+    translate_filter,
+    translate_pipeline,
+)
+from data_sources.synthetic_market import SyntheticMarketGenerator, catalog_products  # noqa: E402
+
+BENCH_DATABASE = "market_analyzer_bench"
+
+
+def seed(collection, generator, batch_size=10000):
+    written = 0
+    for chunk in generator.iter_chunks():
+        for start in range(0, len(chunk), batch_size):
+            records = chunk.iloc[start:start + batch_size].to_dict(orient="records")
+            collection.insert_many(to_storage_documents(collection, records), ordered=False)
+            written += len(records)
+    for keys in sales_indexes(collection):
+        collection.create_index(keys)
+    return written
+
+
+def storage_stats(database, name):
+    stats = database.command("collStats", name)
+    return {
+        "count": stats.get("count"),
+        "size_bytes": stats.get("size"),
+        "storage_bytes": stats.get("storageSize"),
+        "index_bytes": stats.get("totalIndexSize"),
+    }
+
+
+def queries(collection, product, end):
+    """name -> callable running one query against collection, written against flat records."""
+    last_90_days = end - pd.Timedelta(days=90)
+    last_30_days = end - pd.Timedelta(days=30)
+
+    def find(query, sort=None):
+        cursor = collection.find(translate_filter(collection, query))
+        if sort:
+            cursor = cursor.sort(sort)
+        return from_storage_documents(list(cursor))
+
+    def aggregate(pipeline):
+        return list(collection.aggregate(translate_pipeline(collection, pipeline), allowDiskUse=True))
+
+    return {
+        "product_range_90d": lambda: find({"product": product, "date": {"$gte": last_90_days}}, [("date", -1)]),
+        "all_products_range_30d": lambda: find({"date": {"$gte": last_30_days}}),
+        "latest_per_product": lambda: aggregate([
+            {"$sort": {"date": -1}},
+            {"$group": {"_id": "$product", "price": {"$first": "$price"}, "date": {"$first": "$date"}}},
+        ]),
+        "monthly_average_price": lambda: aggregate([
+            {"$match": {"product": product}},
+            {"$group": {
+                "_id": {"year": {"$year": "$date"}, "month": {"$month": "$date"}},
+                "price": {"$avg": "$price"},
+            }},
+        ]),
+        "full_history_load": lambda: find({}),
+    }
+
+
+def time_query(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare plain and time-series storage of the sales history")
+    parser.add_argument("--mongo-uri", required=True, help="Throwaway mongod (5.0+)")
+    parser.add_argument("--products", type=int, default=180)
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    client = MongoClient(args.mongo_uri)
+    client.drop_database(BENCH_DATABASE)
+    database = client[BENCH_DATABASE]
+    database.create_collection(TIMESERIES_COLLECTION, timeseries=TIMESERIES_OPTIONS)
+
+    end = pd.Timestamp.today().normalize()
+    start = end - pd.DateOffset(years=args.years) + pd.Timedelta(days=1)
+    products = catalog_products(args.products)
+
+    print("\n" + "=" * 70)
+    print("🏁 SALES STORAGE BENCHMARK: PLAIN vs TIME-SERIES")
+    print("=" * 70)
+    print(f"📦 {len(products)} products × {args.years} year(s)")
+
+    results = {}
+    for name in (PLAIN_COLLECTION, TIMESERIES_COLLECTION):
+        collection = database[name]
+        generator = SyntheticMarketGenerator(products, start, end, seed=args.seed)
+        started = time.perf_counter()
+        rows = seed(collection, generator)
+        seconds = time.perf_counter() - started
+        results[name] = {
+            "seed_seconds": round(seconds, 3),
+            "storage": storage_stats(database, name),
+            "queries": {
+                query: round(time_query(func, args.repeat), 6)
+                for query, func in queries(collection, products[0], end.to_pydatetime()).items()
+            },
+        }
+        print(f"   🌱 {name}: {rows:,} rows in {seconds:.1f}s ({rows / seconds:,.0f} rows/s)")
+
+    plain, timeseries = results[PLAIN_COLLECTION], results[TIMESERIES_COLLECTION]
+    print("\n💾 Storage (MB)")
+    for field in ("size_bytes", "storage_bytes", "index_bytes"):
+        before, after = plain["storage"][field] or 0, timeseries["storage"][field] or 0
+        ratio = f"x{after / before:5.2f}" if before else ""
+        print(f"   {field:24s} {before / 1e6:10.2f} → {after / 1e6:10.2f}  {ratio}")
+
+    print("\n⏱️  Query latency (median ms)")
+    for query, before in plain["queries"].items():
+        after = timeseries["queries"][query]
+        print(f"   {query:24s} {before * 1000:10.1f} → {after * 1000:10.1f}  x{after / before:5.2f}")
+
+    if args.output:
+        report = {
+            "meta": {
+                "timestamp": datetime.now().isoformat(),
+                "products": len(products),
+                "years": args.years,
+                "seed": args.seed,
+                "repeat": args.repeat,
+                "server": client.server_info().get("version"),
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+
+    client.drop_database(BENCH_DATABASE)
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""
+Benchmark harness for the ML model package.
+
+Seeds a throwaway MongoDB with generated sales data at several scales
+(products x years) with the vectorized synthetic market generator (or
+data/generate_data.py with --generator legacy), times the data pipeline, the
+models and every read-only API endpoint, and saves the timings as JSON so
+runs can be compared.
+
+Usage (from the "AIML Project - ML Model" directory):
+    pip install -r benchmarks/requirements.txt
+    python benchmarks/run_benchmarks.py                      # mongomock, small preset
+    python benchmarks/run_benchmarks.py --preset full --skip-steps train_model train_price_model
+    python benchmarks/run_benchmarks.py --mongo-uri mongodb://localhost:27017/ --compare benchmarks/results/baseline.json
+
+⚠️ Every scale drops and reseeds market_analyzer.sales on the target server.
+Only point --mongo-uri at a throwaway mongod.
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+if str(PROJECT_DIR) not in sys.path:
+    sys.path.insert(0, str(PROJECT_DIR))
+
+PRESETS = {
+    "small": ["5x1", "180x1"],
+    "full": ["5x1", "5x5", "180x1", "180x5", "2000x1", "2000x5"],
+}
+
+PIPELINE_STEPS = [
+    "load_sales_data",
+    "create_features",
+    "train_model",
+    "train_price_model",
+    "generate_forecast",
+    "calculate_elasticity",
+    "optimize_stock",
+]
+
+# (name, method, path, json body); {product} is replaced by a seeded product.
+API_ENDPOINTS = [
+    ("api_root", "GET", "/", None),
+    ("api_health", "GET", "/health", None),
+    ("api_health_live", "GET", "/health/live", None),
+    ("api_health_ready", "GET", "/health/ready", None),
+    ("api_health_details", "GET", "/health/details", None),
+    ("api_products_latest", "GET", "/products/latest", None),
+    ("api_product_forecast", "GET", "/products/{product}/forecast?days=7", None),
+    ("api_product_forecast_batch", "POST", "/products/forecast:batch", {"days": 7}),
+    ("api_forecast_demand", "GET", "/forecast/demand?days=7", None),
+    ("api_forecast_price", "GET", "/forecast/price?days=7", None),
+    ("api_analysis_stock", "GET", "/analysis/stock?days=7", None),
+    ("api_analysis_elasticity", "GET", "/analysis/elasticity", None),
+    ("api_data_sources", "GET", "/data/sources", None),
+    ("api_data_quality", "GET", "/data/quality", None),
+    ("api_metrics", "GET", "/metrics", None),
+]
+
+
+def parse_scale(scale):
+    products, years = scale.lower().split("x")
+    return int(products), int(years)
+
+
+def use_mongomock():
+    """Route every MongoClient created by the project to one in-memory mongomock client."""
+    try:
+        import mongomock
+    except ImportError:
+        raise SystemExit("❌ mongomock is not installed: pip install -r benchmarks/requirements.txt")
+    import pymongo
+
+    client = mongomock.MongoClient()
+    pymongo.MongoClient = lambda *args, **kwargs: client
+
+
+def load_generate_data_module():
+    spec = importlib.util.spec_from_file_location("generate_data", PROJECT_DIR / "data" / "generate_data.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def seed_database(collection, product_count, years, seed, generator="synthetic"):
+    """
+    Drop the sales collection and reseed it with the training columns of
+    data/sales_data.csv, the same shape migrate_csv_to_mongo.py writes.
+    """
+    import pandas as pd
+    from data_sources.mongodb_utils import refresh_collection_stats
+    from data_sources.rollups import rebuild_rollups
+    from data_sources.synthetic_market import SyntheticMarketGenerator, catalog_products
+
+    end = pd.Timestamp.today().normalize()
+    start = end - pd.DateOffset(years=years) + pd.Timedelta(days=1)
+    products = catalog_products(product_count)
+
+    collection.drop()
+    if generator == "legacy":
+        df = load_generate_data_module().generate_sales_data(products, start, end, seed)
+        df.rename(columns={"demand": "quantity"}, inplace=True)
+        chunk_size = 10000
+        for offset in range(0, len(df), chunk_size):
+            collection.insert_many(df.iloc[offset:offset + chunk_size].to_dict(orient="records"))
+        rows = len(df)
+    else:
+        rows = SyntheticMarketGenerator(
+            products, start, end, seed=seed, include_metadata=False
+        ).to_mongo(collection)
+
+    collection.create_index([("product", 1), ("date", -1)])
+    collection.create_index([("category", 1), ("date", -1)])
+    collection.create_index([("date", -1)])
+    rebuild_rollups(collection)
+    refresh_collection_stats(collection)
+    return rows
+
+
+def summarize(timings):
+    return {
+        "runs": len(timings),
+        "min": round(min(timings), 6),
+        "median": round(statistics.median(timings), 6),
+        "mean": round(statistics.mean(timings), 6),
+        "max": round(max(timings), 6),
+    }
+
+
+def time_call(func, repeat):
+    """Time func() `repeat` times with its console output suppressed."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = func()
+            timings.append(time.perf_counter() - start)
+    return result, summarize(timings)
+
+
+def run_step(results, name, func, repeat):
+    print(f"   ⏱️  {name}...", end=" ", flush=True)
+    try:
+        result, summary = time_call(func, repeat)
+        results[name] = summary
+        print(f"{summary['median'] * 1000:.1f} ms")
+        return result
+    except Exception as e:
+        results[name] = {"error": f"{type(e).__name__}: {e}"}
+        print(f"❌ {type(e).__name__}: {e}")
+        return None
+
+
+def benchmark_pipeline(results, steps, repeat):
+    from preprocessing.load_data import load_sales_data
+    from preprocessing.feature_engineering import create_features
+    from forecasting.demand_model import train_model
+    from forecasting.forecast_generator import generate_forecast
+    from pricing.price_model import train_price_model
+    from pricing.elasticity import calculate_elasticity
+    from optimization.stock_optimizer import optimize_stock
+
+    df = None
+    if "load_sales_data" in steps:
+        df = run_step(results, "load_sales_data", load_sales_data, repeat)
+    if df is None:
+        df = load_sales_data()
+
+    step_functions = {
+        "create_features": lambda: create_features(df.copy()),
+        "train_model": train_model,
+        "train_price_model": train_price_model,
+        "generate_forecast": lambda: generate_forecast(7),
+        "calculate_elasticity": calculate_elasticity,
+        "optimize_stock": lambda: optimize_stock(7),
+    }
+    for name, func in step_functions.items():
+        if name in steps:
+            run_step(results, name, func, repeat)
+
+
+def benchmark_api(results, products, repeat):
+    try:
+        from fastapi.testclient import TestClient
+    except Exception:
+        raise SystemExit("❌ fastapi.testclient needs httpx: pip install -r benchmarks/requirements.txt")
+    import ml_api
+
+    ml_api.forecast_cache.invalidate()
+    ml_api.health_details_cache.invalidate()
+    # Not used as a context manager, so startup events (the auto-update thread) never run.
+    client = TestClient(ml_api.app)
+
+    for name, method, path, body in API_ENDPOINTS:
+        url = path.format(product=products[0])
+        if body is not None:
+            body = dict(body, products=products[:50])
+
+        def call(url=url, method=method, body=body):
+            response = client.request(method, url, json=body)
+            response.raise_for_status()
+            return response
+
+        run_step(results, name, call, repeat)
+
+
+def compare_results(current, baseline_path, threshold):
+    """Print median ratios against a previous results file and flag regressions."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    baseline_scales = {item["scale"]: item["benchmarks"] for item in baseline.get("results", [])}
+
+    print("\n" + "=" * 70)
+    print(f"📊 COMPARISON WITH {baseline_path}")
+    print("=" * 70)
+    regressions = 0
+    for item in current["results"]:
+        previous = baseline_scales.get(item["scale"])
+        if not previous:
+            continue
+        print(f"\n📦 Scale {item['scale']}")
+        for name, summary in item["benchmarks"].items():
+            before = previous.get(name, {}).get("median")
+            after = summary.get("median")
+            if not before or after is None:
+                continue
+            ratio = after / before
+            flag = "⚠️  REGRESSION" if ratio > threshold else ("✅ faster" if ratio < 1 / threshold else "")
+            regressions += ratio > threshold
+            print(f"   {name:32s} {before * 1000:10.1f} ms → {after * 1000:10.1f} ms  x{ratio:5.2f} {flag}")
+    print(f"\n{'⚠️' if regressions else '✅'}  {regressions} regression(s) above x{threshold}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ML model pipeline and API")
+    parser.add_argument("--scales", nargs="+", help="Scales as PRODUCTSxYEARS, e.g. 5x1 180x1 2000x5")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    parser.add_argument("--mongo-uri", help="Use a throwaway mongod instead of mongomock")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--generator", choices=["synthetic", "legacy"], default="synthetic",
+                        help="Seed with the vectorized generator or data/generate_data.py")
+    parser.add_argument("--skip-steps", nargs="*", default=[], help=f"Any of: {' '.join(PIPELINE_STEPS)} api")
+    parser.add_argument("--output", help="Results JSON path (default: benchmarks/results/benchmark_<timestamp>.json)")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    if args.mongo_uri:
+        os.environ["MONGO_URI"] = args.mongo_uri
+        backend = "mongod"
+    else:
+        use_mongomock()
+        backend = "mongomock"
+
+    from pymongo import MongoClient
+
+    collection = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))["market_analyzer"]["sales"]
+    steps = [step for step in PIPELINE_STEPS if step not in args.skip_steps]
+    scales = args.scales or PRESETS[args.preset]
+
+    output_path = Path(args.output) if args.output else (
+        PROJECT_DIR / "benchmarks" / "results" / f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    output_path = output_path.resolve()
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "backend": backend,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "generator": args.generator,
+        },
+        "results": [],
+    }
+
+    print("\n" + "=" * 70)
+    print("🏁 ML MODEL BENCHMARKS")
+    print("=" * 70)
+    print(f"🗄️  Backend: {backend}")
+    print(f"📏 Scales: {', '.join(scales)}")
+
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        # Model training writes to models/ relative to the working directory.
+        os.makedirs(os.path.join(workdir, "models"))
+        os.chdir(workdir)
+        try:
+            for scale in scales:
+                product_count, years = parse_scale(scale)
+                print(f"\n📦 Scale {scale}: {product_count} products × {years} year(s)")
+                start = time.perf_counter()
+                rows = seed_database(collection, product_count, years, args.seed, args.generator)
+                print(f"   🌱 Seeded {rows} rows in {time.perf_counter() - start:.1f}s")
+
+                benchmarks = {}
+                benchmark_pipeline(benchmarks, steps, args.repeat)
+                if "api" not in args.skip_steps:
+                    from data_sources.synthetic_market import catalog_products
+                    benchmark_api(benchmarks, catalog_products(product_count), args.repeat)
+
+                report["results"].append({
+                    "scale": scale,
+                    "products": product_count,
+                    "years": years,
+                    "rows": rows,
+                    "benchmarks": benchmarks,
+                })
+        finally:
+            os.chdir(original_dir)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results saved to {output_path}")
+
+    if args.compare:
+        compare_results(report, args.compare, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -52,9 +52,10 @@ def main():
     print("🌤️  Step 3: Updating weather data...")
     print("-" * 80)
     try:
-        from data_sources.weather_fetcher import WeatherFetcher
-        weather = WeatherFetcher()
-        weather_data = weather.fetch_average_weather()
+        from pymongo import MongoClient
+        from data_sources.weather_cache import get_weather_cache
+        client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))
+        weather_data = get_weather_cache(client["market_analyzer"]).get_average()
         print(f"✅ Weather updated:")
         print(f"   Temperature: {weather_data['temperature']}°C")
         print(f"   Rainfall: {weather_data['rainfall']} mm")
@@ -67,10 +68,12 @@ def main():
     print("-" * 80)
     try:
         from pymongo import MongoClient
+        from data_sources.sales_schema import decode_values, decoded_field
+        from data_sources.sales_storage import get_sales_collection, translate_field, translate_pipeline
         mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
         client = MongoClient(mongo_uri)
         db = client["market_analyzer"]
-        collection = db["sales"]
+        collection = get_sales_collection(db)
         
         # Count total records
         total_records = collection.count_documents({})
@@ -80,12 +83,12 @@ def main():
         today_records = collection.count_documents({"date": {"$gte": today_start}})
         
         # Count unique products
-        unique_products = len(collection.distinct("product"))
+        unique_products = len(decode_values(db, "product", collection.distinct(translate_field(collection, "product"))))
         
         # Get data sources breakdown
-        sources = collection.aggregate([
-            {"$group": {"_id": "$source", "count": {"$sum": 1}}}
-        ])
+        sources = collection.aggregate(translate_pipeline(collection, [
+            {"$group": {"_id": decoded_field(db, "source"), "count": {"$sum": 1}}}
+        ]))
         
         print(f"✅ Data Quality Report:")
         print(f"   Total records in database: {total_records}")
@@ -0,0 +1,255 @@
+"""
+Bulk ingestion of the Agmarknet daily price resource on data.gov.in.
+
+Instead of one filtered request per commodity, the resource is paged by
+arrival date with large limit/offset pages. The pages of a date are fetched
+concurrently, and each response is parsed as a stream, so records are
+handled as they arrive instead of after the whole page is buffered. The
+records are then split by commodity locally. For 180 products over a week
+that is a few dozen requests instead of one per product.
+
+A failed page is retried AGMARKNET_RETRIES times with backoff. A page that
+still fails is reported as such, never mistaken for the short last page of
+a date, and the bulk result is dropped so callers fall back to
+per-commodity requests instead of storing an incomplete week.
+
+Set AGMARKNET_BULK=false to go back to per-commodity requests.
+
+Usage (from the "AIML Project - ML Model" directory):
+    python -m data_sources.agmarknet_bulk --days 3
+"""
+import argparse
+import codecs
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+from data_sources.http_cache import CachedSession
+
+load_dotenv()
+
+AGMARKNET_RESOURCE_URL = "https://api.data.gov.in/resource/9ef84268-d588-465a-a308-a864a43d0070"
+AGMARKNET_PAGE_SIZE = int(os.getenv("AGMARKNET_PAGE_SIZE", "2000"))
+AGMARKNET_CONCURRENCY = int(os.getenv("AGMARKNET_CONCURRENCY", "4"))
+AGMARKNET_TIMEOUT = 30
+AGMARKNET_RETRIES = int(os.getenv("AGMARKNET_RETRIES", "3"))
+AGMARKNET_RETRY_DELAY = float(os.getenv("AGMARKNET_RETRY_DELAY", "1.0"))
+HEADERS = {
+    "User-Agent": "CropIntelHub/1.0",
+    "Accept": "application/json",
+}
+
+
+def bulk_enabled(api_key):
+    configured = bool(api_key) and api_key not in ("not_required", "your_agmarknet_api_key")
+    return configured and os.getenv("AGMARKNET_BULK", "true").lower() == "true"
+
+
+def iter_json_records(chunks, key="records"):
+    """
+    Yield the objects of the top-level `key` array of a JSON document given
+    as byte chunks, one object at a time, without loading the whole document.
+    Raises ValueError when the key never appears, an item is malformed or the
+    stream ends before the closing `]`, so a broken body is never taken for
+    a complete short page.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    pattern = re.compile(rf'"{re.escape(key)}"\s*:\s*\[')
+    chunks = iter(chunks)
+    buffer = ""
+    position = None
+
+    for chunk in chunks:
+        buffer += utf8.decode(chunk)
+        match = pattern.search(buffer)
+        if match:
+            position = match.end()
+            break
+    if position is None:
+        raise ValueError(f'response has no "{key}" array')
+
+    while True:
+        # Skip the separators between array items.
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position < len(buffer) and buffer[position] == "]":
+            return
+        try:
+            if position >= len(buffer):
+                raise ValueError("need more data")
+            item, position = decoder.raw_decode(buffer, position)
+        except ValueError as error:
+            # The next item is cut off at the chunk boundary: read more.
+            chunk = next(chunks, None)
+            if chunk is None:
+                if position < len(buffer):
+                    raise ValueError(f'malformed or truncated "{key}" item: {error}') from None
+                raise ValueError(f'response ended before the end of the "{key}" array')
+            buffer = buffer[position:] + utf8.decode(chunk)
+            position = 0
+            continue
+        if not isinstance(item, dict):
+            raise ValueError(f'unexpected {type(item).__name__} in the "{key}" array')
+        yield item
+
+
+class AgmarknetPageError(Exception):
+    """A page that failed on every attempt."""
+
+    def __init__(self, offset, reason):
+        super().__init__(f"page at offset {offset} failed: {reason}")
+        self.offset = offset
+
+
+def commodity_key(name):
+    return str(name or "").strip().lower()
+
+
+class AgmarknetBulkFetcher:
+    """
+    Pages through the Agmarknet resource by arrival date and groups the
+    records of the wanted commodities: {commodity: [raw records]}.
+    """
+
+    def __init__(self, api_key, page_size=AGMARKNET_PAGE_SIZE, concurrency=AGMARKNET_CONCURRENCY,
+                 retries=AGMARKNET_RETRIES, retry_delay=AGMARKNET_RETRY_DELAY):
+        self.api_key = api_key
+        self.page_size = page_size
+        self.concurrency = max(1, concurrency)
+        self.retries = max(1, retries)
+        self.retry_delay = retry_delay
+        self.session = CachedSession(pool_maxsize=self.concurrency)
+        self.requests_made = 0
+        self.failed_dates = {}
+        self._counter_lock = threading.Lock()
+
+    def fetch_page(self, offset, filters=None):
+        """
+        Raw records of one page. Errors and non-200 responses are retried with
+        backoff; AgmarknetPageError when the last attempt fails too.
+        """
+        params = {
+            "api-key": self.api_key,
+            "format": "json",
+            "limit": self.page_size,
+            "offset": offset,
+        }
+        for field, value in (filters or {}).items():
+            params[f"filters[{field}]"] = value
+        reason = None
+        for attempt in range(1, self.retries + 1):
+            with self._counter_lock:
+                self.requests_made += 1
+            try:
+                with self.session.get(AGMARKNET_RESOURCE_URL, params=params, headers=HEADERS,
+                                      timeout=AGMARKNET_TIMEOUT, stream=True) as response:
+                    if response.status_code == 200:
+                        return list(iter_json_records(response.iter_content(chunk_size=64 * 1024)))
+                    reason = f"status {response.status_code}"
+            except Exception as e:
+                reason = str(e)
+            if attempt < self.retries:
+                print(f"⚠️  Agmarknet page at offset {offset}: {reason}, retrying ({attempt}/{self.retries - 1})")
+                time.sleep(self.retry_delay * 2 ** (attempt - 1))
+        raise AgmarknetPageError(offset, reason)
+
+    def iter_pages(self, filters=None):
+        """
+        Pages matching filters, `concurrency` pages at a time, until a short
+        page. Raises AgmarknetPageError when a page fails every retry.
+        """
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            offset = 0
+            while True:
+                offsets = [offset + index * self.page_size for index in range(self.concurrency)]
+                pages = list(executor.map(lambda page_offset: self.fetch_page(page_offset, filters), offsets))
+                for page in pages:
+                    yield page
+                if any(len(page) < self.page_size for page in pages):
+                    return
+                offset += self.concurrency * self.page_size
+
+    def fetch(self, commodities=None, days=7, end=None):
+        """
+        Records of the last `days` arrival dates, grouped by commodity name as
+        given in `commodities` (all commodities when None). Dates with a page
+        that failed every retry are listed in failed_dates ({date: error})
+        and their records are incomplete.
+        """
+        wanted = {commodity_key(name): name for name in commodities} if commodities is not None else None
+        end = end or datetime.now()
+        grouped = {}
+        self.failed_dates = {}
+        for day in range(days):
+            arrival_date = (end - timedelta(days=day)).strftime("%d/%m/%Y")
+            try:
+                for page in self.iter_pages({"arrival_date": arrival_date}):
+                    for record in page:
+                        key = commodity_key(record.get("commodity"))
+                        if wanted is None:
+                            grouped.setdefault(record.get("commodity"), []).append(record)
+                        elif key in wanted:
+                            grouped.setdefault(wanted[key], []).append(record)
+            except AgmarknetPageError as error:
+                print(f"❌ Agmarknet {arrival_date}: {error}")
+                self.failed_dates[arrival_date] = str(error)
+        return grouped
+
+
+def fetch_agmarknet_bulk(api_key, commodities=None, days=7):
+    """
+    {commodity: [raw records]} for the last `days` days in a handful of paged
+    requests, or None when bulk mode is off, the key is missing or a page
+    could not be fetched (callers then fall back to per-commodity requests).
+    """
+    if not bulk_enabled(api_key):
+        return None
+    fetcher = AgmarknetBulkFetcher(api_key)
+    started = time.perf_counter()
+    grouped = fetcher.fetch(commodities, days=days)
+    if fetcher.failed_dates:
+        print(f"❌ Agmarknet bulk: pages failed for {len(fetcher.failed_dates)} date(s) "
+              f"({', '.join(sorted(fetcher.failed_dates))}); falling back to per-commodity requests")
+        return None
+    records = sum(len(items) for items in grouped.values())
+    print(f"📡 Agmarknet bulk: {records:,} records for {len(grouped)} commodities "
+          f"in {fetcher.requests_made} requests ({time.perf_counter() - started:.1f}s)")
+    return grouped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Page through the Agmarknet resource and count records per commodity")
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--page-size", type=int, default=AGMARKNET_PAGE_SIZE)
+    parser.add_argument("--concurrency", type=int, default=AGMARKNET_CONCURRENCY)
+    args = parser.parse_args()
+
+    api_key = os.getenv("AGMARKNET_API_KEY", "")
+    if not bulk_enabled(api_key):
+        parser.error("AGMARKNET_API_KEY is not configured (or AGMARKNET_BULK=false)")
+
+    print("\n" + "=" * 70)
+    print(f"📡 AGMARKNET BULK FETCH ({args.days} day(s))")
+    print("=" * 70)
+    fetcher = AgmarknetBulkFetcher(api_key, page_size=args.page_size, concurrency=args.concurrency)
+    started = time.perf_counter()
+    grouped = fetcher.fetch(days=args.days)
+    elapsed = time.perf_counter() - started
+    for commodity, records in sorted(grouped.items(), key=lambda item: -len(item[1]))[:20]:
+        print(f"   • {commodity}: {len(records):,}")
+    total = sum(len(records) for records in grouped.values())
+    print(f"✅ {total:,} records, {len(grouped)} commodities, {fetcher.requests_made} requests, {elapsed:.1f}s")
+    for arrival_date, error in sorted(fetcher.failed_dates.items()):
+        print(f"   ❌ {arrival_date} incomplete: {error}")
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
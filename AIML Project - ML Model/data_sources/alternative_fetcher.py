@@ -1,16 +1,13 @@
-import requests
+from data_sources import http_cache
 import random
 from datetime import datetime, timedelta
 from pymongo import MongoClient
 import os
 from dotenv import load_dotenv
 from data_sources.mongodb_utils import replace_collection_with_batches
-from data_sources.price_catalog import (
-    deterministic_price,
-    deterministic_quantity,
-    deterministic_weather,
-    infer_category,
-)
+from data_sources.sales_storage import get_sales_collection
+from data_sources.price_catalog import infer_category, simulate_market
+from data_sources.product_catalog import MARKET_PRODUCTS, get_catalog
 
 load_dotenv()
 
@@ -24,190 +21,9 @@ class AlternativeMarketDataFetcher:
         self.mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
         self.client = MongoClient(self.mongo_uri)
         self.db = self.client["market_analyzer"]
-        self.collection = self.db["sales"]
+        self.collection = get_sales_collection(self.db)
         
-        self.product_data = {
-            'Apple': {'category': 'fruit', 'price_range': (140, 220), 'seasonal': False},
-            'Banana': {'category': 'fruit', 'price_range': (50, 80), 'seasonal': False},
-            'Mango': {'category': 'fruit', 'price_range': (80, 180), 'seasonal': True},
-            'Orange': {'category': 'fruit', 'price_range': (60, 100), 'seasonal': True},
-            'Papaya': {'category': 'fruit', 'price_range': (40, 70), 'seasonal': False},
-            'Pineapple': {'category': 'fruit', 'price_range': (50, 90), 'seasonal': False},
-            'Guava': {'category': 'fruit', 'price_range': (50, 80), 'seasonal': True},
-            'Watermelon': {'category': 'fruit', 'price_range': (25, 50), 'seasonal': True},
-            'Muskmelon': {'category': 'fruit', 'price_range': (40, 70), 'seasonal': True},
-            'Pomegranate': {'category': 'fruit', 'price_range': (150, 280), 'seasonal': False},
-            'Grapes': {'category': 'fruit', 'price_range': (80, 160), 'seasonal': True},
-            'Sapota': {'category': 'fruit', 'price_range': (50, 90), 'seasonal': False},
-            'Custard Apple': {'category': 'fruit', 'price_range': (80, 140), 'seasonal': True},
-            'Jackfruit': {'category': 'fruit', 'price_range': (40, 80), 'seasonal': True},
-            'Lychee': {'category': 'fruit', 'price_range': (150, 250), 'seasonal': True},
-            'Strawberry': {'category': 'fruit', 'price_range': (300, 500), 'seasonal': True},
-            'Blueberry': {'category': 'fruit', 'price_range': (600, 1000), 'seasonal': False},
-            'Blackberry': {'category': 'fruit', 'price_range': (400, 700), 'seasonal': True},
-            'Pear': {'category': 'fruit', 'price_range': (120, 200), 'seasonal': True},
-            'Peach': {'category': 'fruit', 'price_range': (150, 250), 'seasonal': True},
-            'Plum': {'category': 'fruit', 'price_range': (180, 280), 'seasonal': True},
-            'Apricot': {'category': 'fruit', 'price_range': (200, 350), 'seasonal': True},
-            'Kiwi': {'category': 'fruit', 'price_range': (250, 400), 'seasonal': False},
-            'Dragon Fruit': {'category': 'fruit', 'price_range': (200, 350), 'seasonal': False},
-            'Passion Fruit': {'category': 'fruit', 'price_range': (250, 400), 'seasonal': True},
-            'Fig': {'category': 'fruit', 'price_range': (400, 600), 'seasonal': True},
-            'Dates': {'category': 'fruit', 'price_range': (350, 550), 'seasonal': False},
-            'Coconut': {'category': 'fruit', 'price_range': (40, 70), 'seasonal': False},
-            'Tender Coconut': {'category': 'fruit', 'price_range': (50, 80), 'seasonal': False},
-            'Sweet Lime': {'category': 'fruit', 'price_range': (50, 90), 'seasonal': True},
-            'Amla': {'category': 'fruit', 'price_range': (50, 100), 'seasonal': True},
-            'Jamun': {'category': 'fruit', 'price_range': (80, 140), 'seasonal': True},
-            'Karonda': {'category': 'fruit', 'price_range': (60, 110), 'seasonal': True},
-            'Wood Apple': {'category': 'fruit', 'price_range': (50, 90), 'seasonal': True},
-            'Star Fruit': {'category': 'fruit', 'price_range': (100, 180), 'seasonal': True},
-            'Mulberry': {'category': 'fruit', 'price_range': (150, 250), 'seasonal': True},
-            'Rambutan': {'category': 'fruit', 'price_range': (250, 400), 'seasonal': True},
-            'Avocado': {'category': 'fruit', 'price_range': (350, 550), 'seasonal': False},
-            'Persimmon': {'category': 'fruit', 'price_range': (200, 320), 'seasonal': True},
-            'Cherry': {'category': 'fruit', 'price_range': (500, 800), 'seasonal': True},
-            'Mandarin': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Tamarind': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Palm Fruit': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Ber': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Rose Apple': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Sugarcane': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Grapefruit': {'category': 'fruit', 'price_range': (60, 120), 'seasonal': True},
-            'Cranberry': {'category': 'fruit', 'price_range': (200, 350), 'seasonal': True},
-            'Longan': {'category': 'fruit', 'price_range': (200, 350), 'seasonal': True},
-            'Durian': {'category': 'fruit', 'price_range': (300, 500), 'seasonal': True},
-            'Olives': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Soursop': {'category': 'fruit', 'price_range': (300, 500), 'seasonal': True},
-            'Mangosteen': {'category': 'fruit', 'price_range': (300, 500), 'seasonal': True},
-            'Gooseberry': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Custard Pear': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Indian Fig': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Quince': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Breadfruit': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Kumquat': {'category': 'fruit', 'price_range': (200, 350), 'seasonal': True},
-            'Cantaloupe': {'category': 'fruit', 'price_range': (60, 120), 'seasonal': True},
-            'Honeydew Melon': {'category': 'fruit', 'price_range': (60, 120), 'seasonal': True},
-            'Nectarine': {'category': 'fruit', 'price_range': (200, 350), 'seasonal': True},
-            'Pomelo': {'category': 'fruit', 'price_range': (60, 120), 'seasonal': True},
-            'Red Banana': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Plantain': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Kinnow': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Langsat': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Loquat': {'category': 'fruit', 'price_range': (200, 350), 'seasonal': True},
-            'Miracle Fruit': {'category': 'fruit', 'price_range': (300, 500), 'seasonal': True},
-            'Snake Fruit': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Indian Blackberry': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Indian Plum': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Indian Almond Fruit': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Bilimbi': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Ceylon Gooseberry': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Malay Apple': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Indian Mulberry': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Santol': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Sapodilla': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Indian Persimmon': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Wild Mango': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Hog Plum': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Indian Bael Fruit': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Elephant Apple': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Phalsa': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Indian Cherry': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Tadgola': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Water Apple': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Indian Fig Fruit': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Gunda Fruit': {'category': 'fruit', 'price_range': (70, 150), 'seasonal': True},
-            'Potato': {'category': 'vegetable', 'price_range': (25, 45), 'seasonal': False},
-            'Tomato': {'category': 'vegetable', 'price_range': (30, 80), 'seasonal': False},
-            'Onion': {'category': 'vegetable', 'price_range': (25, 60), 'seasonal': False},
-            'Garlic': {'category': 'vegetable', 'price_range': (100, 180), 'seasonal': False},
-            'Ginger': {'category': 'vegetable', 'price_range': (80, 150), 'seasonal': False},
-            'Carrot': {'category': 'vegetable', 'price_range': (40, 75), 'seasonal': False},
-            'Cabbage': {'category': 'vegetable', 'price_range': (25, 50), 'seasonal': False},
-            'Cauliflower': {'category': 'vegetable', 'price_range': (40, 80), 'seasonal': True},
-            'Brinjal': {'category': 'vegetable', 'price_range': (40, 75), 'seasonal': False},
-            'Capsicum': {'category': 'vegetable', 'price_range': (80, 150), 'seasonal': False},
-            'Green Chilli': {'category': 'vegetable', 'price_range': (50, 120), 'seasonal': False},
-            'Cucumber': {'category': 'vegetable', 'price_range': (30, 60), 'seasonal': False},
-            'Bottle Gourd': {'category': 'vegetable', 'price_range': (30, 60), 'seasonal': False},
-            'Ridge Gourd': {'category': 'vegetable', 'price_range': (40, 70), 'seasonal': False},
-            'Bitter Gourd': {'category': 'vegetable', 'price_range': (45, 80), 'seasonal': False},
-            'Snake Gourd': {'category': 'vegetable', 'price_range': (40, 70), 'seasonal': False},
-            'Ash Gourd': {'category': 'vegetable', 'price_range': (25, 50), 'seasonal': False},
-            'Pumpkin': {'category': 'vegetable', 'price_range': (25, 50), 'seasonal': False},
-            'Radish': {'category': 'vegetable', 'price_range': (30, 60), 'seasonal': True},
-            'Turnip': {'category': 'vegetable', 'price_range': (40, 70), 'seasonal': True},
-            'Beetroot': {'category': 'vegetable', 'price_range': (45, 80), 'seasonal': False},
-            'Drumstick': {'category': 'vegetable', 'price_range': (50, 100), 'seasonal': True},
-            'Cluster Beans': {'category': 'vegetable', 'price_range': (50, 95), 'seasonal': True},
-            'French Beans': {'category': 'vegetable', 'price_range': (60, 110), 'seasonal': False},
-            'Broad Beans': {'category': 'vegetable', 'price_range': (80, 130), 'seasonal': True},
-            'Green Peas': {'category': 'vegetable', 'price_range': (60, 120), 'seasonal': True},
-            'Chow Chow': {'category': 'vegetable', 'price_range': (40, 70), 'seasonal': False},
-            'Raw Banana': {'category': 'vegetable', 'price_range': (30, 60), 'seasonal': False},
-            'Taro Root': {'category': 'vegetable', 'price_range': (45, 80), 'seasonal': False},
-            'Sweet Potato': {'category': 'vegetable', 'price_range': (40, 75), 'seasonal': False},
-            'Yam': {'category': 'vegetable', 'price_range': (50, 95), 'seasonal': False},
-            'Spinach': {'category': 'vegetable', 'price_range': (25, 50), 'seasonal': False},
-            'Fenugreek Leaves': {'category': 'vegetable', 'price_range': (30, 65), 'seasonal': True},
-            'Coriander Leaves': {'category': 'vegetable', 'price_range': (40, 80), 'seasonal': False},
-            'Mint Leaves': {'category': 'vegetable', 'price_range': (50, 100), 'seasonal': False},
-            'Curry Leaves': {'category': 'vegetable', 'price_range': (60, 120), 'seasonal': False},
-            'Spring Onion': {'category': 'vegetable', 'price_range': (50, 95), 'seasonal': False},
-            'Lettuce': {'category': 'vegetable', 'price_range': (80, 150), 'seasonal': False},
-            'Broccoli': {'category': 'vegetable', 'price_range': (100, 180), 'seasonal': False},
-            'Zucchini': {'category': 'vegetable', 'price_range': (90, 160), 'seasonal': False},
-            'Mushroom': {'category': 'vegetable', 'price_range': (200, 350), 'seasonal': False},
-            'Corn': {'category': 'vegetable', 'price_range': (40, 80), 'seasonal': True},
-            'Baby Corn': {'category': 'vegetable', 'price_range': (120, 220), 'seasonal': False},
-            'Lady Finger': {'category': 'vegetable', 'price_range': (45, 90), 'seasonal': False},
-            'Brussels Sprouts': {'category': 'vegetable', 'price_range': (150, 280), 'seasonal': True},
-            'Colocasia Leaves': {'category': 'vegetable', 'price_range': (25, 60), 'seasonal': False},
-            'Amaranth Leaves': {'category': 'vegetable', 'price_range': (25, 60), 'seasonal': False},
-            'Ivy Gourd': {'category': 'vegetable', 'price_range': (35, 80), 'seasonal': False},
-            'Pointed Gourd': {'category': 'vegetable', 'price_range': (35, 80), 'seasonal': False},
-            'Sponge Gourd': {'category': 'vegetable', 'price_range': (35, 80), 'seasonal': False},
-            'Knol Khol': {'category': 'vegetable', 'price_range': (35, 80), 'seasonal': False},
-            'Raw Papaya': {'category': 'vegetable', 'price_range': (35, 80), 'seasonal': False},
-            'Raw Mango': {'category': 'vegetable', 'price_range': (35, 80), 'seasonal': False},
-            'Green Gram Sprouts': {'category': 'vegetable', 'price_range': (35, 80), 'seasonal': False},
-            'Black Gram Sprouts': {'category': 'vegetable', 'price_range': (35, 80), 'seasonal': False},
-            'Chickpeas': {'category': 'vegetable', 'price_range': (35, 80), 'seasonal': False},
-            'Horse Gram': {'category': 'vegetable', 'price_range': (35, 80), 'seasonal': False},
-            'Field Beans': {'category': 'vegetable', 'price_range': (35, 80), 'seasonal': False},
-            'Drumstick Leaves': {'category': 'vegetable', 'price_range': (25, 60), 'seasonal': False},
-            'Red Cabbage': {'category': 'vegetable', 'price_range': (35, 80), 'seasonal': False},
-            'Yellow Capsicum': {'category': 'vegetable', 'price_range': (80, 150), 'seasonal': False},
-            'Red Capsicum': {'category': 'vegetable', 'price_range': (80, 150), 'seasonal': False},
-            'Green Beans': {'category': 'vegetable', 'price_range': (35, 80), 'seasonal': False},
-            'Celery': {'category': 'vegetable', 'price_range': (80, 150), 'seasonal': False},
-            'Leek': {'category': 'vegetable', 'price_range': (80, 150), 'seasonal': False},
-            'Parsley': {'category': 'vegetable', 'price_range': (80, 150), 'seasonal': False},
-            'Basil': {'category': 'vegetable', 'price_range': (80, 150), 'seasonal': False},
-            'Dill Leaves': {'category': 'vegetable', 'price_range': (25, 60), 'seasonal': False},
-            'Mustard Greens': {'category': 'vegetable', 'price_range': (25, 60), 'seasonal': False},
-            'Turnip Greens': {'category': 'vegetable', 'price_range': (25, 60), 'seasonal': False},
-            'Radish Leaves': {'category': 'vegetable', 'price_range': (25, 60), 'seasonal': False},
-            'Kale': {'category': 'vegetable', 'price_range': (80, 150), 'seasonal': False},
-            'Bok Choy': {'category': 'vegetable', 'price_range': (35, 80), 'seasonal': False},
-            'Arugula': {'category': 'vegetable', 'price_range': (80, 150), 'seasonal': False},
-            'Water Spinach': {'category': 'vegetable', 'price_range': (35, 80), 'seasonal': False},
-            'Malabar Spinach': {'category': 'vegetable', 'price_range': (35, 80), 'seasonal': False},
-            'Shepu': {'category': 'vegetable', 'price_range': (25, 60), 'seasonal': False},
-            'Sorrel Leaves': {'category': 'vegetable', 'price_range': (25, 60), 'seasonal': False},
-            'Ridge Gourd Leaves': {'category': 'vegetable', 'price_range': (25, 60), 'seasonal': False},
-            'Pumpkin Leaves': {'category': 'vegetable', 'price_range': (25, 60), 'seasonal': False},
-            'Banana Flower': {'category': 'vegetable', 'price_range': (60, 110), 'seasonal': False},
-            'Banana Stem': {'category': 'vegetable', 'price_range': (35, 80), 'seasonal': False},
-            'Lotus Root': {'category': 'vegetable', 'price_range': (60, 110), 'seasonal': False},
-            'Green Garlic': {'category': 'vegetable', 'price_range': (35, 80), 'seasonal': False},
-            'Pearl Onion': {'category': 'vegetable', 'price_range': (35, 80), 'seasonal': False},
-            'Shallots': {'category': 'vegetable', 'price_range': (35, 80), 'seasonal': False},
-            'White Radish': {'category': 'vegetable', 'price_range': (35, 80), 'seasonal': False},
-            'Purple Cabbage': {'category': 'vegetable', 'price_range': (35, 80), 'seasonal': False},
-            'Raw Jackfruit': {'category': 'vegetable', 'price_range': (35, 80), 'seasonal': False},
-            'Green Soybeans': {'category': 'vegetable', 'price_range': (35, 80), 'seasonal': False},
-        }
+        self.product_data = get_catalog().product_table(MARKET_PRODUCTS)
     
     def fetch_cryptocompare_market_trends(self):
         """
@@ -217,7 +33,7 @@ class AlternativeMarketDataFetcher:
         try:
             url = "https://min-api.cryptocompare.com/data/pricemultifull"
             params = {"fsyms": "BTC", "tsyms": "USD"}
-            response = requests.get(url, params=params, timeout=5)
+            response = http_cache.get(url, params=params, timeout=5)
             if response.status_code == 200:
                 data = response.json()
                 change_pct = data.get("RAW", {}).get("BTC", {}).get("USD", {}).get("CHANGEPCT24HOUR", 0)
@@ -226,9 +42,10 @@ class AlternativeMarketDataFetcher:
             pass
         return 0.05
     
-    def generate_realistic_data(self, product_name, days=30):
+    def generate_realistic_data(self, product_name, days=30, simulation=None):
         """
         Generate realistic market data with trends and seasonality.
+        Pass a simulate_market() result covering the product to skip simulating it again.
         """
         if product_name not in self.product_data:
             return []
@@ -236,14 +53,18 @@ class AlternativeMarketDataFetcher:
         product_info = self.product_data[product_name]
         seasonal = product_info["seasonal"]
         
+        if simulation is None or product_name not in simulation.index or len(simulation.day_offsets) < days:
+            simulation = simulate_market([product_name], range(days))
+        series = simulation.for_product(product_name)
+        weather = {"temperature": series["temperature"], "rainfall": series["rainfall"]}
+        category = infer_category(product_name)
+        
         records = []
         
         for day in range(days):
             current_date = (datetime.now() - timedelta(days=days - day)).replace(hour=12, minute=0, second=0, microsecond=0)
-            category = infer_category(product_name)
-            price = deterministic_price(product_name, day_offset=day)
-            quantity = deterministic_quantity(product_name, day_offset=day)
-            weather = deterministic_weather(product_name)
+            price = series["price"][day]
+            quantity = series["quantity"][day]
             
             records.append({
                 "date": current_date,
@@ -271,9 +92,10 @@ class AlternativeMarketDataFetcher:
         print("🔄 Generating realistic market data...")
         print("=" * 50)
         
+        simulation = simulate_market(self.product_data.keys(), range(days))
         for product_name in self.product_data.keys():
             print(f"📦 Generating data for: {product_name}")
-            records = self.generate_realistic_data(product_name, days)
+            records = self.generate_realistic_data(product_name, days, simulation)
             all_records.extend(records)
             print(f"   ✅ Generated {len(records)} records")
         
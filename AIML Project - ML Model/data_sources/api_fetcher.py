@@ -2,12 +2,14 @@
 Real-time market data fetcher for vegetables and fruits.
 Integrates with multiple data sources and stores in MongoDB.
 """
-import requests
+from data_sources import http_cache
 from datetime import datetime, timedelta
 from pymongo import MongoClient
 import os
 from dotenv import load_dotenv
+from data_sources.agmarknet_bulk import fetch_agmarknet_bulk
 from data_sources.mongodb_utils import replace_collection_with_batches
+from data_sources.sales_storage import get_sales_collection
 from data_sources.price_catalog import (
     deterministic_price,
     deterministic_quantity,
@@ -15,6 +17,8 @@ from data_sources.price_catalog import (
     infer_category,
 )
 load_dotenv()
+# Records kept per commodity, in bulk mode as in the per-commodity request's limit.
+AGMARKNET_RECORD_LIMIT = 100
 class MarketDataFetcher:
     """
     Fetches real-time market data from various sources.
@@ -24,7 +28,8 @@ class MarketDataFetcher:
         self.mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
         self.client = MongoClient(self.mongo_uri)
         self.db = self.client["market_analyzer"]
-        self.collection = self.db["sales"]
+        self.collection = get_sales_collection(self.db)
+        self.agmarknet_bulk = None
     def fetch_agmarknet_data(self, commodity, state="All", district="All"):
         """
         Fetch data from India's Agmarknet API (Government source).
@@ -36,12 +41,20 @@ class MarketDataFetcher:
                 print(f"⚠️  Agmarknet API key not configured")
                 return None
             
+            if self.agmarknet_bulk is not None:
+                records = self.agmarknet_bulk.get(commodity)
+                if not records:
+                    print(f"⚠️  Agmarknet: No records found for {commodity}")
+                    return None
+                # Newest arrival dates come first; keep as many as one filtered request returns.
+                return self._parse_agmarknet_response({"records": records[:AGMARKNET_RECORD_LIMIT]})
+            
             base_url = "https://api.data.gov.in/resource/9ef84268-d588-465a-a308-a864a43d0070"
             params = {
                 "api-key": api_key,
                 "format": "json",
                 "filters[commodity]": commodity,
-                "limit": 100
+                "limit": AGMARKNET_RECORD_LIMIT
             }
             
             headers = {
@@ -49,7 +62,7 @@ class MarketDataFetcher:
                 "Accept": "application/json"
             }
             
-            response = requests.get(base_url, params=params, headers=headers, timeout=15)
+            response = http_cache.get(base_url, params=params, headers=headers, timeout=15)
             
             if response.status_code == 200:
                 data = response.json()
@@ -90,10 +103,10 @@ class MarketDataFetcher:
             }
             
             if api_key and api_key != "not_required":
-                response = requests.get(base_url, params=params, headers=headers, 
+                response = http_cache.get(base_url, params=params, headers=headers, 
                                       auth=(api_key, ''), timeout=15)
             else:
-                response = requests.get(base_url, params=params, headers=headers, timeout=15)
+                response = http_cache.get(base_url, params=params, headers=headers, timeout=15)
             
             if response.status_code == 200:
                 data = response.json()
@@ -130,7 +143,7 @@ class MarketDataFetcher:
                 "json": 1,
                 "page_size": 20
             }
-            response = requests.get(base_url, params=params, timeout=10)
+            response = http_cache.get(base_url, params=params, timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 return self._parse_openfoodfacts_response(data, product)
@@ -233,6 +246,7 @@ class MarketDataFetcher:
         all_records = []
         print("🔄 Fetching real-time market data...")
         print("=" * 50)
+        self.agmarknet_bulk = fetch_agmarknet_bulk(os.getenv("AGMARKNET_API_KEY", ""), products)
         for product in products:
             print(f"\n📦 Fetching data for: {product}")
             records = self.fetch_agmarknet_data(product)
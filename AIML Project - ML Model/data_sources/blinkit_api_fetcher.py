@@ -3,7 +3,7 @@ Blinkit API Data Fetcher (Advanced)
 Uses Blinkit's internal API endpoints for more reliable data fetching.
 ⚠️ IMPORTANT: Educational/Research purposes only.
 """
-import requests
+from data_sources import http_cache
 import json
 from datetime import datetime
 from pymongo import MongoClient
@@ -11,6 +11,7 @@ import os
 from dotenv import load_dotenv
 import time
 from data_sources.mongodb_utils import replace_collection_with_batches
+from data_sources.sales_storage import get_sales_collection
 load_dotenv()
 class BlinkitAPIFetcher:
     """
@@ -29,8 +30,8 @@ class BlinkitAPIFetcher:
         self.mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
         self.client = MongoClient(self.mongo_uri)
         self.db = self.client["market_analyzer"]
-        self.collection = self.db["sales"]
-        self.session = requests.Session()
+        self.collection = get_sales_collection(self.db)
+        self.session = http_cache.CachedSession()
         self.session.headers.update(self.headers)
     def get_location_token(self, lat=28.6139, lon=77.2090):
         """
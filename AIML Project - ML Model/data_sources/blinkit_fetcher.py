@@ -3,7 +3,7 @@ Blinkit Data Fetcher for Fruits and Vegetables
 ⚠️ IMPORTANT: This is for educational/research purposes only.
 Please review Blinkit's Terms of Service before using.
 """
-import requests
+from data_sources import http_cache
 from bs4 import BeautifulSoup
 import json
 from datetime import datetime
@@ -13,6 +13,7 @@ from dotenv import load_dotenv
 import time
 import re
 from data_sources.mongodb_utils import replace_collection_with_batches
+from data_sources.sales_storage import get_sales_collection
 load_dotenv()
 class BlinkitDataFetcher:
     """
@@ -36,7 +37,7 @@ class BlinkitDataFetcher:
         self.mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
         self.client = MongoClient(self.mongo_uri)
         self.db = self.client["market_analyzer"]
-        self.collection = self.db["sales"]
+        self.collection = get_sales_collection(self.db)
         self.request_delay = 3
     def fetch_category_page(self, category_url):
         """
@@ -49,7 +50,7 @@ class BlinkitDataFetcher:
         try:
             url = f"{self.base_url}{category_url}"
             print(f"🔍 Fetching: {url}")
-            response = requests.get(url, headers=self.headers, timeout=15)
+            response = http_cache.get(url, headers=self.headers, timeout=15)
             if response.status_code == 200:
                 return self._parse_product_page(response.text)
             else:
@@ -0,0 +1,405 @@
+"""
+Chunked bulk importer for CSV and Parquet sales files.
+
+The file is read a chunk of rows at a time, so memory stays bounded
+however large it is. Column types are inferred once from the first chunk
+and then pinned for every later chunk; date columns are parsed with one
+vectorized to_datetime per chunk. Each chunk goes through
+sanitize_market_batch, the same columnar pass ingestion uses, and is
+written by a BulkWriter while the next chunk is being parsed.
+
+Progress is saved to a checkpoint file after every chunk. An interrupted
+import started again with the same arguments resumes after the last
+completed chunk. Every row gets an _id derived from its row number, so the
+rows of a chunk that was half written when the import stopped come back as
+duplicates and are skipped rather than stored twice. Time-series
+collections do not enforce a unique _id, so there a resumed import first
+deletes the _id range of the rows after the checkpoint (this needs MongoDB
+7.0+, which accepts deletes filtered on measurement fields).
+
+With --mode replace (default) the rows are loaded into the shadow
+collection and swapped in when the whole file is loaded, so readers never
+see a partial import. With --mode append they are added to the collection
+as they are written.
+
+Usage (from the "AIML Project - ML Model" directory):
+    python -m data_sources.bulk_import data/sales_data.csv --rename demand=quantity
+    python -m data_sources.bulk_import sales.parquet --mode append --chunk-size 100000
+    python -m data_sources.bulk_import sales.parquet --restart
+"""
+import argparse
+import hashlib
+import json
+import os
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+from bson import ObjectId
+from dotenv import load_dotenv
+
+from data_sources.mongodb_utils import (
+    BulkWriter,
+    print_write_report,
+    refresh_derived_data,
+    sanitize_market_batch,
+    shadow_collection,
+    swap_in_shadow,
+)
+from data_sources.sales_storage import get_sales_collection, is_timeseries, to_storage_documents
+
+load_dotenv()
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "50000"))
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", "4"))
+# Tried in order on the sample of a text column; the first that parses every value wins.
+DATE_FORMATS = ("ISO8601", "%d/%m/%Y", "%d-%m-%Y", "%m/%d/%Y", "%d/%m/%Y %H:%M:%S")
+DATE_NAME_HINTS = ("date", "_at", "time")
+
+
+def detect_format(path):
+    suffixes = [suffix.lower() for suffix in Path(path).suffixes]
+    if suffixes and suffixes[-1] in (".parquet", ".pq"):
+        return "parquet"
+    if ".csv" in suffixes:
+        return "csv"
+    raise ValueError(f"Cannot tell the format of {path}: pass --format csv or --format parquet")
+
+
+def _date_format(values):
+    """The first DATE_FORMATS entry that parses every non-empty value, or None."""
+    values = values.dropna().astype(str)
+    values = values[values.str.strip() != ""]
+    if values.empty:
+        return None
+    for date_format in DATE_FORMATS:
+        try:
+            pd.to_datetime(values, format=date_format)
+        except (ValueError, TypeError):
+            continue
+        return date_format
+    return None
+
+
+def infer_schema(sample, date_format=None):
+    """
+    Column types from the first chunk: {"dtypes": {column: dtype}, "dates": {column: format}}.
+
+    Floats and text are pinned so later chunks are not re-inferred (and
+    cannot flip a column to another type); integer columns are left to
+    pandas, which turns them into floats in a chunk with missing values.
+    Text columns whose values all parse as dates become date columns.
+    """
+    dtypes = {}
+    dates = {}
+    for column, dtype in sample.dtypes.items():
+        if pd.api.types.is_float_dtype(dtype):
+            dtypes[column] = "float64"
+        elif pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+            hinted = any(hint in str(column).lower() for hint in DATE_NAME_HINTS)
+            found = date_format if date_format and hinted else _date_format(sample[column])
+            if found:
+                dates[column] = found
+            dtypes[column] = "object"
+    return {"dtypes": dtypes, "dates": dates}
+
+
+def iter_csv_chunks(path, chunk_size, skip_rows=0, schema=None, date_format=None):
+    """(schema, chunks): DataFrames of chunk_size rows after skip_rows, typed by schema."""
+    if schema is None:
+        schema = infer_schema(pd.read_csv(path, nrows=chunk_size), date_format)
+
+    def chunks():
+        reader = pd.read_csv(
+            path,
+            chunksize=chunk_size,
+            dtype=schema["dtypes"],
+            skiprows=range(1, skip_rows + 1) if skip_rows else None,
+        )
+        for chunk in reader:
+            yield chunk
+
+    return schema, chunks()
+
+
+def iter_parquet_chunks(path, chunk_size, skip_rows=0, schema=None, date_format=None):
+    """(schema, chunks) for a Parquet file; whole row groups before skip_rows are never read."""
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    row_groups = []
+    offset = 0
+    first_group_start = None
+    for index in range(parquet.metadata.num_row_groups):
+        rows = parquet.metadata.row_group(index).num_rows
+        if offset + rows > skip_rows:
+            row_groups.append(index)
+            if first_group_start is None:
+                first_group_start = offset
+        offset += rows
+
+    if schema is None:
+        first = next(parquet.iter_batches(batch_size=chunk_size), None)
+        sample = first.to_pandas() if first is not None else pd.DataFrame()
+        schema = infer_schema(sample, date_format)
+        # Parquet keeps its own types: only text columns holding dates need converting.
+        schema["dtypes"] = {}
+
+    def chunks():
+        if not row_groups:
+            return
+        to_skip = skip_rows - first_group_start
+        for batch in parquet.iter_batches(batch_size=chunk_size, row_groups=row_groups):
+            chunk = batch.to_pandas()
+            if to_skip:
+                dropped = min(to_skip, len(chunk))
+                chunk = chunk.iloc[dropped:]
+                to_skip -= dropped
+            if len(chunk):
+                yield chunk
+
+    return schema, chunks()
+
+
+def prepare_chunk(chunk, schema, rename=None):
+    """Rename, parse dates and sanitize one chunk; returns flat records with missing values left out."""
+    if rename:
+        chunk = chunk.rename(columns=rename)
+    for column, date_format in schema["dates"].items():
+        column = (rename or {}).get(column, column)
+        if column in chunk.columns:
+            chunk[column] = pd.to_datetime(chunk[column], format=date_format, errors="coerce")
+    chunk = sanitize_market_batch(chunk)
+    records = chunk.to_dict(orient="records")
+    # value == value is False for NaN and NaT.
+    return [
+        {key: value for key, value in record.items() if value is not None and value == value}
+        for record in records
+    ]
+
+
+class ImportCheckpoint:
+    """
+    Progress of one import, saved as JSON next to the source file.
+
+    It matches a later run only when the file (path, size, mtime), the
+    target collection and the mode are the same; otherwise the import
+    starts from the top.
+    """
+
+    def __init__(self, path, source, collection_name, mode):
+        self.path = Path(path)
+        stat = Path(source).stat()
+        self.identity = {
+            "source": str(Path(source).resolve()),
+            "size": stat.st_size,
+            "mtime": int(stat.st_mtime),
+            "collection": collection_name,
+            "mode": mode,
+        }
+        self.state = {"rows_done": 0, "written": 0, "started": int(time.time()), "schema": None}
+
+    def load(self):
+        """True when a matching checkpoint was found and loaded."""
+        try:
+            saved = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return False
+        if saved.get("identity") != self.identity:
+            return False
+        self.state.update(saved.get("state", {}))
+        return True
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(f"{self.path}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"identity": self.identity, "state": self.state}, default=str))
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        self.path.unlink(missing_ok=True)
+
+
+def row_ids(source, started, first_row, count):
+    """
+    Deterministic ObjectIds for rows first_row .. first_row+count-1: the
+    import start time, 4 bytes of the source path hash and the row number.
+    """
+    prefix = struct.pack(">I", started & 0xFFFFFFFF) + hashlib.sha256(str(source).encode()).digest()[:4]
+    return [ObjectId(prefix + struct.pack(">I", row & 0xFFFFFFFF)) for row in range(first_row, first_row + count)]
+
+
+def import_file(
+    path,
+    collection,
+    file_format=None,
+    mode="replace",
+    chunk_size=IMPORT_CHUNK_SIZE,
+    workers=IMPORT_WORKERS,
+    batch_size=1000,
+    rename=None,
+    date_format=None,
+    checkpoint_path=None,
+    restart=False,
+):
+    """
+    Import a CSV or Parquet file into collection, a chunk at a time.
+
+    mode="replace" loads into the shadow collection and swaps it in at the
+    end (time-series collections are cleared and filled in place instead);
+    mode="append" adds the rows to collection. The checkpoint
+    (`<file>.import.json` unless checkpoint_path is given) is removed once
+    the import completes. Returns a report with the rows read, the
+    documents inserted, the seconds taken and the writer's report.
+    """
+    if mode not in ("replace", "append"):
+        raise ValueError(f"Unknown import mode: {mode}")
+    file_format = file_format or detect_format(path)
+    checkpoint = ImportCheckpoint(checkpoint_path or f"{path}.import.json", path, collection.name, mode)
+    resumed = not restart and checkpoint.load()
+    state = checkpoint.state
+
+    in_place = mode == "append" or is_timeseries(collection)
+    target = collection if in_place else shadow_collection(collection)
+    if not resumed:
+        # A fresh replace starts from an empty target; a resumed one keeps what it loaded.
+        if mode == "replace" and in_place:
+            collection.delete_many({})
+        elif mode == "replace":
+            target.drop()
+        checkpoint.save()
+    elif state["rows_done"]:
+        print(f"⏩ Resuming after row {state['rows_done']:,} ({state['written']:,} documents already written)")
+    if resumed and is_timeseries(target):
+        # No unique _id to reject the half-written chunk: remove its rows before rewriting them.
+        first, last = (row_ids(checkpoint.identity["source"], state["started"], row, 1)[0]
+                       for row in (state["rows_done"], 0xFFFFFFFF))
+        target.delete_many({"_id": {"$gte": first, "$lte": last}})
+
+    iter_chunks = iter_parquet_chunks if file_format == "parquet" else iter_csv_chunks
+    schema, chunks = iter_chunks(path, chunk_size, skip_rows=state["rows_done"],
+                                 schema=state["schema"], date_format=date_format)
+    state["schema"] = schema
+
+    writer = BulkWriter(target, workers=workers, batch_size=batch_size)
+    started = time.perf_counter()
+    rows_read = 0
+
+    def write_chunk(documents, rows_after):
+        writer.write(documents)
+        writer.check()
+        state["rows_done"] = rows_after
+        state["written"] += len(documents)
+        checkpoint.save()
+
+    # One chunk is written while the next one is read and sanitized.
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="import-write") as executor:
+        pending = None
+        next_row = state["rows_done"]
+        for chunk in chunks:
+            records = prepare_chunk(chunk, schema, rename)
+            ids = row_ids(checkpoint.identity["source"], state["started"], next_row, len(records))
+            for record, _id in zip(records, ids):
+                record["_id"] = _id
+            documents = to_storage_documents(target, records)
+            next_row += len(chunk)
+            rows_read += len(chunk)
+            if pending is not None:
+                pending.result()
+            pending = executor.submit(write_chunk, documents, next_row)
+            elapsed = time.perf_counter() - started
+            print(f"   📥 {next_row:,} rows read ({rows_read / elapsed:,.0f} rows/s)")
+        if pending is not None:
+            pending.result()
+
+    index_seconds = None
+    if not in_place:
+        try:
+            index_seconds = swap_in_shadow(collection, target, state["written"])
+        except RuntimeError:
+            # The shadow no longer matches the checkpoint: the next run has to start over.
+            target.drop()
+            checkpoint.clear()
+            raise
+    refresh_derived_data(collection)
+    checkpoint.clear()
+
+    report = writer.report()
+    return {
+        "rows_read": rows_read,
+        "rows_total": state["rows_done"],
+        "inserted": report["inserted"],
+        "skipped_duplicates": report["duplicates"],
+        "resumed": resumed,
+        "seconds": round(time.perf_counter() - started, 3),
+        "index_seconds": round(index_seconds, 3) if index_seconds is not None else None,
+        "writer": report,
+    }
+
+
+def _parse_rename(values):
+    rename = {}
+    for value in values or []:
+        old, separator, new = value.partition("=")
+        if not separator or not old or not new:
+            raise argparse.ArgumentTypeError(f"--rename expects old=new, got {value!r}")
+        rename[old] = new
+    return rename
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a CSV or Parquet sales file into MongoDB in chunks")
+    parser.add_argument("path", help="CSV (optionally .csv.gz) or Parquet file")
+    parser.add_argument("--format", choices=("csv", "parquet"), help="Default: from the file extension")
+    parser.add_argument("--collection", help="Target collection (default: the sales collection under SALES_STORAGE)")
+    parser.add_argument("--mode", choices=("replace", "append"), default="replace")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE, help="Rows read per chunk")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Initial insert batch size (adapts while writing)")
+    parser.add_argument("--workers", type=int, default=IMPORT_WORKERS, help="Concurrent insert batches")
+    parser.add_argument("--rename", nargs="*", metavar="OLD=NEW", help="Rename columns, e.g. demand=quantity")
+    parser.add_argument("--date-format", help="strftime format of the date columns (default: inferred)")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <path>.import.json)")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint and start over")
+    args = parser.parse_args()
+
+    try:
+        rename = _parse_rename(args.rename)
+    except argparse.ArgumentTypeError as error:
+        parser.error(str(error))
+
+    from pymongo import MongoClient
+
+    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))
+    database = client["market_analyzer"]
+    collection = database[args.collection] if args.collection else get_sales_collection(database)
+
+    print("\n" + "=" * 70)
+    print(f"📥 BULK IMPORT {args.path} → market_analyzer.{collection.name} ({args.mode})")
+    print("=" * 70)
+    report = import_file(
+        args.path,
+        collection,
+        file_format=args.format,
+        mode=args.mode,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        rename=rename,
+        date_format=args.date_format,
+        checkpoint_path=args.checkpoint,
+        restart=args.restart,
+    )
+    print(f"✅ Imported {report['rows_read']:,} rows in {report['seconds']:.1f}s"
+          f"{' (resumed)' if report['resumed'] else ''}")
+    if report["skipped_duplicates"]:
+        print(f"   ⏭️  {report['skipped_duplicates']:,} rows were already stored before the interruption")
+    if report["index_seconds"] is not None:
+        print(f"   🗂️  Indexes built in {report['index_seconds']:.1f}s, then swapped in")
+    print_write_report(report["writer"])
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
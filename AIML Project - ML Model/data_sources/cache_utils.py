@@ -0,0 +1,56 @@
+"""Small in-process caches shared by the API and data quality helpers."""
+
+import threading
+import time
+
+from monitoring.metrics import record_cache_lookup
+
+
+class TTLCache:
+    """
+    Thread-safe dictionary cache whose entries expire after ``ttl`` seconds.
+    Oldest entries are evicted first once ``maxsize`` is reached. Named caches
+    report hits and misses to the metrics registry.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, ttl=60, maxsize=1024, name=None):
+        self.ttl = ttl
+        self.name = name
+        self.maxsize = maxsize
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                entry = None
+        if self.name:
+            record_cache_lookup(self.name, hit=entry is not None)
+        return default if entry is None else entry[1]
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.maxsize:
+                oldest_key = min(self._entries, key=lambda item: self._entries[item][0])
+                del self._entries[oldest_key]
+            self._entries[key] = (expires_at, value)
+
+    def get_or_set(self, key, factory, ttl=None):
+        """Return the cached value for key, computing it with factory() on a miss."""
+        value = self.get(key, self._MISSING)
+        if value is self._MISSING:
+            value = factory()
+            self.set(key, value, ttl=ttl)
+        return value
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
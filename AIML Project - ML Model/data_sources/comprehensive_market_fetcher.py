@@ -2,19 +2,23 @@
 Comprehensive market data fetcher with multiple fallback strategies.
 Combines government APIs, free APIs, and realistic simulation.
 """
-import requests
+from data_sources import http_cache
 import random
 from datetime import datetime, timedelta
 from pymongo import MongoClient
 import os
 from dotenv import load_dotenv
-from data_sources.mongodb_utils import replace_collection_with_batches
+from data_sources.agmarknet_bulk import fetch_agmarknet_bulk
+from data_sources.ingestion_pipeline import print_stage_report, stream_replace_products
+from data_sources.sales_storage import get_sales_collection
 from data_sources.price_catalog import (
     deterministic_price,
     deterministic_quantity,
     deterministic_weather,
     infer_category,
+    simulate_market,
 )
+from data_sources.product_catalog import TRACKED_PRODUCTS
 
 load_dotenv()
 
@@ -31,75 +35,29 @@ class ComprehensiveMarketFetcher:
         self.mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
         self.client = MongoClient(self.mongo_uri)
         self.db = self.client["market_analyzer"]
-        self.collection = self.db["sales"]
+        self.collection = get_sales_collection(self.db)
         
         self.agmarknet_key = os.getenv("AGMARKNET_API_KEY", "")
         self.usda_key = os.getenv("USDA_API_KEY", "")
         
-        from data_sources.weather_fetcher import WeatherFetcher
-        self.weather_fetcher = WeatherFetcher()
+        from data_sources.weather_cache import get_weather_cache
+        self.weather_cache = get_weather_cache(self.db)
         self.current_weather = None
+        self.simulation = None
+        self.agmarknet_bulk = None
         
-        self.products_180 = [
-            "Apple", "Banana", "Orange", "Mango", "Grape", "Strawberry", "Watermelon", 
-            "Pineapple", "Papaya", "Guava", "Pomegranate", "Kiwi", "Lemon", "Lime", 
-            "Peach", "Plum", "Cherry", "Apricot", "Pear", "Lychee", "Dragon Fruit", 
-            "Passion Fruit", "Avocado", "Coconut", "Dates", "Fig", "Jackfruit", 
-            "Custard Apple", "Sapota", "Mulberry",
-            
-            "Tomato", "Potato", "Onion", "Carrot", "Cabbage", "Cauliflower", "Brinjal", 
-            "Cucumber", "Spinach", "Pumpkin", "Bottle Gourd", "Bitter Gourd", "Ridge Gourd", 
-            "Snake Gourd", "Ash Gourd", "Drumstick", "Okra", "Capsicum", "Chilli", 
-            "Ginger", "Garlic", "Beetroot", "Radish", "Turnip", "Sweet Potato", "Yam", 
-            "Tapioca", "Colocasia", "Elephant Yam", "Cluster Beans", "French Beans", 
-            "Broad Beans", "Green Peas", "Cowpea", "Ivy Gourd", "Pointed Gourd", 
-            "Tinda", "Parwal", "Karela", "Tori", "Ghiya", "Kaddu", "Lauki", "Torai", 
-            "Parval", "Kundru", "Arbi", "Kachalu", "Jimikand", "Suran",
-            
-            "Coriander Leaves", "Mint Leaves", "Curry Leaves", "Fenugreek Leaves", 
-            "Amaranth Leaves", "Colocasia Leaves", "Mustard Leaves", "Lettuce", 
-            "Celery", "Parsley", "Basil", "Dill", "Rosemary", "Thyme", "Oregano",
-            
-            "Broccoli", "Zucchini", "Asparagus", "Artichoke", "Brussels Sprouts", 
-            "Kale", "Bok Choy", "Swiss Chard", "Collard Greens", "Arugula", 
-            "Watercress", "Endive", "Radicchio", "Fennel", "Leek", "Shallot", 
-            "Spring Onion", "Chives", "Scallion",
-            
-            "Bell Pepper Red", "Bell Pepper Yellow", "Bell Pepper Green", "Jalapeno", 
-            "Habanero", "Serrano", "Poblano", "Anaheim", "Cayenne",
-            
-            "Baby Corn", "Sweet Corn", "Corn on Cob", "Baby Carrot", "Cherry Tomato", 
-            "Grape Tomato", "Roma Tomato", "Beefsteak Tomato", "Heirloom Tomato",
-            
-            "Red Cabbage", "Savoy Cabbage", "Napa Cabbage", "Chinese Cabbage", 
-            "Purple Cauliflower", "Romanesco", "Broccoflower",
-            
-            "White Radish", "Black Radish", "Red Radish", "Daikon", "Horseradish",
-            
-            "Red Onion", "White Onion", "Yellow Onion", "Pearl Onion", "Vidalia Onion",
-            
-            "Russet Potato", "Red Potato", "White Potato", "Yellow Potato", 
-            "Purple Potato", "Fingerling Potato", "New Potato",
-            
-            "Green Apple", "Red Apple", "Gala Apple", "Fuji Apple", "Granny Smith", 
-            "Honeycrisp", "Golden Delicious",
-            
-            "Cavendish Banana", "Red Banana", "Plantain", "Baby Banana",
-            
-            "Navel Orange", "Blood Orange", "Mandarin", "Tangerine", "Clementine", 
-            "Satsuma",
-            
-            "Alphonso Mango", "Kesar Mango", "Dasheri Mango", "Langra Mango", 
-            "Totapuri Mango", "Badami Mango", "Chausa Mango", "Safeda Mango",
-            
-            "Green Grape", "Red Grape", "Black Grape", "Seedless Grape", "Cotton Candy Grape"
-        ]
+        self.products_180 = list(TRACKED_PRODUCTS)
     
     def fetch_agmarknet_data(self, commodity):
         """Fetch from Agmarknet API with proper authentication"""
         if not self.agmarknet_key or self.agmarknet_key == "not_required":
             return None
         
+        if self.agmarknet_bulk is not None:
+            # Bulk mode: the records were already fetched and split by commodity.
+            records = self.agmarknet_bulk.get(commodity)
+            return self._parse_agmarknet_data({"records": records}, commodity) if records else None
+        
         try:
             url = "https://api.data.gov.in/resource/9ef84268-d588-465a-a308-a864a43d0070"
             params = {
@@ -113,7 +71,7 @@ class ComprehensiveMarketFetcher:
                 "Accept": "application/json"
             }
             
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            response = http_cache.get(url, params=params, headers=headers, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -137,10 +95,10 @@ class ComprehensiveMarketFetcher:
             }
             
             if api_key and api_key != "not_required":
-                response = requests.get(url, params=params, headers=headers, 
+                response = http_cache.get(url, params=params, headers=headers, 
                                       auth=(api_key, ''), timeout=10)
             else:
-                response = requests.get(url, params=params, headers=headers, timeout=10)
+                response = http_cache.get(url, params=params, headers=headers, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -156,14 +114,18 @@ class ComprehensiveMarketFetcher:
         records = []
         
         if self.current_weather is None:
-            self.current_weather = self.weather_fetcher.fetch_average_weather()
+            self.current_weather = self.weather_cache.get_average()
+        
+        simulation = self.simulation
+        if simulation is None or commodity not in simulation.index or len(simulation.day_offsets) < days:
+            simulation = simulate_market([commodity], range(days))
+        series = simulation.for_product(commodity)
+        category = infer_category(commodity)
         
         for day in range(days):
             date = (datetime.now() - timedelta(days=day)).replace(hour=12, minute=0, second=0, microsecond=0)
-            category = infer_category(commodity)
-            price = deterministic_price(commodity, day_offset=day)
-            quantity = deterministic_quantity(commodity, day_offset=day)
-            weather = deterministic_weather(commodity)
+            price = series["price"][day]
+            quantity = series["quantity"][day]
             
             records.append({
                 "date": date,
@@ -185,6 +147,7 @@ class ComprehensiveMarketFetcher:
     def _parse_agmarknet_data(self, data, commodity):
         """Parse Agmarknet response"""
         records = []
+        weather = deterministic_weather(commodity)
         for record in data.get("records", [])[:7]:
             try:
                 price = deterministic_price(commodity, 0, record.get("modal_price", 50))
@@ -197,8 +160,8 @@ class ComprehensiveMarketFetcher:
                     "price": price,
                     "unit": "kg",
                     "stock": quantity * 1.5,
-                    "temperature": deterministic_weather(commodity)["temperature"],
-                    "rainfall": deterministic_weather(commodity)["rainfall"],
+                    "temperature": weather["temperature"],
+                    "rainfall": weather["rainfall"],
                     "source": "agmarknet_api",
                     "confidence": "high",
                     "seasonal": False
@@ -210,17 +173,19 @@ class ComprehensiveMarketFetcher:
     def _parse_usda_data(self, data, commodity):
         """Parse USDA response"""
         records = []
+        weather = deterministic_weather(commodity)
+        quantity = deterministic_quantity(commodity, 0)
+        price = deterministic_price(commodity, 0)
         for item in data.get("results", [])[:7]:
             try:
-                weather = deterministic_weather(commodity)
                 records.append({
                     "date": datetime.now().replace(hour=12, minute=0, second=0, microsecond=0),
                     "product": commodity,
                     "category": infer_category(commodity),
-                    "quantity": deterministic_quantity(commodity, 0),
-                    "price": deterministic_price(commodity, 0),
+                    "quantity": quantity,
+                    "price": price,
                     "unit": "kg",
-                    "stock": deterministic_quantity(commodity, 0) * 1.5,
+                    "stock": quantity * 1.5,
                     "temperature": weather["temperature"],
                     "rainfall": weather["rainfall"],
                     "source": "usda_api",
@@ -260,47 +225,42 @@ class ComprehensiveMarketFetcher:
         print(f"📅 Historical days: {days}")
         
         print("\n🌤️  Fetching real-time weather data...")
-        self.current_weather = self.weather_fetcher.fetch_average_weather()
+        self.current_weather = self.weather_cache.get_average()
         print(f"   Temperature: {self.current_weather['temperature']}°C")
         print(f"   Rainfall: {self.current_weather['rainfall']} mm")
         print(f"   Humidity: {self.current_weather.get('humidity', 'N/A')}%")
         
         print("=" * 70 + "\n")
         
-        all_records = []
-        success_count = 0
+        # Simulated fallbacks for every product come from one vectorized pass
+        self.simulation = simulate_market(self.products_180, range(days))
+        self.agmarknet_bulk = fetch_agmarknet_bulk(self.agmarknet_key, self.products_180, days=days)
         
-        for i, product in enumerate(self.products_180, 1):
-            print(f"[{i}/{len(self.products_180)}] {product}...", end=" ")
-            
-            try:
-                records = self.fetch_product_data(product, days)
-                if records:
-                    all_records.extend(records)
-                    success_count += 1
-            except Exception as e:
-                print(f"❌ Error: {str(e)}")
+        # Each product's records are written as soon as its batch fills, instead of after all products.
+        try:
+            report = stream_replace_products(self.collection, self.products_180,
+                                             lambda product: self.fetch_product_data(product, days))
+        except Exception as e:
+            print(f"\n❌ Failed to save to MongoDB: {str(e)}")
+            return 0
         
-        if all_records:
-            try:
-                saved_count = replace_collection_with_batches(self.collection, all_records, batch_size=100)
-                
-                print("\n" + "=" * 70)
-                print(f"✅ DATA UPDATE COMPLETE")
-                print("=" * 70)
-                print(f"📦 Products processed: {success_count}/{len(self.products_180)}")
-                print(f"💾 Records saved: {saved_count}")
-                print(f"📊 Average records per product: {saved_count // success_count if success_count > 0 else 0}")
-                print(f"🌤️  Weather: {self.current_weather['temperature']}°C, {self.current_weather['rainfall']}mm rain")
-                print("=" * 70 + "\n")
-                
-                return saved_count
-            except Exception as e:
-                print(f"\n❌ Failed to save to MongoDB: {str(e)}")
-                return 0
-        else:
+        saved_count = report["saved"]
+        success_count = report["products_written"]
+        if not saved_count:
             print("\n⚠️  No records to save")
             return 0
+        
+        print("\n" + "=" * 70)
+        print(f"✅ DATA UPDATE COMPLETE")
+        print("=" * 70)
+        print(f"📦 Products processed: {success_count}/{len(self.products_180)}")
+        print(f"💾 Records saved: {saved_count}")
+        print(f"📊 Average records per product: {saved_count // success_count if success_count > 0 else 0}")
+        print(f"🌤️  Weather: {self.current_weather['temperature']}°C, {self.current_weather['rainfall']}mm rain")
+        print_stage_report(report)
+        print("=" * 70 + "\n")
+        
+        return saved_count
 
 def main():
     fetcher = ComprehensiveMarketFetcher()
@@ -7,31 +7,109 @@ import pandas as pd
 from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
+from data_sources.cache_utils import TTLCache
+from data_sources.mongodb_utils import get_collection_stats
+from data_sources.product_catalog import TRACKED_PRODUCTS
+from data_sources.rollups import rollup_collection, rollups_available
+from data_sources.sales_schema import decode_values, decoded_field
+from data_sources.sales_storage import translate_pipeline, get_sales_collection
+from monitoring.metrics import timed_query
 load_dotenv()
+
+# Summaries are keyed by the ingestion write_generation, so they stay valid until the next write.
+summary_cache = TTLCache(ttl=int(os.getenv("QUALITY_REPORT_TTL", 3600)), maxsize=8, name="quality_summary")
+
+def raw_summary_pipeline(database):
+    """The summary over raw rows, grouping plain and compact values of a product or source together."""
+    return [
+        {"$facet": {
+            "totals": [{"$group": {"_id": None, "records": {"$sum": 1},
+                                   "oldest": {"$min": "$date"}, "newest": {"$max": "$date"}}}],
+            "products": [{"$group": {"_id": decoded_field(database, "product")}}],
+            "sources": [{"$group": {"_id": decoded_field(database, "source"), "records": {"$sum": 1}}}],
+        }}
+    ]
+
+ROLLUP_SUMMARY_PIPELINE = [
+    {"$facet": {
+        "totals": [{"$group": {"_id": None, "records": {"$sum": "$records"},
+                               "oldest": {"$min": "$first_date"}, "newest": {"$max": "$last_date"}}}],
+        "products": [{"$group": {"_id": "$product"}}],
+        "sources": [
+            {"$unwind": "$sources"},
+            {"$group": {"_id": "$sources.source", "records": {"$sum": "$sources.records"}}},
+        ],
+    }}
+]
+
+
+def _as_datetime(value):
+    if isinstance(value, str):
+        return pd.to_datetime(value)
+    return value
+
+
 class DataQualityChecker:
     """
     Checks quality and freshness of market data in MongoDB.
+
+    Every check is derived from one summary (record count, oldest and newest
+    date, products, per-source counts) fetched with a single $facet
+    aggregation over the daily rollups, or over the raw rows until rollups
+    exist. The summary is cached until the next ingestion write.
     """
     def __init__(self):
         self.mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
         self.client = MongoClient(self.mongo_uri)
         self.db = self.client["market_analyzer"]
-        self.collection = self.db["sales"]
+        self.collection = get_sales_collection(self.db)
+    def _fetch_summary(self):
+        with timed_query("quality_summary"):
+            if rollups_available(self.collection):
+                result = next(rollup_collection(self.collection, "daily").aggregate(ROLLUP_SUMMARY_PIPELINE))
+            else:
+                result = next(self.collection.aggregate(translate_pipeline(self.collection, raw_summary_pipeline(self.db))))
+        totals = result["totals"][0] if result["totals"] else {}
+        sources = {}
+        for item in result["sources"]:
+            source = decode_values(self.db, "source", [item["_id"]])[0]
+            sources[source] = sources.get(source, 0) + item["records"]
+        return {
+            "total_records": totals.get("records", 0),
+            "oldest": _as_datetime(totals.get("oldest")),
+            "newest": _as_datetime(totals.get("newest")),
+            "products": decode_values(self.db, "product", [item["_id"] for item in result["products"]]),
+            "sources": sources,
+        }
+    def summary(self):
+        """
+        Collection summary shared by every check, from one aggregation.
+        """
+        stats = get_collection_stats(self.collection) or {}
+        key = (self.collection.name, stats.get("write_generation"))
+        return summary_cache.get_or_set(key, self._fetch_summary)
+    def report(self):
+        """
+        Freshness, completeness, sources and statistics in one round-trip.
+        """
+        return {
+            "freshness": self.check_data_freshness(),
+            "completeness": self.check_data_completeness(),
+            "sources": self.check_data_sources(),
+            "statistics": self.get_statistics()
+        }
     def check_data_freshness(self):
         """
         Check how recent the data is.
         """
         try:
-            latest = self.collection.find_one(sort=[("date", -1)])
-            if not latest:
+            latest_date = self.summary()["newest"]
+            if latest_date is None:
                 return {
                     "status": "empty",
                     "message": "No data in database",
                     "last_update": None
                 }
-            latest_date = latest.get("date")
-            if isinstance(latest_date, str):
-                latest_date = pd.to_datetime(latest_date)
             age = datetime.now() - latest_date
             if age.days == 0:
                 status = "fresh"
@@ -59,11 +137,12 @@ class DataQualityChecker:
             }
     def check_data_completeness(self):
         """
-        Check if all required products have data.
+        Check if every tracked catalog product has data.
+        Day-level gaps are reported by data_sources.gap_detector.
         """
-        required_products = ["Tomato", "Potato", "Onion", "Apple", "Banana"]
+        required_products = list(TRACKED_PRODUCTS)
         try:
-            products = self.collection.distinct("product")
+            products = self.summary()["products"]
             missing = [p for p in required_products if p not in products]
             extra = [p for p in products if p not in required_products]
             coverage = (len(products) / len(required_products)) * 100
@@ -85,14 +164,11 @@ class DataQualityChecker:
         Check which data sources are being used.
         """
         try:
-            sources = self.collection.distinct("source")
-            source_counts = {}
-            for source in sources:
-                count = self.collection.count_documents({"source": source})
-                source_counts[source] = count
+            distribution = dict(self.summary()["sources"])
+            sources = list(distribution)
             return {
                 "sources": sources,
-                "source_distribution": source_counts,
+                "source_distribution": distribution,
                 "total_sources": len(sources)
             }
         except Exception as e:
@@ -105,17 +181,11 @@ class DataQualityChecker:
         Get overall data statistics.
         """
         try:
-            total_records = self.collection.count_documents({})
-            oldest = self.collection.find_one(sort=[("date", 1)])
-            newest = self.collection.find_one(sort=[("date", -1)])
-            oldest_date = oldest.get("date") if oldest else None
-            newest_date = newest.get("date") if newest else None
-            if isinstance(oldest_date, str):
-                oldest_date = pd.to_datetime(oldest_date)
-            if isinstance(newest_date, str):
-                newest_date = pd.to_datetime(newest_date)
+            summary = self.summary()
+            oldest_date = summary["oldest"]
+            newest_date = summary["newest"]
             return {
-                "total_records": total_records,
+                "total_records": summary["total_records"],
                 "oldest_record": oldest_date.strftime("%Y-%m-%d") if oldest_date else None,
                 "newest_record": newest_date.strftime("%Y-%m-%d") if newest_date else None,
                 "date_range_days": (newest_date - oldest_date).days if oldest_date and newest_date else 0
@@ -142,7 +212,8 @@ class DataQualityChecker:
         print(f"   Coverage: {completeness['coverage_percent']}%")
         print(f"   Products: {completeness['total_products']}/{completeness['required_products']}")
         if completeness['missing_products']:
-            print(f"   Missing: {', '.join(completeness['missing_products'])}")
+            missing = completeness['missing_products']
+            print(f"   Missing: {', '.join(missing[:10])}{' ...' if len(missing) > 10 else ''}")
         sources = self.check_data_sources()
         print(f"\n🌐 Data Sources: {sources['total_sources']} active")
         for source, count in sources['source_distribution'].items():
@@ -0,0 +1,247 @@
+"""
+Bulk export of the sales history as Parquet or Arrow IPC.
+
+The history is read with a projected, date-ordered cursor and turned into
+Arrow record batches of EXPORT_CHUNK_SIZE rows. Every batch is encoded
+(one Parquet row group, or one IPC message) and handed on as bytes before
+the next one is read, so a multi-year export never has to be held in
+memory. The same generator feeds the /data/export endpoint and the CLI.
+
+Formats:
+    parquet  zstd-compressed Parquet file, one row group per chunk
+    arrow    Arrow IPC stream (application/vnd.apache.arrow.stream)
+
+Usage (from the "AIML Project - ML Model" directory):
+    python -m data_sources.exporter --output sales.parquet
+    python -m data_sources.exporter --format arrow --output tomato.arrows --product Tomato --start 2023-01-01
+    python -m data_sources.exporter --output agmarknet.parquet --source agmarknet --fields date product price
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from dotenv import load_dotenv
+
+from data_sources.sales_schema import decode_frame, match_values
+from data_sources.sales_storage import from_storage_documents, get_sales_collection, translate_field, translate_filter
+from monitoring.metrics import REGISTRY
+
+load_dotenv()
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "50000"))
+EXPORT_FORMATS = {
+    "parquet": {"media_type": "application/vnd.apache.parquet", "extension": "parquet"},
+    "arrow": {"media_type": "application/vnd.apache.arrow.stream", "extension": "arrows"},
+}
+EXPORT_SCHEMA = pa.schema([
+    ("date", pa.timestamp("ms")),
+    ("product", pa.string()),
+    ("category", pa.string()),
+    ("price", pa.float64()),
+    ("predicted_price", pa.float64()),
+    ("quantity", pa.float64()),
+    ("stock", pa.float64()),
+    ("temperature", pa.float64()),
+    ("rainfall", pa.float64()),
+    ("source", pa.string()),
+    ("unit", pa.string()),
+])
+EXPORT_FIELDS = tuple(EXPORT_SCHEMA.names)
+
+EXPORT_ROWS = REGISTRY.counter(
+    "export_rows_total",
+    "Rows written by bulk history exports.",
+    ("format",),
+)
+
+
+def export_filter(collection, products=None, start=None, end=None, sources=None):
+    """
+    find() filter for the export, translated for the collection's layout.
+    end is inclusive: a date without a time covers that whole day.
+    """
+    database = collection.database
+    query = {}
+    if products:
+        query["product"] = match_values(database, "product", list(products))
+    if sources:
+        query["source"] = match_values(database, "source", list(sources))
+    if start or end:
+        query["date"] = {}
+        if start:
+            query["date"]["$gte"] = start
+        if end:
+            if end == end.replace(hour=0, minute=0, second=0, microsecond=0):
+                query["date"]["$lt"] = end + timedelta(days=1)
+            else:
+                query["date"]["$lte"] = end
+    return translate_filter(collection, query)
+
+
+def export_schema(fields=None):
+    """EXPORT_SCHEMA restricted to fields, in the order given."""
+    if not fields:
+        return EXPORT_SCHEMA
+    unknown = [field for field in fields if field not in EXPORT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown export fields: {', '.join(unknown)} (available: {', '.join(EXPORT_FIELDS)})")
+    return pa.schema([EXPORT_SCHEMA.field(field) for field in fields])
+
+
+def _to_record_batch(database, documents, schema):
+    df = pd.DataFrame(from_storage_documents(documents))
+    decode_frame(database, df)
+    columns = {}
+    for field in schema:
+        values = df[field.name] if field.name in df.columns else pd.Series([None] * len(df), dtype=object)
+        if pa.types.is_timestamp(field.type):
+            values = pd.to_datetime(values, errors="coerce")
+        elif pa.types.is_floating(field.type):
+            values = pd.to_numeric(values, errors="coerce")
+        else:
+            values = values.astype(object).where(values.notna(), None).map(
+                lambda value: value if value is None else str(value))
+        columns[field.name] = values
+    return pa.RecordBatch.from_pandas(pd.DataFrame(columns), schema=schema, preserve_index=False)
+
+
+def iter_export_batches(collection, query=None, fields=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Arrow record batches of at most chunk_size rows matching query, oldest first."""
+    schema = export_schema(fields)
+    projection = {translate_field(collection, field): 1 for field in schema.names}
+    projection["_id"] = 0
+    cursor = collection.find(query or {}, projection).sort("date", 1).batch_size(min(chunk_size, 10000))
+    chunk = []
+    for document in cursor:
+        chunk.append(document)
+        if len(chunk) >= chunk_size:
+            yield _to_record_batch(collection.database, chunk, schema)
+            chunk = []
+    if chunk:
+        yield _to_record_batch(collection.database, chunk, schema)
+
+
+class _ChunkSink:
+    """Write-only file object whose buffered bytes are drained after every batch."""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def iter_export_bytes(collection, file_format="parquet", query=None, fields=None,
+                      chunk_size=EXPORT_CHUNK_SIZE, stats=None):
+    """
+    The encoded export as a stream of byte strings, one per chunk plus the
+    format's header and footer. An export with no matching rows is a valid
+    empty file. If given, the stats dict is kept up to date with the rows
+    and bytes produced so far.
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {file_format}")
+    schema = export_schema(fields)
+    sink = _ChunkSink()
+    if file_format == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    stats = stats if stats is not None else {}
+    stats.update(rows=0, bytes=0)
+    try:
+        for batch in iter_export_batches(collection, query, schema.names, chunk_size):
+            if file_format == "parquet":
+                writer.write_batch(batch, row_group_size=len(batch))
+            else:
+                writer.write_batch(batch)
+            stats["rows"] += batch.num_rows
+            EXPORT_ROWS.inc(batch.num_rows, format=file_format)
+            data = sink.drain()
+            if data:
+                stats["bytes"] += len(data)
+                yield data
+    finally:
+        writer.close()
+    data = sink.drain()
+    if data:
+        stats["bytes"] += len(data)
+        yield data
+
+
+def export_to_file(collection, path, file_format=None, query=None, fields=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Write the export to path; returns {"rows": ..., "bytes": ...}."""
+    file_format = file_format or ("arrow" if str(path).endswith((".arrow", ".arrows")) else "parquet")
+    stats = {}
+    with open(path, "wb") as output:
+        for data in iter_export_bytes(collection, file_format, query, fields, chunk_size, stats):
+            output.write(data)
+    return stats
+
+
+def parse_date(value):
+    """YYYY-MM-DD (or a full ISO timestamp) as a datetime, None for None."""
+    return datetime.fromisoformat(value) if value else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the sales history as Parquet or Arrow IPC")
+    parser.add_argument("--output", required=True, help="Destination file")
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), help="Default: from the extension (.arrow/.arrows → arrow)")
+    parser.add_argument("--product", nargs="*", help="Only these products")
+    parser.add_argument("--source", nargs="*", help="Only these sources, e.g. agmarknet simulated")
+    parser.add_argument("--start", help="First date, YYYY-MM-DD")
+    parser.add_argument("--end", help="Last date (inclusive), YYYY-MM-DD")
+    parser.add_argument("--fields", nargs="*", help=f"Columns to export (default: {' '.join(EXPORT_FIELDS)})")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE, help="Rows per row group / IPC batch")
+    args = parser.parse_args()
+
+    try:
+        start, end = parse_date(args.start), parse_date(args.end)
+        export_schema(args.fields)
+    except ValueError as error:
+        parser.error(str(error))
+
+    from pymongo import MongoClient
+
+    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))
+    collection = get_sales_collection(client["market_analyzer"])
+    query = export_filter(collection, products=args.product, start=start, end=end, sources=args.source)
+
+    print("\n" + "=" * 70)
+    print(f"📤 EXPORTING market_analyzer.{collection.name} → {args.output}")
+    print("=" * 70)
+    started = time.perf_counter()
+    stats = export_to_file(collection, args.output, args.format, query, args.fields, args.chunk_size)
+    elapsed = time.perf_counter() - started
+    rate = stats["rows"] / elapsed if elapsed else 0
+    print(f"✅ {stats['rows']:,} rows, {stats['bytes'] / 1e6:.2f} MB in {elapsed:.1f}s ({rate:,.0f} rows/s)")
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
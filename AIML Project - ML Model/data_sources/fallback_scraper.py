@@ -2,7 +2,7 @@
 Fallback web scraper for market data when APIs are unavailable.
 Scrapes public agricultural market websites.
 """
-import requests
+from data_sources import http_cache
 from bs4 import BeautifulSoup
 import pandas as pd
 from datetime import datetime
@@ -23,7 +23,7 @@ class FallbackScraper:
         """
         try:
             url = f"https://agmarknet.gov.in/SearchCmmMkt.aspx?Tx_Commodity={commodity}"
-            response = requests.get(url, headers=self.headers, timeout=15)
+            response = http_cache.get(url, headers=self.headers, timeout=15)
             if response.status_code == 200:
                 soup = BeautifulSoup(response.content, 'html.parser')
                 table = soup.find('table', {'id': 'cphBody_GridPriceData'})
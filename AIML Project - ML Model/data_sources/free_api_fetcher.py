@@ -2,13 +2,14 @@
 Free API fetcher using publicly available data sources.
 No authentication required.
 """
-import requests
+from data_sources import http_cache
 import random
 from datetime import datetime, timedelta
 from pymongo import MongoClient
 import os
 from dotenv import load_dotenv
 from data_sources.mongodb_utils import replace_collection_with_batches
+from data_sources.sales_storage import get_sales_collection
 from data_sources.price_catalog import (
     deterministic_price,
     deterministic_quantity,
@@ -27,7 +28,7 @@ class FreeAPIFetcher:
         self.mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
         self.client = MongoClient(self.mongo_uri)
         self.db = self.client["market_analyzer"]
-        self.collection = self.db["sales"]
+        self.collection = get_sales_collection(self.db)
         
         self.product_categories = {
             'fruits': ['apple', 'banana', 'orange', 'mango', 'grape', 'strawberry', 
@@ -49,7 +50,7 @@ class FreeAPIFetcher:
                 "date": "2020:2024"
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = http_cache.get(url, params=params, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -76,7 +77,7 @@ class FreeAPIFetcher:
                 "year": "2020,2021,2022,2023"
             }
             
-            response = requests.get(url, params=params, timeout=15)
+            response = http_cache.get(url, params=params, timeout=15)
             
             if response.status_code == 200:
                 data = response.json()
@@ -95,7 +96,7 @@ class FreeAPIFetcher:
         """
         try:
             url = "https://api.exchangerate-api.com/v4/latest/USD"
-            response = requests.get(url, timeout=10)
+            response = http_cache.get(url, timeout=10)
             
             if response.status_code == 200:
                 print(f"✅ Commodity API: Fetched exchange rates")
@@ -0,0 +1,304 @@
+"""
+Catalog-wide completeness and gap detection for the sales history.
+
+Builds a products x days presence bitmap for a date window, either from the
+daily rollups or from one projected scan of the raw rows, and reports
+missing products, missing days per product (as date ranges), stale
+products and duplicate (product, day, source) rows.
+
+The scan is processed a chunk of rows at a time with NumPy into fixed-size
+arrays: one byte per (product, day) cell for presence plus a uint16 row count
+per cell and source, so thousands of products over several years of history
+fit in a few tens of MB whatever the number of rows.
+
+Usage (from the "AIML Project - ML Model" directory):
+    python -m data_sources.gap_detector --days 365
+    python -m data_sources.gap_detector --days 90 --source raw --limit 20
+"""
+import argparse
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from data_sources.product_catalog import TRACKED_PRODUCTS
+from data_sources.rollups import rollup_collection, rollups_available
+from data_sources.sales_schema import decode_records
+from data_sources.sales_storage import from_storage_documents, get_sales_collection, translate_field
+
+load_dotenv()
+
+SCAN_CHUNK_ROWS = 100_000
+
+
+def _runs(days):
+    """Collapse sorted day indexes into [(first, last), ...] runs of consecutive days."""
+    if len(days) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(days) != 1)
+    starts = np.concatenate(([days[0]], days[breaks + 1]))
+    ends = np.concatenate((days[breaks], [days[-1]]))
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+class GapDetector:
+    """
+    Presence bitmap of expected products x days for the last `days` days.
+
+    Products are the tracked catalog products by default; products found in
+    the data but not expected get their own rows so they can be reported.
+    """
+
+    def __init__(self, collection, expected_products=None, days=90, end=None, stale_days=2):
+        self.collection = collection
+        self.expected = list(expected_products if expected_products is not None else TRACKED_PRODUCTS)
+        self.end = pd.Timestamp(end or datetime.now()).normalize()
+        self.start = self.end - pd.Timedelta(days=days - 1)
+        self.days = days
+        self.stale_days = stale_days
+
+        self.products = list(self.expected)
+        self._index = {product: position for position, product in enumerate(self.products)}
+        self.presence = np.zeros((len(self.products), days), dtype=bool)
+        self.sources = []
+        self._source_index = {}
+        # Rows per (product, day) cell, one matrix per source.
+        self.row_counts = []
+        self.rows_scanned = 0
+        self.method = None
+
+    def _product_ids(self, products):
+        distinct, inverse = np.unique(np.asarray(products, dtype=object).astype(str), return_inverse=True)
+        distinct_ids = np.empty(len(distinct), dtype=np.int64)
+        for position, product in enumerate(distinct.tolist()):
+            product_id = self._index.get(product)
+            if product_id is None:
+                product_id = self._index[product] = len(self.products)
+                self.products.append(product)
+            distinct_ids[position] = product_id
+        ids = distinct_ids[inverse.ravel()]
+        if len(self.products) > self.presence.shape[0]:
+            self.presence = self._grow(self.presence)
+            self.row_counts = [self._grow(counts) for counts in self.row_counts]
+        return ids
+
+    def _grow(self, matrix):
+        grown = np.zeros((len(self.products), self.days), dtype=matrix.dtype)
+        grown[:matrix.shape[0]] = matrix
+        return grown
+
+    def _source_ids(self, sources):
+        distinct, inverse = np.unique(np.asarray(sources, dtype=str), return_inverse=True)
+        distinct_ids = np.empty(len(distinct), dtype=np.int64)
+        for position, source in enumerate(distinct.tolist()):
+            source_id = self._source_index.get(source)
+            if source_id is None:
+                source_id = self._source_index[source] = len(self.sources)
+                self.sources.append(source)
+                self.row_counts.append(np.zeros((len(self.products), self.days), dtype=np.uint16))
+            distinct_ids[position] = source_id
+        return distinct_ids[inverse.ravel()]
+
+    def _day_offsets(self, dates):
+        days = pd.to_datetime(pd.Series(dates), errors="coerce").dt.normalize()
+        return ((days - self.start).dt.days).to_numpy(dtype=float)
+
+    def _add_chunk(self, products, dates, sources, counts=None):
+        offsets = self._day_offsets(dates)
+        keep = np.isfinite(offsets) & (offsets >= 0) & (offsets < self.days)
+        keep &= np.array([bool(product) for product in products], dtype=bool)
+        if not keep.any():
+            return
+        index = np.flatnonzero(keep)
+        product_ids = self._product_ids([products[position] for position in index])
+        source_ids = self._source_ids([str(sources[position] or "unknown") for position in index])
+        day_ids = offsets[index].astype(np.int64)
+        self.presence[product_ids, day_ids] = True
+
+        counts = np.ones(len(index), dtype=np.uint16) if counts is None else np.asarray(counts, dtype=np.uint16)[index]
+        for source_id in np.unique(source_ids):
+            selected = source_ids == source_id
+            np.add.at(self.row_counts[source_id], (product_ids[selected], day_ids[selected]), counts[selected])
+
+    def scan_raw(self):
+        """Fill the bitmap from one projected scan of the raw rows in the window."""
+        product_field = translate_field(self.collection, "product")
+        query = {"date": {"$gte": self.start.to_pydatetime(), "$lt": (self.end + pd.Timedelta(days=1)).to_pydatetime()}}
+        projection = {"_id": 0, product_field: 1, "date": 1, "source": 1}
+        cursor = self.collection.find(query, projection).batch_size(10_000)
+
+        chunk = []
+        for document in cursor:
+            chunk.append(document)
+            if len(chunk) >= SCAN_CHUNK_ROWS:
+                self._add_raw_chunk(chunk)
+                chunk = []
+        if chunk:
+            self._add_raw_chunk(chunk)
+        self.method = "raw"
+        return self
+
+    def _add_raw_chunk(self, documents):
+        records = decode_records(self.collection.database, from_storage_documents(documents), ["product", "source"])
+        self.rows_scanned += len(records)
+        self._add_chunk(
+            [record.get("product") for record in records],
+            [record.get("date") for record in records],
+            [record.get("source") for record in records],
+        )
+
+    def scan_rollups(self):
+        """Fill the bitmap from the daily rollups; duplicates come from their per-source counts."""
+        rollup = rollup_collection(self.collection, "daily")
+        query = {"period": {"$gte": self.start.to_pydatetime(), "$lte": self.end.to_pydatetime()}}
+        products, dates, sources, counts = [], [], [], []
+        for document in rollup.find(query, {"_id": 0, "product": 1, "period": 1, "sources": 1}):
+            self.rows_scanned += 1
+            for item in document.get("sources") or [{"source": None, "records": 1}]:
+                products.append(document.get("product"))
+                dates.append(document.get("period"))
+                sources.append(item.get("source"))
+                counts.append(item.get("records", 1))
+        if products:
+            self._add_chunk(products, dates, sources, counts)
+        self.method = "rollups"
+        return self
+
+    def scan(self, source="auto"):
+        if source == "rollups" or (source == "auto" and rollups_available(self.collection)):
+            return self.scan_rollups()
+        return self.scan_raw()
+
+    def _duplicates(self):
+        """(product_id, day, source_id, rows) for every cell with more than one row."""
+        cells = [np.empty((0, 4), dtype=np.int64)]
+        for source_id, counts in enumerate(self.row_counts):
+            product_ids, day_ids = np.nonzero(counts > 1)
+            cells.append(np.column_stack([
+                product_ids, day_ids, np.full(len(product_ids), source_id), counts[product_ids, day_ids],
+            ]).astype(np.int64))
+        return np.concatenate(cells)
+
+    def report(self, limit=50):
+        """Gap report as plain JSON-friendly data; per-product lists are capped at `limit` entries."""
+        expected_count = len(self.expected)
+        expected = self.presence[:expected_count]
+        present_days = expected.sum(axis=1)
+        dates = pd.date_range(self.start, self.end, freq="D")
+
+        def day(offset):
+            return dates[offset].strftime("%Y-%m-%d")
+
+        missing_products = [self.products[position] for position in np.flatnonzero(present_days == 0)]
+        gaps = []
+        for position in np.flatnonzero((present_days > 0) & (present_days < self.days)):
+            missing = np.flatnonzero(~expected[position])
+            gaps.append({
+                "product": self.products[position],
+                "missing_days": int(len(missing)),
+                "ranges": [[day(first), day(last)] for first, last in _runs(missing)][:limit],
+            })
+        gaps.sort(key=lambda item: item["missing_days"], reverse=True)
+
+        # Last day with data, per product; -1 for products with no rows in the window.
+        last_seen = np.where(
+            self.presence.any(axis=1),
+            self.days - 1 - np.argmax(self.presence[:, ::-1], axis=1),
+            -1,
+        )
+        stale = [
+            {"product": self.products[position], "last_seen": day(last_seen[position]),
+             "days_behind": int(self.days - 1 - last_seen[position])}
+            for position in np.flatnonzero((last_seen >= 0) & (last_seen < self.days - 1 - self.stale_days))
+        ]
+        stale.sort(key=lambda item: item["days_behind"], reverse=True)
+
+        duplicates = self._duplicates()
+        by_source = {}
+        for source_id in np.unique(duplicates[:, 2]) if len(duplicates) else []:
+            selected = duplicates[duplicates[:, 2] == source_id]
+            by_source[self.sources[source_id]] = {
+                "cells": int(len(selected)),
+                "extra_rows": int((selected[:, 3] - 1).sum()),
+            }
+        examples = [
+            {"product": self.products[product_id], "date": day(day_id),
+             "source": self.sources[source_id], "rows": int(rows)}
+            for product_id, day_id, source_id, rows in duplicates[np.argsort(-duplicates[:, 3], kind="stable")][:limit]
+        ] if len(duplicates) else []
+
+        cells = expected_count * self.days
+        return {
+            "window": {"start": day(0), "end": day(self.days - 1), "days": self.days},
+            "method": self.method,
+            "rows_scanned": self.rows_scanned,
+            "expected_products": expected_count,
+            "products_with_data": int((present_days > 0).sum()),
+            "coverage_percent": round(float(present_days.sum()) / cells * 100, 2) if cells else 0.0,
+            "missing_products": missing_products,
+            "unexpected_products": self.products[expected_count:],
+            "products_with_gaps": len(gaps),
+            "gaps": gaps[:limit],
+            "stale_products": stale[:limit],
+            "duplicates": {"total_cells": int(len(duplicates)), "by_source": by_source, "examples": examples},
+        }
+
+
+def detect_gaps(collection, days=90, stale_days=2, source="auto", limit=50, expected_products=None):
+    """Scan collection and return the gap report for the last `days` days."""
+    detector = GapDetector(collection, expected_products=expected_products, days=days, stale_days=stale_days)
+    return detector.scan(source).report(limit=limit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report missing days, stale products and duplicate rows")
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--stale-days", type=int, default=2)
+    parser.add_argument("--source", choices=["auto", "raw", "rollups"], default="auto")
+    parser.add_argument("--limit", type=int, default=10, help="Products listed per section")
+    args = parser.parse_args()
+
+    from pymongo import MongoClient
+
+    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))
+    collection = get_sales_collection(client["market_analyzer"])
+    started = datetime.now()
+    report = detect_gaps(collection, days=args.days, stale_days=args.stale_days, source=args.source, limit=args.limit)
+    elapsed = (datetime.now() - started).total_seconds()
+
+    print("\n" + "=" * 70)
+    print("🕳️  DATA GAP REPORT")
+    print("=" * 70)
+    window = report["window"]
+    print(f"📅 Window: {window['start']} → {window['end']} ({window['days']} days, from {report['method']})")
+    print(f"📦 Products with data: {report['products_with_data']}/{report['expected_products']} "
+          f"({report['coverage_percent']}% of product-days covered)")
+    print(f"⏱️  Scanned {report['rows_scanned']:,} rows in {elapsed:.1f}s")
+
+    if report["missing_products"]:
+        shown = report["missing_products"][:args.limit]
+        print(f"\n❌ No data at all: {len(report['missing_products'])} products")
+        print(f"   {', '.join(shown)}{' ...' if len(report['missing_products']) > len(shown) else ''}")
+    if report["gaps"]:
+        print(f"\n⚠️  Products with missing days: {report['products_with_gaps']}")
+        for gap in report["gaps"]:
+            ranges = ", ".join(first if first == last else f"{first}→{last}" for first, last in gap["ranges"][:3])
+            print(f"   • {gap['product']}: {gap['missing_days']} days ({ranges})")
+    if report["stale_products"]:
+        print(f"\n🕰️  Stale products (no data in the last {args.stale_days} days):")
+        for item in report["stale_products"]:
+            print(f"   • {item['product']}: last seen {item['last_seen']} ({item['days_behind']} days behind)")
+    duplicates = report["duplicates"]
+    if duplicates["total_cells"]:
+        print(f"\n🔁 Duplicate (product, day, source) cells: {duplicates['total_cells']}")
+        for source, counts in duplicates["by_source"].items():
+            print(f"   • {source}: {counts['cells']} cells, {counts['extra_rows']} extra rows")
+    if report["unexpected_products"]:
+        print(f"\n➕ Products outside the tracked catalog: {len(report['unexpected_products'])}")
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
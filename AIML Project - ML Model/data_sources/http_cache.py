@@ -0,0 +1,298 @@
+"""
+On-disk HTTP cache for the external market APIs.
+
+Responses are stored gzip-compressed under HTTP_CACHE_DIR together with
+their ETag / Last-Modified validators. A response younger than the
+freshness of its host (HOST_FRESHNESS) is served without a request. A stale
+one is revalidated with If-None-Match / If-Modified-Since, so an unchanged
+resource costs a 304 instead of a full download.
+
+HTTP_CACHE_MODE picks the behaviour:
+    normal   - serve fresh entries, revalidate stale ones (default)
+    refresh  - always go to the network, but keep the cache up to date
+    offline  - never touch the network: serve whatever is cached, however
+               old, and answer 504 for anything that is not
+    off      - plain requests, no cache
+
+Only GET and HEAD are cached by default. A POST is cached only when the
+call passes cache=True or its host is listed in HTTP_CACHE_POST_HOSTS
+(comma separated); cache=False bypasses the cache for any single call.
+
+Offline mode replays a previous run, so ingestion and the manual test
+scripts can run without network access.
+
+Usage (from the "AIML Project - ML Model" directory):
+    python -m data_sources.http_cache --stats
+    python -m data_sources.http_cache --clear
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from requests.models import PreparedRequest
+from requests.structures import CaseInsensitiveDict
+
+from monitoring.metrics import record_cache_lookup
+
+load_dotenv()
+
+HTTP_CACHE_DIR = Path(os.getenv(
+    "HTTP_CACHE_DIR",
+    Path(__file__).resolve().parent.parent / "data" / "http_cache",
+))
+HTTP_CACHE_MODE = os.getenv("HTTP_CACHE_MODE", "normal").lower()
+DEFAULT_FRESHNESS = int(os.getenv("HTTP_CACHE_DEFAULT_TTL", "3600"))
+
+# Seconds a response stays fresh, per host: how often each source publishes.
+HOST_FRESHNESS = {
+    "api.data.gov.in": 6 * 3600,            # Agmarknet arrivals, published daily
+    "marsapi.ams.usda.gov": 12 * 3600,      # USDA market news reports
+    "api.worldbank.org": 7 * 24 * 3600,     # yearly indicators
+    "fenixservices.fao.org": 7 * 24 * 3600,  # FAOSTAT yearly production
+    "api.exchangerate-api.com": 6 * 3600,
+    "world.openfoodfacts.org": 24 * 3600,
+    "blinkit.com": 15 * 60,
+    "api.openweathermap.org": 10 * 60,
+}
+
+# Query parameters that carry credentials: part of the cache key, never written to disk.
+SECRET_PARAMS = ("api-key", "api_key", "apikey", "appid", "key", "token")
+CACHED_METHODS = ("GET", "HEAD")
+# Hosts whose POST responses are safe to cache (idempotent lookups), e.g. "api.example.com".
+CACHE_POST_HOSTS = tuple(
+    host.strip().lower() for host in os.getenv("HTTP_CACHE_POST_HOSTS", "").split(",") if host.strip()
+)
+# The stored body is already decoded, so these no longer describe it.
+STRIPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding", "set-cookie")
+
+
+def freshness_for(url):
+    host = urlsplit(url).hostname or ""
+    for suffix, seconds in HOST_FRESHNESS.items():
+        if host == suffix or host.endswith("." + suffix):
+            return seconds
+    return DEFAULT_FRESHNESS
+
+
+def _redacted_url(url):
+    parts = urlsplit(url)
+    query = "&".join(
+        item for item in parts.query.split("&")
+        if item and item.split("=", 1)[0].lower() not in SECRET_PARAMS
+    )
+    return parts._replace(query=query).geturl()
+
+
+class CachedSession(requests.Session):
+    """
+    A requests.Session that serves GET and HEAD responses from the on-disk
+    cache; POST only when opted in per call (cache=True) or per host
+    (HTTP_CACHE_POST_HOSTS). Drop-in for requests.Session / requests.get in
+    the fetchers.
+    """
+
+    def __init__(self, cache_dir=None, mode=None, pool_maxsize=None):
+        super().__init__()
+        self.cache_dir = Path(cache_dir or HTTP_CACHE_DIR)
+        self.mode = (mode or HTTP_CACHE_MODE).lower()
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "stored": 0, "offline_misses": 0}
+        self._stats_lock = threading.Lock()
+        if pool_maxsize:
+            self.mount("https://", HTTPAdapter(pool_maxsize=pool_maxsize))
+        # Record / replay of fixtures (HTTP_FIXTURES) replaces the transport underneath the cache.
+        from data_sources.http_replay import mount_fixture_transport
+        mount_fixture_transport(self, pool_maxsize=pool_maxsize)
+
+    def _count(self, outcome):
+        with self._stats_lock:
+            self.stats[outcome] += 1
+
+    def _key(self, prepared):
+        digest = hashlib.sha256()
+        digest.update(prepared.method.encode())
+        digest.update(prepared.url.encode())
+        body = prepared.body or b""
+        digest.update(body if isinstance(body, bytes) else str(body).encode())
+        return digest.hexdigest()
+
+    def _paths(self, key):
+        folder = self.cache_dir / key[:2]
+        return folder / f"{key}.json", folder / f"{key}.gz"
+
+    def _load(self, key):
+        meta_path, body_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text())
+            body = gzip.decompress(body_path.read_bytes())
+        except (OSError, ValueError, EOFError):
+            return None, None
+        return meta, body
+
+    def _store(self, key, prepared, response, body):
+        meta_path, body_path = self._paths(key)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "method": prepared.method,
+            "url": _redacted_url(prepared.url),
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {
+                name: value for name, value in response.headers.items()
+                if name.lower() not in STRIPPED_HEADERS
+            },
+            "encoding": response.encoding,
+            "stored_at": time.time(),
+        }
+        # Write to temp files and rename, so concurrent readers never see half an entry.
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        body_tmp, meta_tmp = Path(str(body_path) + suffix), Path(str(meta_path) + suffix)
+        body_tmp.write_bytes(gzip.compress(body, compresslevel=6))
+        meta_tmp.write_text(json.dumps(meta))
+        os.replace(body_tmp, body_path)
+        os.replace(meta_tmp, meta_path)
+        self._count("stored")
+
+    def _touch(self, key, meta):
+        meta_path, _ = self._paths(key)
+        meta["stored_at"] = time.time()
+        tmp = Path(f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, meta_path)
+
+    @staticmethod
+    def _response(prepared, status, reason, headers, body, encoding=None):
+        response = requests.Response()
+        response.status_code = status
+        response.reason = reason
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = body
+        response._content_consumed = True
+        response.encoding = encoding
+        response.url = prepared.url
+        response.request = prepared
+        response.from_cache = True
+        return response
+
+    def _cacheable(self, method, url, cache):
+        if self.mode == "off" or cache is False:
+            return False
+        if method in CACHED_METHODS:
+            return True
+        return method == "POST" and (cache is True or (urlsplit(url).hostname or "").lower() in CACHE_POST_HOSTS)
+
+    def request(self, method, url, cache=None, **kwargs):
+        method = method.upper()
+        if not self._cacheable(method, url, cache):
+            return super().request(method, url, **kwargs)
+
+        prepared = PreparedRequest()
+        prepared.prepare(
+            method=method,
+            url=url,
+            params=kwargs.get("params"),
+            data=kwargs.get("data"),
+            json=kwargs.get("json"),
+        )
+        key = self._key(prepared)
+        host = urlsplit(prepared.url).hostname or "unknown"
+        meta, body = self._load(key)
+
+        if meta is not None and self.mode != "refresh":
+            fresh = time.time() - meta["stored_at"] < freshness_for(prepared.url)
+            if fresh or self.mode == "offline":
+                self._count("hits")
+                record_cache_lookup(f"http:{host}", hit=True)
+                return self._response(prepared, meta["status"], meta["reason"], meta["headers"], body, meta["encoding"])
+
+        record_cache_lookup(f"http:{host}", hit=False)
+        if self.mode == "offline":
+            self._count("offline_misses")
+            return self._response(prepared, 504, "Not cached (HTTP_CACHE_MODE=offline)", {}, b"")
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if meta is not None:
+            cached_headers = CaseInsensitiveDict(meta["headers"])
+            if cached_headers.get("ETag"):
+                headers["If-None-Match"] = cached_headers["ETag"]
+            if cached_headers.get("Last-Modified"):
+                headers["If-Modified-Since"] = cached_headers["Last-Modified"]
+
+        response = super().request(method, url, headers=headers, **kwargs)
+        if response.status_code == 304 and meta is not None:
+            response.close()
+            self._count("revalidated")
+            self._touch(key, meta)
+            return self._response(prepared, meta["status"], meta["reason"], meta["headers"], body, meta["encoding"])
+
+        self._count("misses")
+        if response.status_code == 200:
+            # Reading .content buffers a streamed body; callers can still iter_content() over it.
+            self._store(key, prepared, response, response.content)
+        return response
+
+    def clear(self):
+        removed = 0
+        for path in self.cache_dir.glob("*/*"):
+            if path.suffix in (".json", ".gz"):
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def disk_usage(self):
+        entries = list(self.cache_dir.glob("*/*.gz"))
+        return len(entries), sum(path.stat().st_size for path in entries)
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """The CachedSession shared by every fetcher in the process."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = CachedSession()
+        return _session
+
+
+def get(url, **kwargs):
+    """requests.get through the shared cache."""
+    return get_session().get(url, **kwargs)
+
+
+def post(url, **kwargs):
+    """requests.post through the shared session; cached only with cache=True or for HTTP_CACHE_POST_HOSTS."""
+    return get_session().post(url, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the HTTP response cache")
+    parser.add_argument("--stats", action="store_true", help="Show the number and size of cached responses")
+    parser.add_argument("--clear", action="store_true", help="Delete every cached response")
+    args = parser.parse_args()
+    if not (args.stats or args.clear):
+        parser.error("nothing to do: pass --stats or --clear")
+
+    session = CachedSession()
+    print("\n" + "=" * 60)
+    print(f"🗄️  HTTP CACHE ({session.cache_dir}, mode={session.mode})")
+    print("=" * 60)
+    if args.clear:
+        print(f"🧹 Removed {session.clear():,} files")
+    entries, size = session.disk_usage()
+    print(f"📦 {entries:,} responses, {size / 1e6:.2f} MB compressed")
+    print("=" * 60 + "\n")
+
+
+if __name__ == "__main__":
+    main()
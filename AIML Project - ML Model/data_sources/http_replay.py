@@ -0,0 +1,256 @@
+"""
+Record / replay transport for the fetchers' HTTP traffic.
+
+With HTTP_FIXTURES=record every response the fetchers receive is written to
+HTTP_FIXTURES_DIR as one JSON fixture per request. With HTTP_FIXTURES=replay
+no network is used: requests are answered from those fixtures. Replay can
+add latency (HTTP_REPLAY_LATENCY_MS) and fail a share of the requests
+(HTTP_REPLAY_ERROR_RATE) with timeouts and 503s, so throughput and failure
+handling can be measured on a machine without network access or API keys.
+
+Fixtures are keyed by method, URL and body, with credentials (api-key,
+appid, ...) left out. A recording made with real keys therefore replays
+with any placeholder key. A request without a fixture fails like an
+unreachable host.
+
+The transport is mounted on every http_cache.CachedSession, which all
+fetchers use. In replay mode set HTTP_CACHE_MODE=off as well, so the
+on-disk cache does not answer before the fixtures do.
+
+Usage (from the "AIML Project - ML Model" directory):
+    HTTP_FIXTURES=record python test_agmarknet_api.py
+    HTTP_FIXTURES=replay HTTP_CACHE_MODE=off python -m data_sources.comprehensive_market_fetcher
+    python -m data_sources.http_replay --list
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from data_sources.http_cache import SECRET_PARAMS, STRIPPED_HEADERS
+
+load_dotenv()
+
+HTTP_FIXTURES = os.getenv("HTTP_FIXTURES", "").lower()
+HTTP_FIXTURES_DIR = Path(os.getenv(
+    "HTTP_FIXTURES_DIR",
+    Path(__file__).resolve().parent.parent / "data" / "http_fixtures",
+))
+HTTP_REPLAY_LATENCY_MS = float(os.getenv("HTTP_REPLAY_LATENCY_MS", "0"))
+HTTP_REPLAY_ERROR_RATE = float(os.getenv("HTTP_REPLAY_ERROR_RATE", "0"))
+
+
+def _canonical_url(url):
+    """The URL without credentials and with its query sorted."""
+    parts = urlsplit(url)
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in SECRET_PARAMS
+    )
+    return parts._replace(query=urlencode(query)).geturl()
+
+
+def fixture_path(fixtures_dir, method, url, body=None):
+    """Where the fixture of a request lives: <dir>/<host>/<hash>.json."""
+    digest = hashlib.sha256()
+    digest.update(method.upper().encode())
+    digest.update(_canonical_url(url).encode())
+    body = body or b""
+    digest.update(body if isinstance(body, bytes) else str(body).encode())
+    host = urlsplit(url).hostname or "unknown"
+    return Path(fixtures_dir) / host / f"{digest.hexdigest()[:24]}.json"
+
+
+def save_fixture(fixtures_dir, method, url, status, headers, content, body=None, reason="OK"):
+    """Write one fixture; content is the response body as bytes."""
+    path = fixture_path(fixtures_dir, method, url, body)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        text, encoding = content.decode("utf-8"), "utf-8"
+    except UnicodeDecodeError:
+        text, encoding = base64.b64encode(content).decode("ascii"), "base64"
+    fixture = {
+        "method": method.upper(),
+        "url": _canonical_url(url),
+        "status": status,
+        "reason": reason,
+        "headers": {name: value for name, value in dict(headers).items() if name.lower() not in STRIPPED_HEADERS},
+        "body_encoding": encoding,
+        "body": text,
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    tmp = Path(f"{path}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(fixture, ensure_ascii=False))
+    os.replace(tmp, path)
+    return path
+
+
+def load_fixture(fixtures_dir, method, url, body=None):
+    path = fixture_path(fixtures_dir, method, url, body)
+    try:
+        fixture = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    if fixture.get("body_encoding") == "base64":
+        fixture["content"] = base64.b64decode(fixture["body"])
+    else:
+        fixture["content"] = fixture["body"].encode("utf-8")
+    return fixture
+
+
+class RecordingAdapter(HTTPAdapter):
+    """A normal HTTPAdapter that also writes every response it receives as a fixture."""
+
+    def __init__(self, fixtures_dir=None, **kwargs):
+        super().__init__(**kwargs)
+        self.fixtures_dir = Path(fixtures_dir or HTTP_FIXTURES_DIR)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        save_fixture(self.fixtures_dir, request.method, request.url, response.status_code,
+                     response.headers, response.content, request.body, response.reason)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Answers requests from fixtures, with optional injected latency and
+    errors. latency_ms is the mean delay; each request waits between 50% and
+    150% of it. A share error_rate of requests fails: half as a timeout,
+    half as a 503.
+    """
+
+    def __init__(self, fixtures_dir=None, latency_ms=HTTP_REPLAY_LATENCY_MS,
+                 error_rate=HTTP_REPLAY_ERROR_RATE, seed=None):
+        super().__init__()
+        self.fixtures_dir = Path(fixtures_dir or HTTP_FIXTURES_DIR)
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {"requests": 0, "replayed": 0, "missing": 0, "timeouts": 0, "server_errors": 0}
+
+    def _count(self, outcome):
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def _draw(self):
+        with self._lock:
+            return self._random.random(), self._random.random()
+
+    @staticmethod
+    def _read_timeout(timeout):
+        if isinstance(timeout, tuple):
+            timeout = timeout[1]
+        return timeout
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        self._count("requests")
+        jitter, failure = self._draw()
+        delay = self.latency_ms / 1000 * (0.5 + jitter)
+        read_timeout = self._read_timeout(timeout)
+        if read_timeout is not None and delay > read_timeout:
+            time.sleep(read_timeout)
+            self._count("timeouts")
+            raise requests.exceptions.ReadTimeout(f"Replayed read timeout after {read_timeout}s", request=request)
+        if delay:
+            time.sleep(delay)
+
+        if failure < self.error_rate:
+            if failure < self.error_rate / 2:
+                self._count("timeouts")
+                raise requests.exceptions.ConnectTimeout("Injected connect timeout", request=request)
+            self._count("server_errors")
+            return self._build(request, 503, "Service Unavailable (injected)", {}, b"")
+
+        fixture = load_fixture(self.fixtures_dir, request.method, request.url, request.body)
+        if fixture is None:
+            self._count("missing")
+            raise requests.exceptions.ConnectionError(
+                f"No fixture for {request.method} {_canonical_url(request.url)}", request=request)
+        self._count("replayed")
+        return self._build(request, fixture["status"], fixture.get("reason", "OK"),
+                           fixture["headers"], fixture["content"])
+
+    @staticmethod
+    def _build(request, status, reason, headers, content):
+        response = requests.Response()
+        response.status_code = status
+        response.reason = reason
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = content
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+_replay_adapter = None
+_replay_lock = threading.Lock()
+
+
+def get_replay_adapter():
+    """The ReplayAdapter shared by every session, so its stats cover the whole process."""
+    global _replay_adapter
+    with _replay_lock:
+        if _replay_adapter is None:
+            _replay_adapter = ReplayAdapter()
+        return _replay_adapter
+
+
+def mount_fixture_transport(session, pool_maxsize=None):
+    """Mount the record or replay transport on session according to HTTP_FIXTURES; a no-op otherwise."""
+    if HTTP_FIXTURES == "replay":
+        adapter = get_replay_adapter()
+    elif HTTP_FIXTURES == "record":
+        adapter = RecordingAdapter(**({"pool_maxsize": pool_maxsize} if pool_maxsize else {}))
+    else:
+        return session
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the recorded HTTP fixtures")
+    parser.add_argument("--list", action="store_true", help="Show the fixtures per host")
+    parser.add_argument("--fixtures-dir", default=str(HTTP_FIXTURES_DIR))
+    args = parser.parse_args()
+    if not args.list:
+        parser.error("nothing to do: pass --list")
+
+    root = Path(args.fixtures_dir)
+    print("\n" + "=" * 60)
+    print(f"🎞️  HTTP FIXTURES ({root})")
+    print("=" * 60)
+    hosts = sorted(path for path in root.glob("*") if path.is_dir()) if root.exists() else []
+    for host in hosts:
+        fixtures = list(host.glob("*.json"))
+        size = sum(path.stat().st_size for path in fixtures)
+        print(f"   • {host.name}: {len(fixtures):,} fixtures, {size / 1e6:.2f} MB")
+    if not hosts:
+        print("⚠️  No fixtures recorded yet: run a fetcher with HTTP_FIXTURES=record")
+    print("=" * 60 + "\n")
+
+
+if __name__ == "__main__":
+    main()
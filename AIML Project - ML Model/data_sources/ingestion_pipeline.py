@@ -0,0 +1,326 @@
+"""
+Streaming ingestion: fetch → sanitize → batch → write.
+
+Each stage runs in its own worker thread(s), and the stages are connected
+by bounded queues. A slow writer therefore blocks the fetchers instead of
+letting records pile up in memory. At most a few queues' worth of products
+and batches are held at any time, and every batch lands in MongoDB as soon
+as it fills.
+
+Stages:
+    fetch     products → raw records, one product per item (several workers)
+    sanitize  sanitize the product's records
+    batch     pack records into storage documents, clearing the stored
+              history of the products they carry first
+    write     insert each batch through a BulkWriter, which retries only
+              the documents that failed
+
+Every stage counts the items and records it handled, the time it spent
+working, and the time it was blocked on a full downstream queue
+(backpressure). The counts are printed as progress lines while the pipeline
+runs and are returned in the final report.
+
+The rollups of the products whose history was replaced are recomputed from
+what was actually stored once the pipeline has finished, and again if it
+fails part way, so they never describe rows that were not written.
+"""
+import os
+import queue
+import threading
+import time
+
+from dotenv import load_dotenv
+
+from data_sources.mongodb_utils import BulkWriter, print_write_report, refresh_collection_stats, sanitize_market_records
+from data_sources.rollups import rebuild_rollups, refresh_product_rollups, rollups_available
+from data_sources.sales_schema import match_values
+from data_sources.sales_storage import to_storage_documents, translate_filter
+from monitoring.metrics import REGISTRY
+
+load_dotenv()
+
+INGESTION_FETCH_WORKERS = int(os.getenv("INGESTION_FETCH_WORKERS", "4"))
+INGESTION_WRITE_WORKERS = int(os.getenv("INGESTION_WRITE_WORKERS", "2"))
+INGESTION_QUEUE_SIZE = int(os.getenv("INGESTION_QUEUE_SIZE", "16"))
+
+STAGE_RECORDS = REGISTRY.counter(
+    "ingestion_stage_records_total",
+    "Records handled by each streaming ingestion stage.",
+    ("stage",),
+)
+STAGE_BLOCKED = REGISTRY.counter(
+    "ingestion_stage_blocked_seconds_total",
+    "Time each streaming ingestion stage spent waiting on a full downstream queue.",
+    ("stage",),
+)
+
+_DONE = object()
+
+
+class Stage:
+    """
+    One pipeline stage. handle(item, emit) processes an item and passes
+    results downstream with emit(item, records=n), which also counts the n
+    records for this stage. finish(emit), if given, runs once after the
+    last item, e.g. to flush a partial batch.
+    """
+
+    def __init__(self, name, handle, workers=1, finish=None):
+        self.name = name
+        self.handle = handle
+        self.workers = max(1, workers)
+        self.finish = finish
+        self.inbox = None
+        self.downstream = None
+        self.items = 0
+        self.records = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.started = None
+        self.finished = None
+        self._alive = self.workers
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def emit(self, item, records=0):
+        self.count(records)
+        if self.downstream is None:
+            return
+        waited = time.perf_counter()
+        self.downstream.inbox.put(item)
+        waited = time.perf_counter() - waited
+        self._local.blocked = getattr(self._local, "blocked", 0.0) + waited
+        with self._lock:
+            self.blocked_seconds += waited
+        STAGE_BLOCKED.inc(waited, stage=self.name)
+
+    def count(self, records):
+        with self._lock:
+            self.records += records
+        STAGE_RECORDS.inc(records, stage=self.name)
+
+    def run(self, pipeline):
+        with self._lock:
+            if self.started is None:
+                self.started = time.perf_counter()
+        while True:
+            item = self.inbox.get()
+            if item is _DONE:
+                break
+            if pipeline.error is not None:
+                # Keep draining so upstream stages are never left blocked on a full queue.
+                continue
+            started = time.perf_counter()
+            self._local.blocked = 0.0
+            try:
+                self.handle(item, self.emit)
+            except Exception as error:
+                pipeline.fail(self.name, error)
+            with self._lock:
+                self.items += 1
+                self.busy_seconds += time.perf_counter() - started - self._local.blocked
+
+        with self._lock:
+            self._alive -= 1
+            last = self._alive == 0
+        if last:
+            if self.finish is not None and pipeline.error is None:
+                try:
+                    self.finish(self.emit)
+                except Exception as error:
+                    pipeline.fail(self.name, error)
+            self.finished = time.perf_counter()
+            if self.downstream is not None:
+                for _ in range(self.downstream.workers):
+                    self.downstream.inbox.put(_DONE)
+
+    def report(self):
+        elapsed = (self.finished or time.perf_counter()) - (self.started or time.perf_counter())
+        return {
+            "items": self.items,
+            "records": self.records,
+            "workers": self.workers,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            "records_per_second": round(self.records / elapsed, 1) if elapsed > 0 else None,
+        }
+
+
+class Pipeline:
+    """Stages chained by bounded queues; run(source) feeds source into the first stage."""
+
+    def __init__(self, stages, queue_size=INGESTION_QUEUE_SIZE):
+        self.stages = stages
+        self.error = None
+        self.failed_stage = None
+        self._lock = threading.Lock()
+        for stage, downstream in zip(stages, stages[1:] + [None]):
+            stage.inbox = queue.Queue(maxsize=queue_size)
+            stage.downstream = downstream
+
+    def fail(self, stage_name, error):
+        with self._lock:
+            if self.error is None:
+                self.error = error
+                self.failed_stage = stage_name
+
+    def _feed(self, source):
+        first = self.stages[0]
+        try:
+            for item in source:
+                if self.error is not None:
+                    break
+                first.inbox.put(item)
+        finally:
+            for _ in range(first.workers):
+                first.inbox.put(_DONE)
+
+    def progress(self):
+        return " | ".join(f"{stage.name} {stage.records:,}" for stage in self.stages)
+
+    def run(self, source, progress_interval=5.0):
+        threads = [threading.Thread(target=self._feed, args=(source,), name="ingest-feed", daemon=True)]
+        for stage in self.stages:
+            for worker in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=stage.run, args=(self,), name=f"ingest-{stage.name}-{worker}", daemon=True,
+                ))
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        next_report = started + progress_interval
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(max(0.0, next_report - time.perf_counter()))
+                if thread.is_alive() and time.perf_counter() >= next_report:
+                    print(f"   📈 {self.progress()} records ({time.perf_counter() - started:.0f}s)")
+                    next_report += progress_interval
+
+        if self.error is not None:
+            raise self.error
+        return {stage.name: stage.report() for stage in self.stages}
+
+
+def stream_replace_products(
+    collection,
+    products,
+    fetch,
+    batch_size=None,
+    fetch_workers=INGESTION_FETCH_WORKERS,
+    write_workers=INGESTION_WRITE_WORKERS,
+    queue_size=INGESTION_QUEUE_SIZE,
+    retries=3,
+    rollup_batch_products=100,
+    progress_interval=5.0,
+):
+    """
+    Replace the stored history of each product with fetch(product), streaming
+    the records through the pipeline. Products whose fetch fails or returns
+    nothing keep their stored history. Without batch_size, batches follow
+    the BulkWriter's adaptive size. Returns a report with the records saved,
+    the products written and failed, per-stage statistics and the writer's
+    report.
+    """
+    database = collection.database
+    writer = BulkWriter(collection, workers=write_workers, batch_size=batch_size or 500, retries=retries)
+    maintain_rollups = rollups_available(collection)
+    written_products = []
+    failed_products = []
+    pending = []
+    cleared_products = set()
+
+    def fetch_stage(product, emit):
+        try:
+            records = fetch(product)
+        except Exception as error:
+            print(f"❌ {product}: {str(error)}")
+            records = None
+        if not records:
+            failed_products.append(product)
+            return
+        emit((product, records), records=len(records))
+
+    def sanitize_stage(item, emit):
+        product, records = item
+        records = sanitize_market_records(records)
+        written_products.append(product)
+        emit(records, records=len(records))
+
+    def emit_batch(records, emit):
+        # Clear the stored history of the products this batch is the first to carry,
+        # with one delete per batch. Later batches of a product only add to it.
+        new_products = sorted({record.get("product") for record in records if record.get("product")} - cleared_products)
+        if new_products:
+            query = {"product": match_values(database, "product", new_products)}
+            collection.delete_many(translate_filter(collection, query))
+            cleared_products.update(new_products)
+        batch = to_storage_documents(collection, records)
+        emit(batch, records=len(batch))
+
+    def batch_stage(records, emit):
+        pending.extend(records)
+        while len(pending) >= (batch_size or writer.batch_size):
+            size = batch_size or writer.batch_size
+            records = pending[:size]
+            del pending[:size]
+            emit_batch(records, emit)
+
+    def flush_batch(emit):
+        if pending:
+            records = list(pending)
+            pending.clear()
+            emit_batch(records, emit)
+
+    def write_stage(batch, emit):
+        inserted = writer.insert_batch(batch)
+        writer.check()
+        emit(None, records=inserted)
+
+    stages = [
+        Stage("fetch", fetch_stage, workers=fetch_workers),
+        Stage("sanitize", sanitize_stage),
+        Stage("batch", batch_stage, finish=flush_batch),
+        Stage("write", write_stage, workers=write_workers),
+    ]
+
+    pipeline = Pipeline(stages, queue_size=queue_size)
+    started = time.perf_counter()
+    try:
+        stage_reports = pipeline.run(products, progress_interval=progress_interval)
+        seconds = time.perf_counter() - started
+    finally:
+        # Also on failure: the cleared products may have lost their old history
+        # with only part of the new one written.
+        try:
+            if maintain_rollups:
+                refresh_product_rollups(collection, cleared_products, batch_products=rollup_batch_products)
+            else:
+                # A first run has to roll up the products that were already stored too.
+                rebuild_rollups(collection)
+        except Exception as error:
+            print(f"⚠️  Could not update rollups: {error}")
+        try:
+            refresh_collection_stats(collection)
+        except Exception as error:
+            print(f"⚠️  Could not refresh collection stats: {error}")
+
+    return {
+        "saved": writer.stats["inserted"],
+        "products_written": len(written_products),
+        "products_failed": sorted(failed_products),
+        "seconds": round(seconds, 3),
+        "stages": stage_reports,
+        "writer": writer.report(),
+    }
+
+
+def print_stage_report(report):
+    print(f"⚙️  Pipeline: {report['saved']:,} records in {report['seconds']:.1f}s")
+    for name, stage in report["stages"].items():
+        rate = stage["records_per_second"]
+        print(f"   • {name:9s} {stage['records']:>9,} records  {rate or 0:>9,.0f}/s  "
+              f"busy {stage['busy_seconds']:.1f}s  blocked {stage['blocked_seconds']:.1f}s  "
+              f"(x{stage['workers']})")
+    if "writer" in report:
+        print_write_report(report["writer"])
@@ -1,44 +1,591 @@
 """MongoDB write helpers for bulk refresh jobs."""
 
+import os
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from itertools import islice
+
+import bson
+import numpy as np
+import pandas as pd
+from pymongo import IndexModel, UpdateOne
+from pymongo.errors import BulkWriteError
+
 from data_sources.price_catalog import infer_category, infer_price_range
+from data_sources.rollups import rebuild_rollups, refresh_product_rollups, replace_product_rollups, rollups_available
+from data_sources.sales_schema import decode_records, decoded_field, encode_for_storage, match_values
+from data_sources.sales_storage import (
+    is_timeseries,
+    sales_indexes,
+    to_storage_documents,
+    translate_filter,
+    translate_pipeline,
+)
+from monitoring.metrics import REGISTRY
+
+STATS_COLLECTION = "collection_stats"
+SHADOW_SUFFIX = "_rebuild"
+INDEX_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+BULK_WRITE_WORKERS = int(os.getenv("BULK_WRITE_WORKERS", "4"))
+BULK_WRITE_TARGET_SECONDS = float(os.getenv("BULK_WRITE_TARGET_SECONDS", "0.5"))
+BULK_WRITE_MAX_BATCH_BYTES = int(os.getenv("BULK_WRITE_MAX_BATCH_BYTES", str(8 * 1024 * 1024)))
+DUPLICATE_KEY_ERROR = 11000
+
+BULK_WRITE_DOCUMENTS = REGISTRY.counter(
+    "bulk_write_documents_total",
+    "Documents handled by BulkWriter, by outcome (inserted, retried, duplicate, failed).",
+    ("collection", "outcome"),
+)
+BULK_WRITE_BATCH_SECONDS = REGISTRY.histogram(
+    "bulk_write_batch_seconds",
+    "Duration of each insert_many sent by BulkWriter.",
+    ("collection",),
+)
+
+# Bump when the sanitizing rules or the price catalog change, so documents
+# written under the old rules are sanitized again on read and re-migrated.
+SANITIZED_SCHEMA_VERSION = 2
+SCHEMA_VERSION_FIELD = "sanitized_schema_version"
+
+
+def _to_float_array(values):
+    """Parse a column of prices; unparseable values become NaN."""
+    try:
+        return np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype=float)
+
+
+def _is_blank(values):
+    return np.array([value is None or value != value or value == "" for value in values], dtype=bool)
+
+
+def _clean_products(values):
+    return np.array(["" if value is None or value != value else str(value).strip() for value in values], dtype=object)
+
+
+def _sanitize_columns(products, prices, predicted_prices=None):
+    """
+    Clamp price columns to the catalog range of each product.
+
+    products must be non-empty product names. Returns (price, predicted_price,
+    category) arrays; predicted_price is None when no predicted prices were given.
+    """
+    distinct, inverse = np.unique(products.astype(str), return_inverse=True)
+    ranges = np.array([infer_price_range(product) for product in distinct], dtype=float).reshape(-1, 2)[inverse]
+    categories = np.array([infer_category(product) for product in distinct], dtype=object)[inverse]
+    min_prices, max_prices = ranges[:, 0], ranges[:, 1]
+    midpoints = (min_prices + max_prices) / 2
+
+    # NaN fails both comparisons, so missing and unparseable prices fall back too.
+    price = _to_float_array(prices)
+    price = np.where((price >= min_prices) & (price <= max_prices), price, midpoints).round(2)
+
+    predicted = None
+    if predicted_prices is not None:
+        predicted = _to_float_array(predicted_prices)
+        predicted = np.where((predicted >= min_prices) & (predicted <= max_prices), predicted, price).round(2)
+
+    return price, predicted, categories
+
+
+def sanitize_market_batch(batch):
+    """
+    Normalize a columnar batch (DataFrame or dict of arrays) in one vectorized pass.
+
+    Prices outside the catalog range of their product are replaced by the
+    range midpoint, predicted prices by the sanitized price, category is
+    re-inferred and a missing unit defaults to "kg". Sanitized rows are stamped
+    with SANITIZED_SCHEMA_VERSION; rows without a product are left untouched.
+    Returns a new DataFrame, or a dict of arrays for dict input.
+    """
+    is_frame = isinstance(batch, pd.DataFrame)
+    columns = {name: np.asarray(values, dtype=object) for name, values in batch.items()}
+    if not columns or "product" not in columns:
+        return batch.copy() if is_frame else dict(columns)
+
+    row_count = len(columns["product"])
+    products = _clean_products(columns["product"])
+    valid = products != ""
+    if valid.any():
+        products = products[valid]
+        prices = columns["price"][valid] if "price" in columns else np.full(valid.sum(), np.nan)
+        predicted = columns["predicted_price"][valid] if "predicted_price" in columns else None
+        price, predicted, categories = _sanitize_columns(products, prices, predicted)
+
+        columns["price"] = columns.get("price", np.full(row_count, None, dtype=object)).copy()
+        columns["price"][valid] = price
+        if predicted is not None:
+            columns["predicted_price"] = columns["predicted_price"].copy()
+            columns["predicted_price"][valid] = predicted
+        columns["category"] = columns.get("category", np.full(row_count, None, dtype=object)).copy()
+        columns["category"][valid] = categories
+        units = columns.get("unit", np.full(row_count, None, dtype=object)).copy()
+        units[valid & _is_blank(units)] = "kg"
+        columns["unit"] = units
+        versions = columns.get(SCHEMA_VERSION_FIELD, np.full(row_count, None, dtype=object)).copy()
+        versions[valid] = SANITIZED_SCHEMA_VERSION
+        columns[SCHEMA_VERSION_FIELD] = versions
+
+    if is_frame:
+        return pd.DataFrame(columns, index=batch.index).infer_objects()
+    return columns
+
+
+def sanitize_market_records(records):
+    """
+    Normalize a list of market record dicts through sanitize_market_batch, so
+    records and columnar batches treat products (None, NaN, blank) the same.
+    Returns new dicts; predicted_price is only rewritten where a record has it.
+    """
+    sanitized = [dict(record) for record in records]
+    if not any("product" in record for record in sanitized):
+        return sanitized
+
+    fields = [field for field in ("product", "price", "predicted_price", "unit")
+              if any(field in record for record in sanitized)]
+    batch = {field: [record.get(field) for record in sanitized] for field in fields}
+    rows = np.flatnonzero(_clean_products(batch["product"]) != "")
+    if not len(rows):
+        return sanitized
+
+    columns = sanitize_market_batch(batch)
+    for row in rows.tolist():
+        record = sanitized[row]
+        record["price"] = float(columns["price"][row])
+        record["category"] = columns["category"][row]
+        record["unit"] = columns["unit"][row]
+        record[SCHEMA_VERSION_FIELD] = SANITIZED_SCHEMA_VERSION
+        if "predicted_price" in record:
+            record["predicted_price"] = float(columns["predicted_price"][row])
 
+    return sanitized
 
-def _to_float(value, default):
+
+def _to_float(value):
     try:
         return float(value)
-    except Exception:
-        return float(default)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _round_like_numpy(value, decimals=2):
+    scale = 10.0 ** decimals
+    return round(value * scale) / scale
 
 
 def sanitize_market_record(record):
-    """Normalize a market record so unrealistic values are not written to MongoDB."""
+    """
+    Normalize one market record so unrealistic values are not written to
+    MongoDB. A scalar path with the same rules as sanitize_market_batch, for
+    callers that sanitize row by row.
+    """
     sanitized = dict(record)
-    product = str(sanitized.get("product", "")).strip()
-
+    product = _clean_products([sanitized.get("product")])[0]
     if not product:
         return sanitized
 
     min_price, max_price = infer_price_range(product)
     midpoint = (min_price + max_price) / 2
+    # NaN fails both comparisons, so missing and unparseable prices fall back too.
+    price = _to_float(sanitized.get("price"))
+    sanitized["price"] = _round_like_numpy(price if min_price <= price <= max_price else midpoint)
+    if "predicted_price" in sanitized:
+        predicted = _to_float(sanitized["predicted_price"])
+        sanitized["predicted_price"] = (
+            _round_like_numpy(predicted) if min_price <= predicted <= max_price else sanitized["price"]
+        )
+    sanitized["category"] = infer_category(product)
+    unit = sanitized.get("unit")
+    if unit is None or unit != unit or unit == "":
+        sanitized["unit"] = "kg"
+    sanitized[SCHEMA_VERSION_FIELD] = SANITIZED_SCHEMA_VERSION
+    return sanitized
 
-    price = _to_float(sanitized.get("price", midpoint), midpoint)
-    if price < min_price or price > max_price:
-        price = midpoint
-    sanitized["price"] = round(price, 2)
 
-    if "predicted_price" in sanitized:
-        predicted_price = _to_float(sanitized.get("predicted_price", sanitized["price"]), sanitized["price"])
-        if predicted_price < min_price or predicted_price > max_price:
-            predicted_price = sanitized["price"]
-        sanitized["predicted_price"] = round(predicted_price, 2)
+def is_sanitized(record):
+    return record.get(SCHEMA_VERSION_FIELD) == SANITIZED_SCHEMA_VERSION
 
-    sanitized["category"] = infer_category(product)
 
-    if not sanitized.get("unit"):
-        sanitized["unit"] = "kg"
+def sanitize_stale_records(records):
+    """
+    Sanitize only the records not stamped with the current schema version.
 
-    return sanitized
+    Used on read paths: documents validated at write time are returned as they
+    are, so reads only pay for rows the background migration has not reached.
+    """
+    records = list(records)
+    stale = [index for index, record in enumerate(records) if not is_sanitized(record)]
+    if stale:
+        for index, record in zip(stale, sanitize_market_records([records[index] for index in stale])):
+            records[index] = record
+    return records
+
+
+def migrate_sanitized_schema(collection, batch_size=1000, pause=0.0):
+    """
+    Rewrite documents below SANITIZED_SCHEMA_VERSION in _id order, one batch at a time.
+
+    Only the sanitized fields are $set, so concurrent writers are not clobbered.
+    Documents without a product are stamped as they are. The rollups of products
+    whose price or category changed are recomputed and the collection stats
+    refreshed at the end. Returns the number of documents updated; pause
+    (seconds) throttles the migration between batches.
+    """
+    if is_timeseries(collection):
+        # Time-series measurements are sanitized on write and cannot be $set in place.
+        return 0
+
+    fields = ["product", "price", "predicted_price", "unit", "category", SCHEMA_VERSION_FIELD]
+    query = {SCHEMA_VERSION_FIELD: {"$ne": SANITIZED_SCHEMA_VERSION}}
+    updated = 0
+    changed_products = set()
+    last_id = None
+
+    while True:
+        page_query = dict(query, _id={"$gt": last_id}) if last_id is not None else query
+        documents = list(
+            collection.find(page_query, projection=fields).sort("_id", 1).limit(batch_size)
+        )
+        if not documents:
+            break
+        last_id = documents[-1]["_id"]
+        decode_records(collection.database, documents)
+
+        sanitized = sanitize_market_records(documents)
+        changed_products.update(
+            after["product"] for before, after in zip(documents, sanitized)
+            if before.get("price") != after.get("price") or before.get("category") != after.get("category")
+        )
+
+        operations = []
+        for document in encode_for_storage(collection, sanitized):
+            changes = {
+                field: document[field]
+                for field in ("price", "predicted_price", "unit", "category")
+                if field in document
+            }
+            changes[SCHEMA_VERSION_FIELD] = SANITIZED_SCHEMA_VERSION
+            operations.append(UpdateOne({"_id": document["_id"]}, {"$set": changes}))
+
+        result = collection.bulk_write(operations, ordered=False)
+        updated += result.modified_count
+        if pause:
+            time.sleep(pause)
+
+    if changed_products:
+        try:
+            refresh_product_rollups(collection, changed_products)
+        except Exception as error:
+            print(f"⚠️  Could not update rollups: {error}")
+    if updated:
+        try:
+            refresh_collection_stats(collection)
+        except Exception as error:
+            print(f"⚠️  Could not refresh collection stats: {error}")
+    return updated
+
+
+class BulkWriter:
+    """
+    Unordered insert_many batches sent from several threads at once, over
+    the client's connection pool.
+
+    The batch size adapts while writing: it grows while batches finish under
+    target_seconds, shrinks when they take longer or fail, and is capped so
+    a batch stays under max_batch_bytes of BSON (estimated from a sample of
+    each batch). When insert_many raises BulkWriteError, only the documents
+    listed in its writeErrors are retried, not the whole batch. A duplicate
+    key on a document resent after a lost reply means it was already
+    stored; otherwise duplicates are counted and not retried.
+
+    write(documents) cuts and sends the batches itself; insert_batch(batch)
+    writes one batch for callers that do their own batching.
+    """
+
+    def __init__(
+        self,
+        collection,
+        workers=BULK_WRITE_WORKERS,
+        batch_size=500,
+        min_batch_size=50,
+        max_batch_size=10000,
+        target_seconds=BULK_WRITE_TARGET_SECONDS,
+        max_batch_bytes=BULK_WRITE_MAX_BATCH_BYTES,
+        retries=3,
+    ):
+        self.collection = collection
+        self.workers = max(1, workers)
+        self.min_batch_size = max(1, min_batch_size)
+        self.max_batch_size = max(self.min_batch_size, max_batch_size)
+        self.batch_size = min(max(batch_size, self.min_batch_size), self.max_batch_size)
+        self.target_seconds = target_seconds
+        self.max_batch_bytes = max_batch_bytes
+        self.retries = max(1, retries)
+        self.document_bytes = None
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._started = None
+        self._finished = None
+        self.stats = {"inserted": 0, "failed": 0, "duplicates": 0, "retried": 0, "batches": 0}
+
+    def _count(self, outcome, amount):
+        if amount:
+            with self._lock:
+                self.stats[outcome] += amount
+            BULK_WRITE_DOCUMENTS.inc(amount, collection=self.collection.name, outcome=outcome)
+
+    def _sample_size(self, documents):
+        """Average BSON size of up to 20 documents spread over the batch."""
+        step = max(1, len(documents) // 20)
+        try:
+            sizes = [len(bson.encode(document)) for document in documents[::step][:20]]
+        except Exception:
+            # insert_many will report the document it cannot encode.
+            return
+        with self._lock:
+            average = sum(sizes) / len(sizes)
+            self.document_bytes = average if self.document_bytes is None else 0.8 * self.document_bytes + 0.2 * average
+
+    def _adapt(self, documents, seconds, failed):
+        with self._lock:
+            size = self.batch_size
+            if failed:
+                size //= 2
+            elif seconds > 0 and documents >= size // 2:
+                # Scale towards target_seconds, at most doubling or halving per batch.
+                size = int(size * min(2.0, max(0.5, self.target_seconds / seconds)))
+            if self.document_bytes:
+                size = min(size, int(self.max_batch_bytes // self.document_bytes))
+            self.batch_size = min(max(size, self.min_batch_size), self.max_batch_size)
+
+    def insert_batch(self, documents):
+        """
+        insert_many one batch, retrying only the documents that failed.
+        Returns the number of documents inserted; documents still failing
+        after the last retry are counted in stats["failed"] (see check()).
+        """
+        pending = list(documents)
+        if not pending:
+            return 0
+        with self._lock:
+            if self._started is None:
+                self._started = time.perf_counter()
+            self.stats["batches"] += 1
+        self._sample_size(pending)
+
+        inserted = duplicates = 0
+        reply_lost = False
+        for attempt in range(self.retries):
+            started = time.perf_counter()
+            sent = len(pending)
+            try:
+                result = self.collection.insert_many(pending, ordered=False)
+                inserted += len(result.inserted_ids)
+                pending = []
+            except BulkWriteError as error:
+                self.last_error = error
+                details = error.details or {}
+                inserted += details.get("nInserted", 0)
+                retry = []
+                for write_error in details.get("writeErrors", []):
+                    if write_error.get("code") == DUPLICATE_KEY_ERROR:
+                        if reply_lost:
+                            inserted += 1
+                        else:
+                            duplicates += 1
+                    else:
+                        retry.append(pending[write_error["index"]])
+                pending = retry
+                reply_lost = False
+            except Exception as error:
+                # No per-document details: resend the batch. insert_many has set each
+                # document's _id, so a resent document that did land comes back as a duplicate.
+                self.last_error = error
+                reply_lost = True
+            seconds = time.perf_counter() - started
+            BULK_WRITE_BATCH_SECONDS.observe(seconds, collection=self.collection.name)
+            self._adapt(sent, seconds, failed=bool(pending))
+            if not pending:
+                break
+            if attempt < self.retries - 1:
+                self._count("retried", len(pending))
+                time.sleep(min(8.0, 0.5 * 2 ** attempt))
+
+        self._count("inserted", inserted)
+        self._count("duplicates", duplicates)
+        self._count("failed", len(pending))
+        with self._lock:
+            self._finished = time.perf_counter()
+        return inserted
+
+    def write(self, documents):
+        """
+        Insert an iterable of documents, up to `workers` batches in flight.
+        Each batch is cut when a worker is free, with the batch size adapted
+        to the batches written so far. Returns report().
+        """
+        documents = iter(documents)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bulk-write") as executor:
+            in_flight = set()
+            while True:
+                if len(in_flight) >= self.workers:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                batch = list(islice(documents, self.batch_size))
+                if not batch:
+                    break
+                in_flight.add(executor.submit(self.insert_batch, batch))
+            for future in in_flight:
+                future.result()
+        return self.report()
+
+    def check(self):
+        """Raise the last write error if any document could not be inserted."""
+        if self.stats["failed"] and self.last_error is not None:
+            raise self.last_error
+
+    def report(self):
+        seconds = (self._finished or 0.0) - (self._started or 0.0)
+        inserted = self.stats["inserted"]
+        return dict(
+            self.stats,
+            seconds=round(seconds, 3),
+            docs_per_second=round(inserted / seconds, 1) if seconds > 0 else None,
+            batch_size=self.batch_size,
+            document_bytes=round(self.document_bytes) if self.document_bytes else None,
+        )
+
+
+def print_write_report(report):
+    rate = report["docs_per_second"]
+    print(f"⚡ Inserted {report['inserted']:,} documents in {report['seconds']:.1f}s "
+          f"({rate or 0:,.0f} docs/s, {report['batches']} batches, batch size now {report['batch_size']})")
+    if report["retried"] or report["duplicates"] or report["failed"]:
+        print(f"   🔁 {report['retried']:,} retried, {report['duplicates']:,} duplicates, {report['failed']:,} failed")
+
+
+def _shadow_index_models(collection, shadow):
+    """The target's secondary indexes plus the sales indexes it is missing, for the shadow collection."""
+    models = []
+    seen = set()
+    try:
+        existing = collection.index_information()
+    except Exception:
+        existing = {}
+    for name, info in existing.items():
+        if name == "_id_":
+            continue
+        keys = [(field, direction) for field, direction in info["key"]]
+        options = {option: info[option] for option in INDEX_OPTIONS if option in info}
+        models.append(IndexModel(keys, name=name, **options))
+        seen.add(tuple(keys))
+    for keys in sales_indexes(shadow):
+        if tuple(keys) not in seen:
+            models.append(IndexModel(keys))
+    return models
+
+
+def shadow_collection(collection):
+    """The staging collection a full rebuild of collection is loaded into."""
+    return collection.database[f"{collection.name}{SHADOW_SUFFIX}"]
+
+
+def swap_in_shadow(collection, shadow, expected):
+    """
+    Build the indexes of shadow once, check it holds `expected` documents (the
+    number of input documents, not what the writer reports as inserted) and
+    rename it over collection with dropTarget. Raises RuntimeError, leaving
+    collection as it is, when the count does not match. Returns the seconds
+    spent building indexes.
+    """
+    started = time.perf_counter()
+    models = _shadow_index_models(collection, shadow)
+    if models:
+        shadow.create_indexes(models)
+    index_seconds = time.perf_counter() - started
+
+    stored = shadow.count_documents({})
+    if stored != expected or stored == 0:
+        raise RuntimeError(
+            f"{shadow.name} holds {stored:,} documents, expected {expected:,}: keeping {collection.name} as it is"
+        )
+    shadow.rename(collection.name, dropTarget=True)
+    return index_seconds
+
+
+def load_shadow_collection(collection, documents, batch_size=500, retries=3):
+    """
+    Replace the whole content of collection with documents (already in storage form).
+
+    The documents are bulk loaded into an unindexed `<name>_rebuild`
+    collection, its indexes are built once at the end, the row count is
+    checked against the number of input documents, and the shadow is
+    renamed over the target with dropTarget. Readers see the old data until
+    the rename and the new data after it, never a partial collection. Writes
+    made to the target during the load are lost with the old collection. If
+    a document was rejected as a duplicate or the count does not match, the
+    shadow is dropped and the target is left as it was.
+
+    Time-series collections cannot be renamed, so they are cleared and
+    refilled in place. Returns the BulkWriter report.
+    """
+    if is_timeseries(collection):
+        collection.delete_many({})
+        writer = BulkWriter(collection, batch_size=batch_size, retries=retries)
+        writer.write(documents)
+        writer.check()
+        return writer.report()
+
+    documents = list(documents)
+    shadow = shadow_collection(collection)
+    shadow.drop()
+    writer = BulkWriter(shadow, batch_size=batch_size, retries=retries)
+    try:
+        writer.write(documents)
+        writer.check()
+        if writer.stats["duplicates"]:
+            raise RuntimeError(
+                f"{writer.stats['duplicates']:,} of {len(documents):,} documents were rejected as duplicates: "
+                f"keeping {collection.name} as it is"
+            )
+        index_seconds = swap_in_shadow(collection, shadow, len(documents))
+    except Exception:
+        shadow.drop()
+        raise
+    return dict(writer.report(), index_seconds=round(index_seconds, 3))
+
+
+def refresh_derived_data(collection):
+    """
+    Recompute every rollup and then the stats document of collection after a
+    bulk load. The stats go last so the write_generation bump that
+    invalidates cached summaries lands after the rollups are complete.
+    """
+    try:
+        rebuild_rollups(collection)
+    except Exception as error:
+        print(f"⚠️  Could not update rollups: {error}")
+    try:
+        refresh_collection_stats(collection)
+    except Exception as error:
+        print(f"⚠️  Could not refresh collection stats: {error}")
+
+
+def rebuild_collection(collection, records, batch_size=500, retries=3):
+    """
+    Replace every record of collection through a shadow collection (see
+    load_shadow_collection), then refresh its stats and rebuild its rollups.
+    Returns the BulkWriter report.
+    """
+    report = load_shadow_collection(collection, to_storage_documents(collection, records),
+                                    batch_size=batch_size, retries=retries)
+    refresh_derived_data(collection)
+    return report
 
 
 def replace_collection_with_batches(
@@ -54,49 +601,95 @@ def replace_collection_with_batches(
     Replace matching records by deleting only incoming products and inserting in batches.
 
     When preserve_missing_products=True, products that are not present in incoming
-    records are left untouched in MongoDB.
+    records are left untouched in MongoDB. With preserve_missing_products=False
+    the whole collection is replaced through a shadow collection, so readers
+    never see it empty or half written.
 
-    This keeps large refresh jobs from timing out on Atlas connections.
+    Batches are written concurrently by a BulkWriter, starting at batch_size
+    and adapting to the observed latency, which keeps large refresh jobs from
+    timing out on Atlas connections.
     """
     if not records:
         return 0
 
-    sanitized_records = [sanitize_market_record(item) for item in records]
+    sanitized_records = sanitize_market_records(records)
+    products_to_replace = None
 
     if delete_filter is not None:
-        collection.delete_many(delete_filter)
+        collection.delete_many(translate_filter(collection, delete_filter))
     elif preserve_missing_products:
-        products_to_replace = sorted(
-            {
-                str(item.get(product_field, "")).strip()
-                for item in sanitized_records
-                if str(item.get(product_field, "")).strip()
-            }
-        )
+        products = _clean_products([item.get(product_field) for item in sanitized_records])
+        products_to_replace = sorted(set(products[products != ""].tolist()))
         if products_to_replace:
-            collection.delete_many({product_field: {"$in": products_to_replace}})
+            product_filter = match_values(collection.database, product_field, products_to_replace)
+            collection.delete_many(translate_filter(collection, {product_field: product_filter}))
+
+    if delete_filter is None and not preserve_missing_products:
+        # A full replace is loaded into a shadow collection and swapped in atomically.
+        report = load_shadow_collection(collection, to_storage_documents(collection, sanitized_records),
+                                        batch_size=batch_size, retries=retries)
+        saved_count = report["inserted"]
     else:
-        collection.delete_many({})
+        writer = BulkWriter(collection, batch_size=batch_size, retries=retries)
+        writer.write(to_storage_documents(collection, sanitized_records))
+        writer.check()
+        saved_count = writer.stats["inserted"]
 
-    saved_count = 0
-    total_records = len(records)
+    try:
+        if delete_filter is not None or not rollups_available(collection):
+            # The filter may have removed rows of products that are not being written,
+            # and a first run has to roll up the products already stored.
+            rebuild_rollups(collection)
+        else:
+            replace_product_rollups(collection, sanitized_records, products_to_replace)
+    except Exception as error:
+        print(f"⚠️  Could not update rollups: {error}")
 
-    for start in range(0, total_records, batch_size):
-        batch = sanitized_records[start:start + batch_size]
-        last_error = None
+    # Stats last: the write_generation bump invalidates summaries cached while the rollups were stale.
+    try:
+        refresh_collection_stats(collection)
+    except Exception as error:
+        print(f"⚠️  Could not refresh collection stats: {error}")
 
-        for attempt in range(retries):
-            try:
-                result = collection.insert_many(batch, ordered=False)
-                saved_count += len(result.inserted_ids)
-                last_error = None
-                break
-            except Exception as error:
-                last_error = error
-                if attempt < retries - 1:
-                    time.sleep(1 + attempt)
+    return saved_count
+
+
+def refresh_collection_stats(collection, recent_days=7):
+    """
+    Recompute the summary document read by cheap health checks.
+
+    Ingestion jobs call this after writing so readiness probes never have to
+    scan the sales collection themselves. write_generation is bumped on every
+    refresh so callers can use it as a cache key.
+    """
+    product_count = next(
+        collection.aggregate(translate_pipeline(collection, [
+            {"$group": {"_id": decoded_field(collection.database, "product")}},
+            {"$count": "products"},
+        ])),
+        {},
+    ).get("products", 0)
+    recent_records = collection.count_documents({
+        "date": {"$gte": datetime.now() - timedelta(days=recent_days)}
+    })
+    newest = collection.find_one(sort=[("date", -1)], projection={"date": 1})
+
+    stats = {
+        "products_tracked": product_count,
+        "total_records": collection.estimated_document_count(),
+        "recent_records": recent_records,
+        "recent_days": recent_days,
+        "latest_date": newest.get("date") if newest else None,
+        "updated_at": datetime.now(),
+    }
+    collection.database[STATS_COLLECTION].update_one(
+        {"_id": collection.name},
+        {"$set": stats, "$inc": {"write_generation": 1}},
+        upsert=True,
+    )
+    return stats
 
-        if last_error is not None:
-            raise last_error
 
-    return saved_count
\ No newline at end of file
+def get_collection_stats(collection):
+    """Return the stats document maintained by ingestion, or None if missing."""
+    return collection.database[STATS_COLLECTION].find_one({"_id": collection.name})
\ No newline at end of file
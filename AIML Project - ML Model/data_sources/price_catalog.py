@@ -1,7 +1,11 @@
 """Canonical product price and category helpers for market data generation."""
 
-import random
+import hashlib
+import re
 from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
 
 PRODUCT_PRICE_RANGES = {
     "Apple": (140, 220),
@@ -181,6 +185,101 @@ PRODUCT_PRICE_RANGES = {
     "Cayenne": (50, 100),
     "Ginger": (80, 150),
     "Garlic": (100, 180),
+    # Stocked by the populate, emergency and fallback jobs
+    "Onion": (25, 60),
+    "Drumstick": (50, 100),
+    "Turnip": (40, 70),
+    "Cluster Beans": (50, 95),
+    "French Beans": (60, 110),
+    "Broad Beans": (80, 130),
+    "Green Peas": (60, 120),
+    "Ivy Gourd": (40, 75),
+    "Pointed Gourd": (40, 75),
+    "Lettuce": (80, 150),
+    "Red Onion": (25, 60),
+    "White Onion": (30, 65),
+    "Yellow Onion": (25, 60),
+    "Pearl Onion": (40, 80),
+    "Chow Chow": (40, 70),
+    "Raw Banana": (30, 60),
+    "Taro Root": (45, 80),
+    "Tamarind": (70, 150),
+    "Palm Fruit": (70, 150),
+    "Ber": (70, 150),
+    "Rose Apple": (70, 150),
+    "Sugarcane": (70, 150),
+    "Cranberry": (200, 350),
+    "Longan": (200, 350),
+    "Durian": (300, 500),
+    "Olives": (70, 150),
+    "Soursop": (300, 500),
+    "Mangosteen": (300, 500),
+    "Gooseberry": (70, 150),
+    "Custard Pear": (70, 150),
+    "Indian Fig": (70, 150),
+    "Quince": (70, 150),
+    "Breadfruit": (70, 150),
+    "Kumquat": (200, 350),
+    "Cantaloupe": (60, 120),
+    "Honeydew Melon": (60, 120),
+    "Nectarine": (200, 350),
+    "Pomelo": (60, 120),
+    "Kinnow": (70, 150),
+    "Langsat": (70, 150),
+    "Loquat": (200, 350),
+    "Miracle Fruit": (300, 500),
+    "Snake Fruit": (70, 150),
+    "Indian Blackberry": (70, 150),
+    "Indian Plum": (70, 150),
+    "Indian Almond Fruit": (70, 150),
+    "Bilimbi": (70, 150),
+    "Ceylon Gooseberry": (70, 150),
+    "Malay Apple": (70, 150),
+    "Indian Mulberry": (70, 150),
+    "Santol": (70, 150),
+    "Sapodilla": (70, 150),
+    "Indian Persimmon": (70, 150),
+    "Wild Mango": (70, 150),
+    "Hog Plum": (70, 150),
+    "Indian Bael Fruit": (70, 150),
+    "Elephant Apple": (70, 150),
+    "Phalsa": (70, 150),
+    "Indian Cherry": (70, 150),
+    "Tadgola": (70, 150),
+    "Water Apple": (70, 150),
+    "Indian Fig Fruit": (70, 150),
+    "Gunda Fruit": (70, 150),
+    "Sponge Gourd": (35, 70),
+    "Knol Khol": (35, 80),
+    "Raw Papaya": (35, 80),
+    "Raw Mango": (35, 80),
+    "Green Gram Sprouts": (35, 80),
+    "Black Gram Sprouts": (35, 80),
+    "Chickpeas": (35, 80),
+    "Horse Gram": (35, 80),
+    "Field Beans": (35, 80),
+    "Drumstick Leaves": (25, 60),
+    "Yellow Capsicum": (80, 150),
+    "Red Capsicum": (80, 150),
+    "Green Beans": (55, 105),
+    "Dill Leaves": (25, 60),
+    "Mustard Greens": (25, 55),
+    "Turnip Greens": (25, 60),
+    "Radish Leaves": (25, 60),
+    "Water Spinach": (35, 80),
+    "Malabar Spinach": (35, 80),
+    "Shepu": (35, 80),
+    "Sorrel Leaves": (25, 60),
+    "Ridge Gourd Leaves": (25, 60),
+    "Pumpkin Leaves": (25, 60),
+    "Banana Flower": (60, 110),
+    "Banana Stem": (35, 80),
+    "Lotus Root": (60, 110),
+    "Green Garlic": (35, 80),
+    "Shallots": (35, 80),
+    "Purple Cabbage": (35, 80),
+    "Raw Jackfruit": (35, 80),
+    "Green Soybeans": (35, 80),
 }
 
 FRUIT_KEYWORDS = [
@@ -220,56 +319,311 @@ STAPLE_VEGETABLE_KEYWORDS = [
 ]
 
 
+# Catalog products whose keywords point at the wrong category.
+PRODUCT_CATEGORIES = {
+    "Strawberry": "fruit",
+    "Blueberry": "fruit",
+    "Blackberry": "fruit",
+    "Raw Banana": "vegetable",
+    "Tamarind": "fruit",
+    "Palm Fruit": "fruit",
+    "Ber": "fruit",
+    "Sugarcane": "fruit",
+    "Cranberry": "fruit",
+    "Longan": "fruit",
+    "Durian": "fruit",
+    "Olives": "fruit",
+    "Soursop": "fruit",
+    "Gooseberry": "fruit",
+    "Quince": "fruit",
+    "Breadfruit": "fruit",
+    "Kumquat": "fruit",
+    "Cantaloupe": "fruit",
+    "Honeydew Melon": "fruit",
+    "Nectarine": "fruit",
+    "Pomelo": "fruit",
+    "Kinnow": "fruit",
+    "Langsat": "fruit",
+    "Loquat": "fruit",
+    "Miracle Fruit": "fruit",
+    "Snake Fruit": "fruit",
+    "Indian Blackberry": "fruit",
+    "Indian Almond Fruit": "fruit",
+    "Bilimbi": "fruit",
+    "Ceylon Gooseberry": "fruit",
+    "Santol": "fruit",
+    "Sapodilla": "fruit",
+    "Indian Bael Fruit": "fruit",
+    "Phalsa": "fruit",
+    "Tadgola": "fruit",
+    "Gunda Fruit": "fruit",
+    "Raw Papaya": "vegetable",
+    "Raw Mango": "vegetable",
+    "Banana Flower": "vegetable",
+    "Banana Stem": "vegetable",
+    "Raw Jackfruit": "vegetable",
+}
+
+# Price bands checked in order after the exact-name lookup; the first rule
+# with a keyword inside the lower-cased product name wins.
+PRICE_RANGE_RULES = [
+    (STAPLE_VEGETABLE_KEYWORDS, (25, 90)),
+    (PREMIUM_VEGETABLE_KEYWORDS, (80, 220)),
+    (LEAFY_KEYWORDS, (25, 80)),
+    (["blueberry", "blackberry", "cherry", "fig", "dates"], (400, 800)),
+    (["grape", "grapefruit"], (80, 180)),
+    (["avocado", "kiwi", "dragon fruit", "passion fruit", "rambutan"], (200, 450)),
+    (["apple", "pear", "peach", "plum", "apricot", "pomegranate", "lychee"], (120, 250)),
+    (["gourd", "tori", "lauki", "ghiya", "parwal", "karela", "kundru", "tinda"], (30, 80)),
+    (["bean", "peas", "gram", "cowpea"], (50, 130)),
+]
+
+CATEGORY_RULES = [
+    (STAPLE_VEGETABLE_KEYWORDS, "vegetable"),
+    (PREMIUM_VEGETABLE_KEYWORDS, "vegetable"),
+    (LEAFY_KEYWORDS, "vegetable"),
+    (FRUIT_KEYWORDS, "fruit"),
+]
+
+
+class KeywordClassifier:
+    """
+    Ordered keyword rules compiled into one regex.
+
+    The keywords are folded into a prefix trie and emitted as a zero-width
+    lookahead, so a single finditer pass reports the longest keyword starting
+    at each position without re trying every alternative. Each keyword is
+    ranked by the earliest rule of any keyword that is a prefix of it, which
+    makes the lowest rank seen equal to the first rule an
+    `any(keyword in name ...)` chain would have matched.
+    """
+
+    def __init__(self, rules, default=None):
+        self.results = [result for _, result in rules]
+        self.default = default
+
+        first_rule = {}
+        for index, (keywords, _) in enumerate(rules):
+            for keyword in keywords:
+                first_rule.setdefault(keyword, index)
+
+        self.ranks = {
+            keyword: min(first_rule[other] for other in first_rule if keyword.startswith(other))
+            for keyword in first_rule
+        }
+        self.pattern = re.compile("(?=(" + self._trie_pattern(first_rule) + "))")
+
+    @staticmethod
+    def _trie_pattern(keywords):
+        trie = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[""] = True
+
+        def build(node):
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ""
+            body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+            # Optional groups are greedy, so the longest keyword wins.
+            return "(?:" + body + ")?" if "" in node else body
+
+        return build(trie)
+
+    def rule_index(self, lower_name):
+        best = None
+        for match in self.pattern.finditer(lower_name):
+            rank = self.ranks[match.group(1)]
+            if best is None or rank < best:
+                best = rank
+                if best == 0:
+                    break
+        return best
+
+    def classify(self, product_name):
+        index = self.rule_index(product_name.lower())
+        return self.default if index is None else self.results[index]
+
+
+_CATEGORY_CLASSIFIER = KeywordClassifier(CATEGORY_RULES, default="vegetable")
+_PRICE_RANGE_CLASSIFIER = KeywordClassifier(PRICE_RANGE_RULES)
+
+# Catalog products are resolved once at import time.
+_CATALOG_CATEGORIES = {
+    product: PRODUCT_CATEGORIES.get(product) or _CATEGORY_CLASSIFIER.classify(product)
+    for product in PRODUCT_PRICE_RANGES
+}
+
+
+@lru_cache(maxsize=8192)
 def infer_category(product_name):
-    lower_name = product_name.lower()
-    if any(keyword in lower_name for keyword in STAPLE_VEGETABLE_KEYWORDS):
-        return "vegetable"
-    if any(keyword in lower_name for keyword in PREMIUM_VEGETABLE_KEYWORDS):
-        return "vegetable"
-    if any(keyword in lower_name for keyword in LEAFY_KEYWORDS):
-        return "vegetable"
-    return "fruit" if any(keyword in lower_name for keyword in FRUIT_KEYWORDS) else "vegetable"
+    category = _CATALOG_CATEGORIES.get(product_name)
+    if category is not None:
+        return category
+    return _CATEGORY_CLASSIFIER.classify(product_name)
 
 
+@lru_cache(maxsize=8192)
 def infer_price_range(product_name):
     if product_name in PRODUCT_PRICE_RANGES:
         return PRODUCT_PRICE_RANGES[product_name]
 
-    lower_name = product_name.lower()
+    price_range = _PRICE_RANGE_CLASSIFIER.classify(product_name)
+    if price_range is not None:
+        return price_range
 
-    if any(keyword in lower_name for keyword in STAPLE_VEGETABLE_KEYWORDS):
-        return (25, 90)
+    return (40, 120) if infer_category(product_name) == "vegetable" else (70, 180)
 
-    if any(keyword in lower_name for keyword in PREMIUM_VEGETABLE_KEYWORDS):
-        return (80, 220)
 
-    if any(keyword in lower_name for keyword in LEAFY_KEYWORDS):
-        return (25, 80)
+# Philox4x32-10 constants (Salmon et al., "Parallel random numbers: as easy as 1, 2, 3").
+_PHILOX_M0 = np.uint64(0xD2511F53)
+_PHILOX_M1 = np.uint64(0xCD9E8D57)
+_PHILOX_W0 = np.uint64(0x9E3779B9)
+_PHILOX_W1 = np.uint64(0xBB67AE85)
+_MASK32 = np.uint64(0xFFFFFFFF)
+_SHIFT32 = np.uint64(32)
 
-    if any(keyword in lower_name for keyword in ["blueberry", "blackberry", "cherry", "fig", "dates"]):
-        return (400, 800)
+_PRICE_QUANTITY_STREAM = 1
+_WEATHER_STREAM = 2
 
-    if any(keyword in lower_name for keyword in ["grape", "grapefruit"]):
-        return (80, 180)
 
-    if any(keyword in lower_name for keyword in ["avocado", "kiwi", "dragon fruit", "passion fruit", "rambutan"]):
-        return (200, 450)
+@lru_cache(maxsize=8192)
+def _hash64(text):
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
 
-    if any(keyword in lower_name for keyword in ["apple", "pear", "peach", "plum", "apricot", "pomegranate", "lychee"]):
-        return (120, 250)
 
-    if any(keyword in lower_name for keyword in ["gourd", "tori", "lauki", "ghiya", "parwal", "karela", "kundru", "tinda"]):
-        return (30, 80)
+def philox4x32(counter, key):
+    """
+    Counter-based Philox4x32-10 over NumPy arrays.
 
-    if any(keyword in lower_name for keyword in ["bean", "peas", "gram", "cowpea"]):
-        return (50, 130)
+    counter is four arrays of 32-bit words and key two; all are broadcast
+    together, so every cell of a products x days grid gets its own block in a
+    single vectorized pass. The same (counter, key) always yields the same four
+    output words, on any machine and in any order.
+    """
+    c0, c1, c2, c3 = (np.asarray(word, dtype=np.uint64) & _MASK32 for word in counter)
+    k0, k1 = (np.asarray(word, dtype=np.uint64) & _MASK32 for word in key)
+    c0, c1, c2, c3, k0, k1 = np.broadcast_arrays(c0, c1, c2, c3, k0, k1)
+
+    for round_index in range(10):
+        if round_index:
+            k0 = (k0 + _PHILOX_W0) & _MASK32
+            k1 = (k1 + _PHILOX_W1) & _MASK32
+        product0 = _PHILOX_M0 * c0
+        product1 = _PHILOX_M1 * c2
+        c0, c1, c2, c3 = (
+            (product1 >> _SHIFT32) ^ c1 ^ k0,
+            product1 & _MASK32,
+            (product0 >> _SHIFT32) ^ c3 ^ k1,
+            product0 & _MASK32,
+        )
+    return c0, c1, c2, c3
+
+
+def _philox_block(counter, key):
+    """
+    One Philox4x32-10 block on Python ints: the same four words philox4x32
+    gives for that cell, without the array setup the scalar helpers cannot
+    amortize.
+    """
+    mask = 0xFFFFFFFF
+    c0, c1, c2, c3 = (word & mask for word in counter)
+    k0, k1 = (word & mask for word in key)
+    for round_index in range(10):
+        if round_index:
+            k0 = (k0 + 0x9E3779B9) & mask
+            k1 = (k1 + 0xBB67AE85) & mask
+        product0 = 0xD2511F53 * c0
+        product1 = 0xCD9E8D57 * c2
+        c0, c1, c2, c3 = (product1 >> 32) ^ c1 ^ k0, product1 & mask, (product0 >> 32) ^ c3 ^ k1, product0 & mask
+    return c0, c1, c2, c3
 
-    return (40, 120) if infer_category(product_name) == "vegetable" else (70, 180)
+
+def _product_key(product_name):
+    key = _hash64(product_name)
+    return key, key >> 32
+
+
+def _scalar_uniform(high_word, low_word, low=0.0, high=1.0):
+    """_uniform for one pair of Python int words."""
+    unit = ((high_word >> 5) * 67108864.0 + (low_word >> 6)) / 9007199254740992.0
+    return low + (high - low) * unit
+
+
+def _round(value, decimals):
+    # NumPy's round (scale, round half to even, unscale), so scalars match the arrays exactly.
+    scale = 10.0 ** decimals
+    return round(value * scale) / scale
+
+
+def _uniform(high_word, low_word, low=0.0, high=1.0):
+    """Combine two 32-bit words into a 53-bit uniform double in [low, high)."""
+    unit = ((high_word >> np.uint64(5)).astype(float) * 67108864.0 + (low_word >> np.uint64(6)).astype(float)) / 9007199254740992.0
+    return low + (high - low) * unit
+
+
+class MarketSimulation:
+    """
+    Deterministic products x day offsets simulation of prices, quantities and weather.
+
+    Each (product, date_seed, day_offset) cell is one Philox block keyed by a
+    hash of the product name, so a cell has the same value no matter which
+    products or days are simulated alongside it.
+    """
+
+    def __init__(self, products, day_offsets=range(7), date_seed=None):
+        self.products = list(products)
+        self.day_offsets = np.asarray(list(day_offsets), dtype=np.int64)
+        if date_seed is None:
+            date_seed = datetime.utcnow().strftime("%Y-%m-%d")
+        self.date_seed = date_seed
+        self.index = {product: row for row, product in enumerate(self.products)}
+
+        product_keys = np.array([_hash64(product) for product in self.products], dtype=np.uint64)
+        key = (product_keys[:, None], product_keys[:, None] >> _SHIFT32)
+        date_word = np.uint64(_hash64(str(date_seed)) & 0xFFFFFFFF)
+        offsets = self.day_offsets.astype(np.uint64)[None, :]
+
+        words = philox4x32((offsets, date_word, _PRICE_QUANTITY_STREAM, 0), key)
+        ranges = np.array([infer_price_range(product) for product in self.products], dtype=float).reshape(-1, 2)
+        min_prices, max_prices = ranges[:, :1], ranges[:, 1:]
+        midpoints = (min_prices + max_prices) / 2
+        prices = np.clip(midpoints * _uniform(words[0], words[1], 0.95, 1.05), min_prices, max_prices)
+        self.price = prices.round(2)
+        self.quantity = _uniform(words[2], words[3], 90, 360).round(1)
+
+        weather = philox4x32((0, 0, _WEATHER_STREAM, 0), (key[0][:, 0], key[1][:, 0]))
+        self.temperature = _uniform(weather[0], weather[1], 20, 32).round(1)
+        self.rainfall = _uniform(weather[2], weather[3], 0, 18).round(1)
+
+    def for_product(self, product):
+        """Python lists of one product's simulated series, ordered like day_offsets."""
+        row = self.index[product]
+        return {
+            "price": self.price[row].tolist(),
+            "quantity": self.quantity[row].tolist(),
+            "temperature": float(self.temperature[row]),
+            "rainfall": float(self.rainfall[row]),
+        }
+
+
+def simulate_market(products, day_offsets=range(7), date_seed=None):
+    return MarketSimulation(products, day_offsets, date_seed)
+
+
+# The scalar helpers compute the one Philox block of their cell directly; they
+# return exactly what simulate_market gives for the same product and day.
+def _price_quantity_words(product_name, day_offset, date_seed):
+    if date_seed is None:
+        date_seed = datetime.utcnow().strftime("%Y-%m-%d")
+    counter = (int(day_offset), _hash64(str(date_seed)), _PRICE_QUANTITY_STREAM, 0)
+    return _philox_block(counter, _product_key(product_name))
 
 
 def deterministic_price(product_name, day_offset=0, observed_price=None, date_seed=None):
     min_price, max_price = infer_price_range(product_name)
-    midpoint = (min_price + max_price) / 2
 
     if observed_price is not None:
         try:
@@ -279,26 +633,20 @@ def deterministic_price(product_name, day_offset=0, observed_price=None, date_se
         except Exception:
             pass
 
-    if date_seed is None:
-        date_seed = datetime.utcnow().strftime("%Y-%m-%d")
-
-    rng = random.Random(f"{product_name}:{date_seed}:{day_offset}")
-    price = midpoint * rng.uniform(0.95, 1.05)
-    price = max(min_price, min(max_price, price))
-    return round(price, 2)
+    words = _price_quantity_words(product_name, day_offset, date_seed)
+    midpoint = (float(min_price) + float(max_price)) / 2
+    price = min(max(midpoint * _scalar_uniform(words[0], words[1], 0.95, 1.05), min_price), max_price)
+    return _round(float(price), 2)
 
 
 def deterministic_quantity(product_name, day_offset=0, date_seed=None):
-    if date_seed is None:
-        date_seed = datetime.utcnow().strftime("%Y-%m-%d")
-
-    rng = random.Random(f"{product_name}:quantity:{date_seed}:{day_offset}")
-    return round(rng.uniform(90, 360), 1)
+    words = _price_quantity_words(product_name, day_offset, date_seed)
+    return _round(_scalar_uniform(words[2], words[3], 90, 360), 1)
 
 
 def deterministic_weather(product_name):
-    rng = random.Random(f"{product_name}:weather")
+    words = _philox_block((0, 0, _WEATHER_STREAM, 0), _product_key(product_name))
     return {
-        "temperature": round(rng.uniform(20, 32), 1),
-        "rainfall": round(rng.uniform(0, 18), 1),
-    }
\ No newline at end of file
+        "temperature": _round(_scalar_uniform(words[0], words[1], 20, 32), 1),
+        "rainfall": _round(_scalar_uniform(words[2], words[3], 0, 18), 1),
+    }
@@ -0,0 +1,182 @@
+"""
+Single product catalog shared by the fetchers, populate scripts and vectorized code.
+
+Product names, price ranges and categories come from price_catalog; this
+module adds the tracked and market product lists and stores everything once
+in NumPy arrays indexed by an integer product ID, so vectorized code can
+look products up by ID instead of hashing names row by row.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from data_sources.price_catalog import PRODUCT_PRICE_RANGES, infer_category, infer_price_range
+
+CATEGORIES = ("vegetable", "fruit")
+UNKNOWN_PRODUCT_ID = -1
+
+# Products refreshed by the daily comprehensive update and /data/populate.
+TRACKED_PRODUCTS = (
+    "Apple", "Banana", "Orange", "Mango", "Grape", "Strawberry", "Watermelon",
+    "Pineapple", "Papaya", "Guava", "Pomegranate", "Kiwi", "Lemon", "Lime", "Peach",
+    "Plum", "Cherry", "Apricot", "Pear", "Lychee", "Dragon Fruit", "Passion Fruit",
+    "Avocado", "Coconut", "Dates", "Fig", "Jackfruit", "Custard Apple", "Sapota",
+    "Mulberry", "Tomato", "Potato", "Onion", "Carrot", "Cabbage", "Cauliflower",
+    "Brinjal", "Cucumber", "Spinach", "Pumpkin", "Bottle Gourd", "Bitter Gourd",
+    "Ridge Gourd", "Snake Gourd", "Ash Gourd", "Drumstick", "Okra", "Capsicum",
+    "Chilli", "Ginger", "Garlic", "Beetroot", "Radish", "Turnip", "Sweet Potato", "Yam",
+    "Tapioca", "Colocasia", "Elephant Yam", "Cluster Beans", "French Beans",
+    "Broad Beans", "Green Peas", "Cowpea", "Ivy Gourd", "Pointed Gourd", "Tinda",
+    "Parwal", "Karela", "Tori", "Ghiya", "Kaddu", "Lauki", "Torai", "Parval", "Kundru",
+    "Arbi", "Kachalu", "Jimikand", "Suran", "Coriander Leaves", "Mint Leaves",
+    "Curry Leaves", "Fenugreek Leaves", "Amaranth Leaves", "Colocasia Leaves",
+    "Mustard Leaves", "Lettuce", "Celery", "Parsley", "Basil", "Dill", "Rosemary",
+    "Thyme", "Oregano", "Broccoli", "Zucchini", "Asparagus", "Artichoke",
+    "Brussels Sprouts", "Kale", "Bok Choy", "Swiss Chard", "Collard Greens", "Arugula",
+    "Watercress", "Endive", "Radicchio", "Fennel", "Leek", "Shallot", "Spring Onion",
+    "Chives", "Scallion", "Bell Pepper Red", "Bell Pepper Yellow", "Bell Pepper Green",
+    "Jalapeno", "Habanero", "Serrano", "Poblano", "Anaheim", "Cayenne", "Baby Corn",
+    "Sweet Corn", "Corn on Cob", "Baby Carrot", "Cherry Tomato", "Grape Tomato",
+    "Roma Tomato", "Beefsteak Tomato", "Heirloom Tomato", "Red Cabbage",
+    "Savoy Cabbage", "Napa Cabbage", "Chinese Cabbage", "Purple Cauliflower",
+    "Romanesco", "Broccoflower", "White Radish", "Black Radish", "Red Radish", "Daikon",
+    "Horseradish", "Red Onion", "White Onion", "Yellow Onion", "Pearl Onion",
+    "Vidalia Onion", "Russet Potato", "Red Potato", "White Potato", "Yellow Potato",
+    "Purple Potato", "Fingerling Potato", "New Potato", "Green Apple", "Red Apple",
+    "Gala Apple", "Fuji Apple", "Granny Smith", "Honeycrisp", "Golden Delicious",
+    "Cavendish Banana", "Red Banana", "Plantain", "Baby Banana", "Navel Orange",
+    "Blood Orange", "Mandarin", "Tangerine", "Clementine", "Satsuma", "Alphonso Mango",
+    "Kesar Mango", "Dasheri Mango", "Langra Mango", "Totapuri Mango", "Badami Mango",
+    "Chausa Mango", "Safeda Mango", "Green Grape", "Red Grape", "Black Grape",
+    "Seedless Grape", "Cotton Candy Grape",
+)
+
+# Products written by populate_180_products.py and the alternative fetcher.
+MARKET_PRODUCTS = (
+    "Apple", "Banana", "Mango", "Orange", "Papaya", "Pineapple", "Guava", "Watermelon",
+    "Muskmelon", "Pomegranate", "Grapes", "Sapota", "Custard Apple", "Jackfruit",
+    "Lychee", "Strawberry", "Blueberry", "Blackberry", "Pear", "Peach", "Plum",
+    "Apricot", "Kiwi", "Dragon Fruit", "Passion Fruit", "Fig", "Dates", "Coconut",
+    "Tender Coconut", "Sweet Lime", "Amla", "Jamun", "Karonda", "Wood Apple",
+    "Star Fruit", "Mulberry", "Rambutan", "Avocado", "Persimmon", "Cherry", "Potato",
+    "Tomato", "Onion", "Red Onion", "White Onion", "Yellow Onion", "Garlic", "Ginger",
+    "Carrot", "Cabbage", "Cauliflower", "Brinjal", "Capsicum", "Green Chilli",
+    "Cucumber", "Bottle Gourd", "Ridge Gourd", "Bitter Gourd", "Snake Gourd",
+    "Ash Gourd", "Pumpkin", "Radish", "Turnip", "Beetroot", "Drumstick",
+    "Cluster Beans", "French Beans", "Broad Beans", "Green Peas", "Chow Chow",
+    "Raw Banana", "Taro Root", "Sweet Potato", "Yam", "Spinach", "Fenugreek Leaves",
+    "Coriander Leaves", "Mint Leaves", "Curry Leaves", "Spring Onion", "Lettuce",
+    "Broccoli", "Zucchini", "Mushroom", "Corn", "Baby Corn", "Lady Finger",
+    "Brussels Sprouts", "Mandarin", "Tamarind", "Palm Fruit", "Ber", "Rose Apple",
+    "Sugarcane", "Grapefruit", "Cranberry", "Longan", "Durian", "Olives", "Soursop",
+    "Mangosteen", "Gooseberry", "Custard Pear", "Indian Fig", "Quince", "Breadfruit",
+    "Kumquat", "Cantaloupe", "Honeydew Melon", "Nectarine", "Pomelo", "Red Banana",
+    "Plantain", "Kinnow", "Langsat", "Loquat", "Miracle Fruit", "Snake Fruit",
+    "Indian Blackberry", "Indian Plum", "Indian Almond Fruit", "Bilimbi",
+    "Ceylon Gooseberry", "Malay Apple", "Indian Mulberry", "Santol", "Sapodilla",
+    "Indian Persimmon", "Wild Mango", "Hog Plum", "Indian Bael Fruit", "Elephant Apple",
+    "Phalsa", "Indian Cherry", "Tadgola", "Water Apple", "Indian Fig Fruit",
+    "Gunda Fruit", "Colocasia Leaves", "Amaranth Leaves", "Ivy Gourd", "Pointed Gourd",
+    "Sponge Gourd", "Knol Khol", "Raw Papaya", "Raw Mango", "Green Gram Sprouts",
+    "Black Gram Sprouts", "Chickpeas", "Horse Gram", "Field Beans", "Drumstick Leaves",
+    "Red Cabbage", "Yellow Capsicum", "Red Capsicum", "Green Beans", "Celery", "Leek",
+    "Parsley", "Basil", "Dill Leaves", "Mustard Greens", "Turnip Greens",
+    "Radish Leaves", "Kale", "Bok Choy", "Arugula", "Water Spinach", "Malabar Spinach",
+    "Shepu", "Sorrel Leaves", "Ridge Gourd Leaves", "Pumpkin Leaves", "Banana Flower",
+    "Banana Stem", "Lotus Root", "Green Garlic", "Pearl Onion", "Shallots",
+    "White Radish", "Purple Cabbage", "Raw Jackfruit", "Green Soybeans",
+)
+
+SEASONAL_PRODUCTS = frozenset((
+    "Mango", "Orange", "Guava", "Watermelon", "Muskmelon", "Grapes", "Custard Apple",
+    "Jackfruit", "Lychee", "Strawberry", "Blackberry", "Pear", "Peach", "Plum",
+    "Apricot", "Passion Fruit", "Fig", "Sweet Lime", "Amla", "Jamun", "Karonda",
+    "Wood Apple", "Star Fruit", "Mulberry", "Rambutan", "Persimmon", "Cherry",
+    "Cauliflower", "Radish", "Turnip", "Drumstick", "Cluster Beans", "Broad Beans",
+    "Green Peas", "Fenugreek Leaves", "Corn", "Brussels Sprouts", "Mandarin",
+    "Tamarind", "Palm Fruit", "Ber", "Rose Apple", "Sugarcane", "Grapefruit",
+    "Cranberry", "Longan", "Durian", "Olives", "Soursop", "Mangosteen", "Gooseberry",
+    "Custard Pear", "Indian Fig", "Quince", "Breadfruit", "Kumquat", "Cantaloupe",
+    "Honeydew Melon", "Nectarine", "Pomelo", "Red Banana", "Plantain", "Kinnow",
+    "Langsat", "Loquat", "Miracle Fruit", "Snake Fruit", "Indian Blackberry",
+    "Indian Plum", "Indian Almond Fruit", "Bilimbi", "Ceylon Gooseberry", "Malay Apple",
+    "Indian Mulberry", "Santol", "Sapodilla", "Indian Persimmon", "Wild Mango",
+    "Hog Plum", "Indian Bael Fruit", "Elephant Apple", "Phalsa", "Indian Cherry",
+    "Tadgola", "Water Apple", "Indian Fig Fruit", "Gunda Fruit",
+))
+
+
+class ProductCatalog:
+    """
+    Array-backed product catalog.
+
+    Product IDs are positions in `names`: price_catalog products first, then
+    tracked and market products not priced there. They are only meaningful
+    within one process: adding a product to PRODUCT_PRICE_RANGES (or to the
+    tracked list) shifts the ID of every product after it, so IDs must not be
+    stored. Persistent codes are the compact schema's (sales_schema).
+    """
+
+    def __init__(self, names):
+        self.names = tuple(dict.fromkeys(names))
+        self.ids = {name: product_id for product_id, name in enumerate(self.names)}
+
+        ranges = np.array([infer_price_range(name) for name in self.names], dtype=float).reshape(-1, 2)
+        self.min_prices = ranges[:, 0]
+        self.max_prices = ranges[:, 1]
+        self.category_codes = np.array(
+            [CATEGORIES.index(infer_category(name)) for name in self.names], dtype=np.int8
+        )
+        self.seasonal = np.array([name in SEASONAL_PRODUCTS for name in self.names], dtype=bool)
+        tracked = set(TRACKED_PRODUCTS)
+        self.tracked = np.array([name in tracked for name in self.names], dtype=bool)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def id_of(self, name):
+        return self.ids.get(name, UNKNOWN_PRODUCT_ID)
+
+    def ids_of(self, names):
+        """Product IDs for a sequence of names; unknown names get UNKNOWN_PRODUCT_ID."""
+        names = list(names)
+        return np.fromiter((self.ids.get(name, UNKNOWN_PRODUCT_ID) for name in names), dtype=np.int32, count=len(names))
+
+    def category_of(self, product_id):
+        return CATEGORIES[self.category_codes[product_id]]
+
+    def price_ranges_of(self, names):
+        """
+        (min_prices, max_prices) arrays for names, read from the catalog arrays
+        by ID and inferred from keywords only for names outside the catalog.
+        """
+        names = list(names)
+        ids = self.ids_of(names)
+        known = ids != UNKNOWN_PRODUCT_ID
+        min_prices = np.empty(len(names))
+        max_prices = np.empty(len(names))
+        min_prices[known] = self.min_prices[ids[known]]
+        max_prices[known] = self.max_prices[ids[known]]
+        for row in np.flatnonzero(~known):
+            min_prices[row], max_prices[row] = infer_price_range(names[row])
+        return min_prices, max_prices
+
+    def product_table(self, names):
+        """{name: {category, price_range, seasonal}} for names, as the populate scripts use it."""
+        return {
+            name: {
+                "category": infer_category(name),
+                "price_range": infer_price_range(name),
+                "seasonal": name in SEASONAL_PRODUCTS,
+            }
+            for name in names
+        }
+
+
+@lru_cache(maxsize=1)
+def get_catalog():
+    """The process-wide catalog, built on first use."""
+    return ProductCatalog(list(PRODUCT_PRICE_RANGES) + list(TRACKED_PRODUCTS) + list(MARKET_PRODUCTS))
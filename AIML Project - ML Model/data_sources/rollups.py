@@ -0,0 +1,300 @@
+"""
+Per-product daily and weekly rollups of the sales history.
+
+For a sales collection named `sales` the rollups live in `sales_daily` and
+`sales_weekly`. There is one document per (product, period) with the price
+mean/min/max, quantity and stock sums, the first and last record date, and
+per-source record counts. The sums are kept next to the means so periods
+can be combined exactly.
+
+Ingestion replaces the full history of the products it writes, so the
+rollups of those products are recomputed from the records being written,
+without reading the raw collection back. refresh_product_rollups rereads
+the products whose rows were rewritten in place, and rebuild_rollups
+recomputes everything from the raw collection after bulk loads.
+
+Usage (from the "AIML Project - ML Model" directory):
+    python -m data_sources.rollups --rebuild
+"""
+import argparse
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from data_sources.sales_schema import decode_records, decode_values, match_values
+from data_sources.sales_storage import (
+    from_storage_documents,
+    get_sales_collection,
+    translate_field,
+    translate_filter,
+)
+
+load_dotenv()
+
+PERIODS = ("daily", "weekly")
+STAGING_SUFFIX = "_rebuild_"
+# Staging collections older than this are leftovers of a crashed rebuild.
+STAGING_MAX_AGE = int(os.getenv("ROLLUP_STAGING_MAX_AGE", "3600"))
+SOURCE_FIELDS = {"_id": 0, "product": 1, "category": 1, "meta": 1, "date": 1, "price": 1,
+                 "quantity": 1, "stock": 1, "source": 1}
+
+
+def rollup_collection(collection, period):
+    """The rollup collection of a sales collection, e.g. sales -> sales_daily."""
+    return collection.database[f"{collection.name}_{period}"]
+
+
+def _create_rollup_indexes(rollup):
+    rollup.create_index([("product", 1), ("period", -1)])
+    rollup.create_index([("period", -1)])
+
+
+def ensure_rollup_indexes(collection):
+    for period in PERIODS:
+        _create_rollup_indexes(rollup_collection(collection, period))
+
+
+def _period_start(dates, period):
+    days = dates.dt.normalize()
+    if period == "weekly":
+        # Weeks start on Monday.
+        days = days - pd.to_timedelta(days.dt.weekday, unit="D")
+    return days
+
+
+def compute_rollups(records, period="daily"):
+    """Rollup documents for flat sales records (decoded, product names as strings)."""
+    df = pd.DataFrame(records)
+    if df.empty or "product" not in df.columns or "date" not in df.columns:
+        return []
+    for column in ("category", "source"):
+        if column not in df.columns:
+            df[column] = None
+    df["source"] = df["source"].fillna("unknown")
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df["period"] = _period_start(df["date"], period)
+    df = df.dropna(subset=["period", "product"])
+    for column in ("price", "quantity", "stock"):
+        df[column] = pd.to_numeric(df[column], errors="coerce") if column in df.columns else float("nan")
+
+    grouped = df.groupby(["product", "period"], sort=True)
+    summary = grouped.agg(
+        category=("category", "first"),
+        first_date=("date", "min"),
+        last_date=("date", "max"),
+        records=("product", "size"),
+        price_sum=("price", "sum"),
+        price_count=("price", "count"),
+        price_min=("price", "min"),
+        price_max=("price", "max"),
+        quantity_sum=("quantity", "sum"),
+        quantity_count=("quantity", "count"),
+        stock_sum=("stock", "sum"),
+        stock_count=("stock", "count"),
+    ).reset_index()
+    sources = df.groupby(["product", "period", "source"]).size()
+
+    now = datetime.now()
+    documents = []
+    for row in summary.itertuples(index=False):
+        period_start = row.period.to_pydatetime()
+        by_source = sources.loc[(row.product, row.period)]
+        documents.append({
+            "_id": {"product": row.product, "period": period_start},
+            "product": row.product,
+            "category": row.category,
+            "period": period_start,
+            "records": int(row.records),
+            "first_date": row.first_date.to_pydatetime(),
+            "last_date": row.last_date.to_pydatetime(),
+            "price_avg": round(row.price_sum / row.price_count, 2) if row.price_count else None,
+            "price_min": None if pd.isna(row.price_min) else float(row.price_min),
+            "price_max": None if pd.isna(row.price_max) else float(row.price_max),
+            "price_sum": float(row.price_sum),
+            "price_count": int(row.price_count),
+            "quantity_sum": float(row.quantity_sum),
+            "quantity_count": int(row.quantity_count),
+            "stock_sum": float(row.stock_sum),
+            "stock_count": int(row.stock_count),
+            "stock_avg": round(row.stock_sum / row.stock_count, 2) if row.stock_count else None,
+            "sources": [{"source": source, "records": int(count)} for source, count in by_source.items()],
+            "updated_at": now,
+        })
+    return documents
+
+
+def replace_product_rollups(collection, records, products=None):
+    """
+    Replace the rollups of products (all products when None) with the
+    rollups of records. Call after the raw history of those products has
+    been replaced by records.
+    """
+    records = decode_records(collection.database, [dict(record) for record in records])
+    for period in PERIODS:
+        rollup = rollup_collection(collection, period)
+        rollup.delete_many({"product": {"$in": list(products)}} if products is not None else {})
+        documents = compute_rollups(records, period)
+        if documents:
+            rollup.insert_many(documents, ordered=False)
+
+
+def _read_products(collection, products):
+    """Decoded raw records of products, with the fields the rollups need."""
+    database = collection.database
+    query = translate_filter(collection, {"product": match_values(database, "product", list(products))})
+    return decode_records(database, from_storage_documents(list(collection.find(query, SOURCE_FIELDS))))
+
+
+def refresh_product_rollups(collection, products, batch_products=50):
+    """
+    Recompute the rollups of products from the raw collection, for rows that
+    were rewritten in place. Does nothing until the rollups have been built,
+    so a partial set never makes rollups_available() true.
+    """
+    if not rollups_available(collection):
+        return 0
+    products = sorted(set(products))
+    refreshed = 0
+    for start in range(0, len(products), batch_products):
+        batch = products[start:start + batch_products]
+        records = _read_products(collection, batch)
+        replace_product_rollups(collection, records, batch)
+        refreshed += len(records)
+    return refreshed
+
+
+def _drop_stale_staging(database, prefix, now):
+    """Drop `<prefix><started>_<id>` staging collections left behind more than STAGING_MAX_AGE ago."""
+    for name in database.list_collection_names():
+        if not name.startswith(prefix):
+            continue
+        started = name[len(prefix):].split("_", 1)[0]
+        if started.isdigit() and now - int(started) > STAGING_MAX_AGE:
+            database[name].drop()
+
+
+def rebuild_rollups(collection, batch_products=50):
+    """
+    Recompute every rollup from the raw collection, a batch of products at a time.
+
+    The rollups are built into `<rollup>_rebuild_<started>_<id>` staging
+    collections, unique to this run, and renamed over the live ones once
+    complete, so readers keep seeing the previous rollups (or none) for the
+    whole rebuild, never a partial set. Concurrent rebuilds do not touch each
+    other's staging; the last one to finish wins. Staging collections of
+    crashed runs are dropped once older than STAGING_MAX_AGE.
+    Callers refresh the collection stats afterwards, which bumps
+    write_generation and invalidates summaries cached from the old rollups.
+    """
+    database = collection.database
+    distinct = collection.distinct(translate_field(collection, "product"))
+    products = sorted(product for product in decode_values(database, "product", distinct) if product)
+    now = int(time.time())
+    run_id = f"{now}_{uuid.uuid4().hex[:8]}"
+    staging = {}
+    for period in PERIODS:
+        prefix = f"{rollup_collection(collection, period).name}{STAGING_SUFFIX}"
+        _drop_stale_staging(database, prefix, now)
+        staging[period] = database[f"{prefix}{run_id}"]
+
+    rebuilt = 0
+    try:
+        for start in range(0, len(products), batch_products):
+            records = _read_products(collection, products[start:start + batch_products])
+            for period, stage in staging.items():
+                documents = compute_rollups(records, period)
+                if documents:
+                    stage.insert_many(documents, ordered=False)
+            rebuilt += len(records)
+    except Exception:
+        for stage in staging.values():
+            stage.drop()
+        raise
+
+    existing = set(database.list_collection_names())
+    for period, stage in staging.items():
+        live = rollup_collection(collection, period)
+        if stage.name in existing:
+            _create_rollup_indexes(stage)
+            stage.rename(live.name, dropTarget=True)
+        else:
+            # Nothing to roll up: an empty raw collection has no rollups.
+            live.drop()
+    ensure_rollup_indexes(collection)
+    return rebuilt
+
+
+def rollups_available(collection, period="daily"):
+    return rollup_collection(collection, period).find_one({}, {"_id": 1}) is not None
+
+
+def recent_product_summary(collection, days, period="daily"):
+    """
+    Per-product averages over the last `days` days of rollups, counted back
+    from the newest period: [{product, category, avg_price, avg_quantity,
+    avg_stock}] sorted by product. Empty when no rollups exist.
+    """
+    rollup = rollup_collection(collection, period)
+    newest = rollup.find_one({}, {"period": 1}, sort=[("period", -1)])
+    if not newest:
+        return []
+    since = newest["period"] - timedelta(days=max(days, 1) - 1)
+    pipeline = [
+        {"$match": {"period": {"$gte": since}}},
+        {"$group": {
+            "_id": "$product",
+            "category": {"$first": "$category"},
+            "price_sum": {"$sum": "$price_sum"},
+            "price_count": {"$sum": "$price_count"},
+            "quantity_sum": {"$sum": "$quantity_sum"},
+            "quantity_count": {"$sum": "$quantity_count"},
+            "stock_sum": {"$sum": "$stock_sum"},
+            "stock_count": {"$sum": "$stock_count"},
+        }},
+        {"$sort": {"_id": 1}},
+    ]
+    summary = []
+    for item in rollup.aggregate(pipeline):
+        summary.append({
+            "product": item["_id"],
+            "category": item.get("category"),
+            "avg_price": item["price_sum"] / item["price_count"] if item["price_count"] else 0.0,
+            "avg_quantity": item["quantity_sum"] / item["quantity_count"] if item["quantity_count"] else 0.0,
+            "avg_stock": item["stock_sum"] / item["stock_count"] if item["stock_count"] else 0.0,
+        })
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the sales rollup collections")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute every rollup from the raw collection")
+    parser.add_argument("--batch-products", type=int, default=50)
+    args = parser.parse_args()
+    if not args.rebuild:
+        parser.error("nothing to do: pass --rebuild")
+
+    from pymongo import MongoClient
+
+    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))
+    collection = get_sales_collection(client["market_analyzer"])
+
+    print("\n" + "=" * 70)
+    print(f"📊 REBUILDING ROLLUPS OF market_analyzer.{collection.name}")
+    print("=" * 70)
+    started = time.perf_counter()
+    rows = rebuild_rollups(collection, batch_products=args.batch_products)
+    from data_sources.mongodb_utils import refresh_collection_stats
+    refresh_collection_stats(collection)
+    print(f"✅ Rolled up {rows:,} records in {time.perf_counter() - started:.1f}s")
+    for period in PERIODS:
+        rollup = rollup_collection(collection, period)
+        print(f"   • {rollup.name}: {rollup.estimated_document_count():,} documents")
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
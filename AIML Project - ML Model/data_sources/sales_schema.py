@@ -0,0 +1,319 @@
+"""
+Compact document schema for the sales collection.
+
+With SALES_SCHEMA=compact the repeated strings of every sales document
+(product, category, source, unit, confidence) are stored as small integer
+codes, and the code -> string tables live in the sales_dictionary
+collection, one document per field. Product codes are seeded from the
+product catalog IDs, so the catalog products keep the code they have in
+data_sources/product_catalog.py.
+
+Decoding is per value: strings pass through untouched, so readers work on a
+collection that is only partly migrated, or not migrated at all.
+Aggregations that group on an encoded field must group on decoded_field(),
+or the plain and compact documents of one value end up in separate groups.
+
+Usage (from the "AIML Project - ML Model" directory):
+    python -m data_sources.sales_schema --to compact
+    python -m data_sources.sales_schema --to plain --batch-size 5000
+"""
+import argparse
+import os
+import re
+import threading
+import time
+
+import bson
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+from pymongo import UpdateOne
+
+from data_sources.product_catalog import get_catalog
+
+load_dotenv()
+
+SALES_SCHEMA = os.getenv("SALES_SCHEMA", "plain").lower()
+DICTIONARY_COLLECTION = "sales_dictionary"
+ENCODED_FIELDS = ("product", "category", "source", "unit", "confidence")
+
+
+def compact_enabled():
+    return SALES_SCHEMA == "compact"
+
+
+def _is_code(value):
+    return isinstance(value, (int, np.integer)) and not isinstance(value, bool)
+
+
+class SalesCodec:
+    """
+    Maps the encoded fields between strings and integer codes.
+
+    Codes are list positions in the field's dictionary document and are only
+    ever appended, so a code never changes meaning once written. The
+    dictionaries are cached in memory and reloaded when an unknown code or a
+    new value shows up.
+    """
+
+    def __init__(self, database):
+        self.collection = database[DICTIONARY_COLLECTION]
+        self.values = {}
+        self.codes = {}
+        self._lock = threading.Lock()
+        self._seed()
+        self.reload()
+
+    def _seed(self):
+        seeds = {field: [] for field in ENCODED_FIELDS}
+        seeds["product"] = list(get_catalog().names)
+        for field, values in seeds.items():
+            self.collection.update_one({"_id": field}, {"$setOnInsert": {"values": values}}, upsert=True)
+
+    def reload(self):
+        with self._lock:
+            for document in self.collection.find({"_id": {"$in": list(ENCODED_FIELDS)}}):
+                values = list(document.get("values", []))
+                self.values[document["_id"]] = values
+                self.codes[document["_id"]] = {value: code for code, value in enumerate(values)}
+
+    def code_of(self, field, value, create=False):
+        """Integer code of value, assigning a new one when create=True; None if unknown."""
+        code = self.codes[field].get(value)
+        if code is None and create:
+            # $ne keeps concurrent writers from appending the same value twice.
+            self.collection.update_one({"_id": field, "values": {"$ne": value}}, {"$push": {"values": value}})
+            self.reload()
+            code = self.codes[field].get(value)
+        return code
+
+    def value_of(self, field, code):
+        values = self.values[field]
+        if code >= len(values):
+            self.reload()
+            values = self.values[field]
+        return values[code] if code < len(values) else None
+
+    def encode_value(self, field, value):
+        if isinstance(value, str):
+            return self.code_of(field, value, create=True)
+        return value
+
+    def decode_value(self, field, value):
+        if _is_code(value):
+            return self.value_of(field, int(value))
+        return value
+
+    def encode_records(self, records):
+        """Copies of records with their encoded fields replaced by codes."""
+        encoded = []
+        for record in records:
+            record = dict(record)
+            for field in ENCODED_FIELDS:
+                if field in record:
+                    record[field] = self.encode_value(field, record[field])
+            encoded.append(record)
+        return encoded
+
+    def decode_records(self, records, fields=ENCODED_FIELDS):
+        """Decode records in place (and return them); plain string values are left alone."""
+        for record in records:
+            for field in fields:
+                if field in record:
+                    record[field] = self.decode_value(field, record[field])
+        return records
+
+    def decode_frame(self, df, fields=ENCODED_FIELDS):
+        """Decode the encoded columns of a DataFrame in place, one lookup per distinct value."""
+        for field in fields:
+            if field not in df.columns:
+                continue
+            column = df[field]
+            mask = column.map(_is_code).to_numpy(dtype=bool)
+            if not mask.any():
+                continue
+            distinct = pd.unique(column[mask])
+            lookup = {code: self.value_of(field, int(code)) for code in distinct}
+            df[field] = column.where(~mask, column.map(lookup))
+        return df
+
+    def match(self, field, values):
+        """
+        A query condition matching values whether they are stored as strings
+        or as codes. values is a single value or a list of values.
+        """
+        values = values if isinstance(values, (list, tuple, set)) else [values]
+        candidates = list(values)
+        for value in values:
+            code = self.code_of(field, value) if isinstance(value, str) else None
+            if code is not None:
+                candidates.append(code)
+        return {"$in": candidates}
+
+    def match_regex(self, field, pattern):
+        """Case-insensitive $regex on field that also matches the codes of dictionary values."""
+        compiled = re.compile(pattern, re.IGNORECASE)
+        codes = [code for code, value in enumerate(self.values[field]) if compiled.search(value)]
+        return {"$or": [{field: {"$regex": pattern, "$options": "i"}}, {field: {"$in": codes}}]}
+
+    def decoded_expression(self, field):
+        """
+        Aggregation expression for field with codes replaced by their strings.
+        Numbers sort before strings in BSON order, so $lt "" picks out codes;
+        a code newer than this process's dictionary is passed through as is.
+        """
+        path = f"${field}"
+        values = {"$literal": list(self.values[field])}
+        return {"$cond": [
+            {"$lt": [path, ""]},
+            {"$ifNull": [{"$arrayElemAt": [values, path]}, path]},
+            path,
+        ]}
+
+
+_codecs = {}
+_codecs_lock = threading.Lock()
+
+
+def get_codec(database):
+    """One SalesCodec per database, shared by every module in the process."""
+    key = (id(database.client), database.name)
+    with _codecs_lock:
+        if key not in _codecs:
+            _codecs[key] = SalesCodec(database)
+        return _codecs[key]
+
+
+def encode_for_storage(collection, records):
+    """Records as they should be written under SALES_SCHEMA."""
+    if not compact_enabled():
+        return records
+    return get_codec(collection.database).encode_records(records)
+
+
+def decode_records(database, records, fields=ENCODED_FIELDS):
+    """Decode records read from the sales collection; free when nothing is encoded."""
+    if any(_is_code(record.get(field)) for record in records for field in fields):
+        get_codec(database).decode_records(records, fields)
+    return records
+
+
+def decode_values(database, field, values):
+    """Distinct decoded values of field, e.g. from collection.distinct(field), in first-seen order."""
+    records = decode_records(database, [{field: value} for value in values], [field])
+    return list(dict.fromkeys(record[field] for record in records))
+
+
+def decode_frame(database, df, fields=ENCODED_FIELDS):
+    """DataFrame counterpart of decode_records."""
+    if any(field in df.columns and df[field].map(_is_code).any() for field in fields):
+        get_codec(database).decode_frame(df, fields)
+    return df
+
+
+def match_values(database, field, values):
+    """
+    Query condition for field in values. Under SALES_SCHEMA=compact the
+    codes are matched too, so plain and compact documents are both found.
+    """
+    if not compact_enabled():
+        return {"$in": list(values)} if isinstance(values, (list, tuple, set)) else values
+    return get_codec(database).match(field, values)
+
+
+def decoded_field(database, field):
+    """
+    Group key for field in an aggregation. Under SALES_SCHEMA=compact codes
+    are mapped back to strings first, so the plain and compact documents of
+    a partly migrated collection fall into the same group.
+    """
+    if not compact_enabled():
+        return f"${field}"
+    return get_codec(database).decoded_expression(field)
+
+
+def match_regex(database, field, pattern):
+    """Filter document for a case-insensitive search on field, codes included under SALES_SCHEMA=compact."""
+    if not compact_enabled():
+        return {field: {"$regex": pattern, "$options": "i"}}
+    return get_codec(database).match_regex(field, pattern)
+
+
+def migrate_sales_encoding(collection, to="compact", batch_size=1000, pause=0.0):
+    """
+    Convert documents to the compact (or back to the plain) schema in _id order.
+
+    Only the encoded fields are $set. Returns a report with the number of
+    documents converted and their BSON size before and after.
+    """
+    codec = get_codec(collection.database)
+    fields = list(ENCODED_FIELDS)
+    if to == "compact":
+        pending = {"$or": [{field: {"$type": "string"}} for field in fields]}
+        convert = codec.encode_records
+    else:
+        pending = {"$or": [{field: {"$type": kind}} for field in fields for kind in ("int", "long")]}
+
+        def convert(documents):
+            return codec.decode_records([dict(document) for document in documents])
+
+    report = {"documents": 0, "bytes_before": 0, "bytes_after": 0}
+    last_id = None
+    while True:
+        page_query = {"$and": [pending, {"_id": {"$gt": last_id}}]} if last_id is not None else pending
+        documents = list(collection.find(page_query).sort("_id", 1).limit(batch_size))
+        if not documents:
+            break
+        last_id = documents[-1]["_id"]
+
+        operations = []
+        for before, after in zip(documents, convert(documents)):
+            changes = {field: after[field] for field in fields if field in after and after[field] != before[field]}
+            if not changes:
+                continue
+            report["bytes_before"] += len(bson.encode(before))
+            report["bytes_after"] += len(bson.encode(after))
+            operations.append(UpdateOne({"_id": before["_id"]}, {"$set": changes}))
+
+        if operations:
+            collection.bulk_write(operations, ordered=False)
+            report["documents"] += len(operations)
+        if pause:
+            time.sleep(pause)
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the sales collection between the plain and compact schemas")
+    parser.add_argument("--to", choices=["compact", "plain"], default="compact")
+    parser.add_argument("--collection", default="sales")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+    args = parser.parse_args()
+
+    from pymongo import MongoClient
+
+    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))
+    collection = client["market_analyzer"][args.collection]
+
+    print("\n" + "=" * 70)
+    print(f"🗜️  SALES SCHEMA MIGRATION → {args.to.upper()}")
+    print("=" * 70)
+    started = time.perf_counter()
+    report = migrate_sales_encoding(collection, to=args.to, batch_size=args.batch_size, pause=args.pause)
+    elapsed = time.perf_counter() - started
+
+    before, after = report["bytes_before"], report["bytes_after"]
+    print(f"✅ Converted {report['documents']:,} documents in {elapsed:.1f}s")
+    if report["documents"]:
+        change = after - before
+        print(f"📦 BSON size: {before:,} → {after:,} bytes ({change / before * 100:+.1f}%, "
+              f"{change / report['documents']:+.1f} bytes/document)")
+    if args.to == "compact" and not compact_enabled():
+        print("💡 Set SALES_SCHEMA=compact so new writes use the compact schema too")
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Storage layout of the sales history.
+
+By default history lives in the plain `sales` collection. With
+SALES_STORAGE=timeseries it lives in the `sales_timeseries` MongoDB
+time-series collection instead: `date` is the timeField and
+`meta: {product, category}` the metaField, so MongoDB buckets and compresses
+the rows of each product and range scans read whole buckets.
+
+Callers keep working with flat records ({product, category, date, ...}):
+to_storage_documents / from_storage_documents reshape documents, and
+translate_filter / translate_pipeline rewrite queries for the layout of the
+collection they run against.
+
+Usage (from the "AIML Project - ML Model" directory):
+    python -m data_sources.sales_storage --copy-from sales    # fill sales_timeseries from sales
+"""
+import argparse
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+from data_sources.sales_schema import encode_for_storage
+
+load_dotenv()
+
+SALES_STORAGE = os.getenv("SALES_STORAGE", "plain").lower()
+PLAIN_COLLECTION = "sales"
+TIMESERIES_COLLECTION = "sales_timeseries"
+META_FIELD = "meta"
+META_FIELDS = ("product", "category")
+TIMESERIES_OPTIONS = {"timeField": "date", "metaField": META_FIELD, "granularity": "hours"}
+
+_created = set()
+_created_lock = threading.Lock()
+
+
+def timeseries_enabled():
+    return SALES_STORAGE == "timeseries"
+
+
+def is_timeseries(collection):
+    return collection.name == TIMESERIES_COLLECTION
+
+
+def ensure_timeseries_collection(database):
+    """Create sales_timeseries as a time-series collection if it does not exist yet."""
+    key = (id(database.client), database.name)
+    with _created_lock:
+        if key not in _created:
+            if TIMESERIES_COLLECTION not in database.list_collection_names():
+                database.create_collection(TIMESERIES_COLLECTION, timeseries=TIMESERIES_OPTIONS)
+            _created.add(key)
+    return database[TIMESERIES_COLLECTION]
+
+
+def get_sales_collection(database):
+    """The collection sales history is read from and written to under SALES_STORAGE."""
+    if timeseries_enabled():
+        return ensure_timeseries_collection(database)
+    return database[PLAIN_COLLECTION]
+
+
+def sales_indexes(collection):
+    """Key lists of the secondary indexes the API queries rely on, for this layout."""
+    indexes = [[("product", 1), ("date", -1)], [("category", 1), ("date", -1)]]
+    if not is_timeseries(collection):
+        # Time-series collections are already clustered on the time field.
+        indexes.append([("date", -1)])
+    return [[(translate_field(collection, field), direction) for field, direction in keys] for keys in indexes]
+
+
+def to_storage_documents(collection, records):
+    """Records as they are written to collection: encoded under SALES_SCHEMA, reshaped for time-series."""
+    records = encode_for_storage(collection, records)
+    if not is_timeseries(collection):
+        return records
+    documents = []
+    for record in records:
+        document = {key: value for key, value in record.items() if key not in META_FIELDS}
+        document[META_FIELD] = {field: record[field] for field in META_FIELDS if field in record}
+        documents.append(document)
+    return documents
+
+
+def from_storage_documents(documents):
+    """Flatten the metaField of time-series documents in place; plain documents pass through."""
+    for document in documents:
+        meta = document.pop(META_FIELD, None)
+        if isinstance(meta, dict):
+            document.update(meta)
+    return documents
+
+
+def translate_field(collection, field):
+    if not is_timeseries(collection):
+        return field
+    root = field.split(".", 1)[0]
+    return f"{META_FIELD}.{field}" if root in META_FIELDS else field
+
+
+def translate_filter(collection, query):
+    """Rewrite a find/$match filter written against flat records for the collection's layout."""
+    if not is_timeseries(collection) or not isinstance(query, dict):
+        return query
+    translated = {}
+    for key, value in query.items():
+        if key in ("$and", "$or", "$nor"):
+            translated[key] = [translate_filter(collection, item) for item in value]
+        else:
+            translated[translate_field(collection, key)] = value
+    return translated
+
+
+def translate_pipeline(collection, pipeline):
+    """
+    Rewrite an aggregation pipeline written against flat records.
+
+    The leading $match / $sort stages are rewritten to use the metaField
+    directly, so they can still use the indexes; product and category are
+    then projected back to the top level for the rest of the pipeline.
+    """
+    if not is_timeseries(collection):
+        return pipeline
+    translated = []
+    index = 0
+    while index < len(pipeline) and set(pipeline[index]) <= {"$match", "$sort"}:
+        stage = pipeline[index]
+        if "$match" in stage:
+            translated.append({"$match": translate_filter(collection, stage["$match"])})
+        else:
+            translated.append({"$sort": {
+                translate_field(collection, field): direction for field, direction in stage["$sort"].items()
+            }})
+        index += 1
+    translated.append({"$addFields": {field: f"${META_FIELD}.{field}" for field in META_FIELDS}})
+    translated.extend(pipeline[index:])
+    return translated
+
+
+def copy_to_timeseries(source, target, batch_size=5000):
+    """Copy every document of the plain source collection into the time-series target."""
+    copied = 0
+    last_id = None
+    while True:
+        query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        documents = list(source.find(query).sort("_id", 1).limit(batch_size))
+        if not documents:
+            break
+        last_id = documents[-1]["_id"]
+        for document in documents:
+            document.pop("_id")
+        target.insert_many(to_storage_documents(target, documents), ordered=False)
+        copied += len(documents)
+    return copied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill the sales time-series collection from a plain collection")
+    parser.add_argument("--copy-from", default=PLAIN_COLLECTION, help="Plain collection to copy from")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    from pymongo import MongoClient
+    from data_sources.mongodb_utils import refresh_collection_stats
+
+    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))
+    database = client["market_analyzer"]
+    target = ensure_timeseries_collection(database)
+
+    print("\n" + "=" * 70)
+    print(f"🕒 COPYING market_analyzer.{args.copy_from} → {TIMESERIES_COLLECTION}")
+    print("=" * 70)
+    started = time.perf_counter()
+    copied = copy_to_timeseries(database[args.copy_from], target, batch_size=args.batch_size)
+    for keys in sales_indexes(target):
+        target.create_index(keys)
+    refresh_collection_stats(target)
+    print(f"✅ Copied {copied:,} documents in {time.perf_counter() - started:.1f}s")
+    if not timeseries_enabled():
+        print("💡 Set SALES_STORAGE=timeseries to read and write the time-series collection")
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Vectorized synthetic market generator for load and scaling tests.
+
+Builds seasonal price, demand and weather series for the product catalog
+with NumPy, a chunk of days at a time, and streams the chunks to MongoDB or
+Parquet, so multi-million row datasets never have to exist as Python lists.
+
+Usage (from the "AIML Project - ML Model" directory):
+    python -m data_sources.synthetic_market --products 180 --start 2020-01-01 --end 2024-12-31 --parquet sales.parquet
+    python -m data_sources.synthetic_market --products 2000 --years 5 --mongo --collection sales_synthetic
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from data_sources.product_catalog import CATEGORIES, UNKNOWN_PRODUCT_ID, get_catalog
+
+load_dotenv()
+
+
+def catalog_products(count=None):
+    """First `count` catalog products, padded with synthetic names beyond the catalog."""
+    products = list(get_catalog().names)
+    if count is None:
+        return products
+    products = products[:count]
+    products.extend(f"Product {index:04d}" for index in range(len(products), count))
+    return products
+
+
+class SyntheticMarketGenerator:
+    """
+    Generates a products x days market deterministically from a seed.
+
+    Prices follow a per-product seasonal curve plus a mean-reverting AR(1)
+    shock and stay inside the catalog price range. Demand reacts to price
+    through a per-product elasticity, and weather follows the Indian seasons
+    (hot March-May, monsoon June-September). With include_metadata=False
+    only the training columns of data/sales_data.csv are produced.
+    """
+
+    def __init__(self, products=None, start=None, end=None, seed=42, chunk_days=30, include_metadata=True):
+        self.products = list(products) if products is not None else catalog_products()
+        self.end = pd.Timestamp(end or pd.Timestamp.today().normalize())
+        self.start = pd.Timestamp(start or self.end - pd.Timedelta(days=364))
+        self.dates = pd.date_range(self.start, self.end, freq="D")
+        self.seed = seed
+        self.chunk_days = chunk_days
+        self.include_metadata = include_metadata
+
+        catalog = get_catalog()
+        self.min_prices, self.max_prices = catalog.price_ranges_of(self.products)
+        product_ids = catalog.ids_of(self.products)
+        # Padded names outside the catalog are reported as vegetables.
+        codes = np.where(product_ids != UNKNOWN_PRODUCT_ID, catalog.category_codes[product_ids], 0)
+        self.categories = np.array(CATEGORIES, dtype=object)[codes]
+
+        rng = np.random.default_rng(seed)
+        count = len(self.products)
+        self.base_demand = rng.uniform(60, 320, count)
+        self.season_amplitude = rng.uniform(0.05, 0.25, count)
+        self.season_phase = rng.uniform(0, 365.25, count)
+        self.elasticity = rng.uniform(0.4, 1.6, count)
+        self.volatility = rng.uniform(0.01, 0.05, count)
+
+    @property
+    def total_rows(self):
+        return len(self.products) * len(self.dates)
+
+    def iter_chunks(self):
+        """Yield one DataFrame per chunk of days, rows ordered by date then product."""
+        count = len(self.products)
+        midpoint = (self.min_prices + self.max_prices) / 2
+        shock = np.zeros(count)
+        products = np.array(self.products, dtype=object)
+
+        for chunk_index, offset in enumerate(range(0, len(self.dates), self.chunk_days)):
+            dates = self.dates[offset:offset + self.chunk_days]
+            days = len(dates)
+            rng = np.random.default_rng([self.seed, chunk_index])
+
+            # Mean-reverting price shocks, vectorized across products for each day.
+            noise = rng.standard_normal((days, count)) * self.volatility
+            shocks = np.empty((days, count))
+            for day in range(days):
+                shock = 0.9 * shock + noise[day]
+                shocks[day] = shock
+
+            day_of_year = dates.dayofyear.to_numpy()[:, None]
+            season = np.sin(2 * np.pi * (day_of_year - self.season_phase) / 365.25)
+            price = midpoint * (1 + self.season_amplitude * season) * np.exp(shocks)
+            price = np.clip(price, self.min_prices, self.max_prices)
+
+            demand = self.base_demand * (1 - 0.5 * self.season_amplitude * season)
+            demand = demand * (price / midpoint) ** (-self.elasticity)
+            demand = demand * rng.lognormal(0, 0.08, (days, count))
+            stock = demand * rng.uniform(1.1, 1.8, (days, count))
+
+            month = dates.month.to_numpy()[:, None]
+            monsoon = (month >= 6) & (month <= 9)
+            summer = (month >= 3) & (month <= 5)
+            temperature = np.where(summer, 31.0, np.where(monsoon, 28.0, 22.0)) + rng.normal(0, 2.5, (days, count))
+            rainfall = np.where(monsoon, rng.gamma(2.0, 40.0, (days, count)), rng.gamma(1.0, 4.0, (days, count)))
+
+            chunk = pd.DataFrame({
+                "date": np.repeat(dates.to_numpy(), count),
+                "product": np.tile(products, days),
+                "quantity": np.round(demand.ravel(), 1),
+                "price": np.round(price.ravel(), 2),
+                "stock": np.round(stock.ravel(), 2),
+                "temperature": np.round(temperature.ravel(), 1),
+                "rainfall": np.round(rainfall.ravel(), 1),
+            })
+            if self.include_metadata:
+                chunk["category"] = np.tile(self.categories, days)
+                chunk["unit"] = "kg"
+                chunk["source"] = "synthetic"
+            yield chunk
+
+    def to_mongo(self, collection, batch_size=10000):
+        """Insert every chunk into collection; returns the number of rows written."""
+        written = 0
+        for chunk in self.iter_chunks():
+            for start in range(0, len(chunk), batch_size):
+                records = chunk.iloc[start:start + batch_size].to_dict(orient="records")
+                collection.insert_many(records, ordered=False)
+                written += len(records)
+        return written
+
+    def to_parquet(self, path):
+        """Write every chunk as a Parquet row group; returns the number of rows written."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        written = 0
+        writer = None
+        try:
+            for chunk in self.iter_chunks():
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+                writer.write_table(table)
+                written += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic market dataset")
+    parser.add_argument("--products", type=int, help="Number of products (default: whole catalog)")
+    parser.add_argument("--start", help="First date (YYYY-MM-DD)")
+    parser.add_argument("--end", help="Last date (YYYY-MM-DD, default: today)")
+    parser.add_argument("--years", type=int, help="Span in years ending at --end (ignored with --start)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-days", type=int, default=30)
+    parser.add_argument("--parquet", help="Write to this Parquet file")
+    parser.add_argument("--mongo", action="store_true", help="Insert into MongoDB (MONGO_URI)")
+    parser.add_argument("--collection", default="sales_synthetic", help="Target collection for --mongo")
+    args = parser.parse_args()
+
+    if not args.parquet and not args.mongo:
+        parser.error("choose an output: --parquet PATH and/or --mongo")
+
+    end = pd.Timestamp(args.end) if args.end else pd.Timestamp.today().normalize()
+    start = args.start
+    if start is None and args.years:
+        start = end - pd.DateOffset(years=args.years) + pd.Timedelta(days=1)
+
+    generator = SyntheticMarketGenerator(
+        products=catalog_products(args.products),
+        start=start,
+        end=end,
+        seed=args.seed,
+        chunk_days=args.chunk_days,
+    )
+
+    print("\n" + "=" * 70)
+    print("🧪 SYNTHETIC MARKET GENERATOR")
+    print("=" * 70)
+    print(f"📦 Products: {len(generator.products)}")
+    print(f"📅 Dates: {generator.start.date()} → {generator.end.date()} ({len(generator.dates)} days)")
+    print(f"📊 Rows: {generator.total_rows:,}")
+
+    if args.parquet:
+        started = time.perf_counter()
+        written = generator.to_parquet(args.parquet)
+        elapsed = time.perf_counter() - started
+        print(f"✅ Parquet: {written:,} rows → {args.parquet} in {elapsed:.1f}s ({written / elapsed:,.0f} rows/s)")
+
+    if args.mongo:
+        from pymongo import MongoClient
+
+        client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))
+        collection = client["market_analyzer"][args.collection]
+        started = time.perf_counter()
+        written = generator.to_mongo(collection)
+        elapsed = time.perf_counter() - started
+        print(f"✅ MongoDB: {written:,} rows → market_analyzer.{args.collection} in {elapsed:.1f}s ({written / elapsed:,.0f} rows/s)")
+
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
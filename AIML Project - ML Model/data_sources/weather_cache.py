@@ -0,0 +1,196 @@
+"""
+MongoDB-backed cache of the OpenWeatherMap readings.
+
+The national average and the per-city readings it was computed from are
+stored in the `weather` collection, and every refresh also feeds the
+(region, date) history in data_sources/weather_history.py. A reading younger than
+WEATHER_REFRESH_SECONDS (one hour by default) is served from the cache;
+an older one is refreshed by fetching every city concurrently. A TTL index
+on fetched_at drops readings nobody refreshed within WEATHER_RETENTION_SECONDS.
+
+Fetchers and daily_market_update.py read weather through get_weather_cache,
+so a run over hundreds of products makes at most one round of API calls per
+hour, however many processes share the database: a process claims a stale
+reading's refresh with a conditional find_one_and_update on a lease
+document, and the others keep serving the stale reading (or wait for the
+first one) until the new reading lands.
+
+Usage (from the "AIML Project - ML Model" directory):
+    python -m data_sources.weather_cache             # print the cached reading
+    python -m data_sources.weather_cache --refresh   # fetch now, ignoring its age
+"""
+import argparse
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+from pymongo.errors import DuplicateKeyError
+
+from data_sources.weather_fetcher import WeatherFetcher
+from data_sources.weather_history import (
+    NATIONAL_REGION,
+    WEATHER_HISTORY_COLLECTION,
+    ensure_weather_history_indexes,
+    record_readings,
+)
+
+load_dotenv()
+
+WEATHER_COLLECTION = "weather"
+WEATHER_REFRESH_SECONDS = int(os.getenv("WEATHER_REFRESH_SECONDS", "3600"))
+WEATHER_RETENTION_SECONDS = int(os.getenv("WEATHER_RETENTION_SECONDS", "86400"))
+WEATHER_CLAIM_SECONDS = int(os.getenv("WEATHER_CLAIM_SECONDS", "120"))
+AVERAGE_ID = "average"
+REFRESH_CLAIM_ID = "refresh_claim"
+WEATHER_FIELDS = ("temperature", "rainfall", "humidity", "cities_sampled", "source", "timestamp")
+
+
+class WeatherCache:
+    """
+    Serves the national average weather from the `weather` collection and
+    refreshes it at most once per WEATHER_REFRESH_SECONDS. The last reading
+    is also kept in memory, so repeated calls within a run skip MongoDB.
+    """
+
+    def __init__(self, database, fetcher=None, refresh_seconds=WEATHER_REFRESH_SECONDS):
+        self.database = database
+        self.collection = database[WEATHER_COLLECTION]
+        self.fetcher = fetcher or WeatherFetcher()
+        self.refresh_seconds = refresh_seconds
+        self._memo = None
+        self._lock = threading.Lock()
+        self.collection.create_index("fetched_at", expireAfterSeconds=WEATHER_RETENTION_SECONDS)
+        ensure_weather_history_indexes(database[WEATHER_HISTORY_COLLECTION])
+
+    def _fresh(self, document):
+        if not document or not document.get("fetched_at"):
+            return False
+        return datetime.now() - document["fetched_at"] < timedelta(seconds=self.refresh_seconds)
+
+    @staticmethod
+    def _reading(document):
+        return {field: document[field] for field in WEATHER_FIELDS if field in document}
+
+    def refresh(self):
+        """Fetch every city concurrently, store the readings and their average, and return the average."""
+        fetcher = self.fetcher
+        if not fetcher.api_key or fetcher.api_key == "your_openweather_api_key":
+            print("⚠️  OpenWeather API key not configured")
+            cities = []
+        else:
+            cities = fetcher.fetch_cities(fetcher.indian_cities)
+        average = fetcher.average_weather(cities)
+        if cities:
+            # Only real readings go into the history, not the seasonal fallback.
+            record_readings(self.database, [{**city, "region": city["city"]} for city in cities]
+                            + [{**average, "region": NATIONAL_REGION}])
+
+        now = datetime.now()
+        for city in cities:
+            self.collection.replace_one(
+                {"_id": f"city:{city['city']}"},
+                {**city, "fetched_at": now},
+                upsert=True,
+            )
+        document = {**average, "_id": AVERAGE_ID, "fetched_at": now}
+        self.collection.replace_one({"_id": AVERAGE_ID}, document, upsert=True)
+        self._memo = document
+        return self._reading(document)
+
+    def _claim_refresh(self):
+        """
+        Claim the next refresh across processes. The claim document's
+        claimed_until is only moved forward once it has expired, so exactly
+        one process wins; the rest hit the unique _id on upsert.
+        """
+        now = datetime.now()
+        try:
+            self.collection.find_one_and_update(
+                {"_id": REFRESH_CLAIM_ID, "claimed_until": {"$lt": now}},
+                {"$set": {"claimed_until": now + timedelta(seconds=WEATHER_CLAIM_SECONDS), "pid": os.getpid()}},
+                upsert=True,
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+    def _release_refresh(self):
+        self.collection.delete_one({"_id": REFRESH_CLAIM_ID, "pid": os.getpid()})
+
+    def _wait_for_refresh(self):
+        """The reading another process is fetching, or None when it has not landed within its claim."""
+        deadline = time.monotonic() + WEATHER_CLAIM_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(0.5)
+            document = self.collection.find_one({"_id": AVERAGE_ID})
+            if self._fresh(document):
+                return document
+        return None
+
+    def get_average(self, force_refresh=False):
+        """The national average weather, refreshed when the cached reading is older than the refresh interval."""
+        with self._lock:
+            if not force_refresh:
+                if self._fresh(self._memo):
+                    return self._reading(self._memo)
+                document = self.collection.find_one({"_id": AVERAGE_ID})
+                if self._fresh(document):
+                    self._memo = document
+                    return self._reading(document)
+                if not self._claim_refresh():
+                    # Another process is refreshing: keep serving the stale reading meanwhile.
+                    document = document or self._wait_for_refresh()
+                    if document is not None:
+                        return self._reading(document)
+            try:
+                return self.refresh()
+            finally:
+                self._release_refresh()
+
+    def get_city(self, city):
+        """The cached reading of one city, or None when it was not part of a recent refresh."""
+        document = self.collection.find_one({"_id": f"city:{city}"})
+        if not self._fresh(document):
+            return None
+        return {key: value for key, value in document.items() if key not in ("_id", "fetched_at")}
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_weather_cache(database):
+    """One WeatherCache per database, shared by every module in the process."""
+    key = (id(database.client), database.name)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = WeatherCache(database)
+        return _caches[key]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show or refresh the cached weather readings")
+    parser.add_argument("--refresh", action="store_true", help="Fetch now, even if the cached reading is fresh")
+    args = parser.parse_args()
+
+    from pymongo import MongoClient
+
+    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))
+    cache = get_weather_cache(client["market_analyzer"])
+
+    print("\n" + "=" * 60)
+    print("🌤️  WEATHER CACHE")
+    print("=" * 60)
+    weather = cache.get_average(force_refresh=args.refresh)
+    print(f"   Temperature: {weather['temperature']}°C")
+    print(f"   Rainfall: {weather['rainfall']} mm")
+    print(f"   Humidity: {weather.get('humidity', 'N/A')}%")
+    print(f"   Source: {weather.get('source', 'OpenWeatherMap API')}")
+    print(f"   Cities: {weather.get('cities_sampled', 'N/A')}")
+    print("=" * 60 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,9 @@
 Weather data fetcher for agricultural price predictions.
 Uses OpenWeatherMap API to get real-time weather data.
 """
-import requests
+from data_sources import http_cache
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from datetime import datetime
 
@@ -39,7 +40,7 @@ class WeatherFetcher:
                 "units": "metric"
             }
             
-            response = requests.get(self.base_url, params=params, timeout=10)
+            response = http_cache.get(self.base_url, params=params, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -69,6 +70,17 @@ class WeatherFetcher:
             print(f"❌ Weather fetch failed for {city}: {str(e)}")
             return None
     
+    def fetch_cities(self, cities):
+        """
+        Fetch several cities concurrently, so the slowest city bounds the wait
+        instead of the sum of all timeouts. Failed cities are left out.
+        """
+        if not cities:
+            return []
+        with ThreadPoolExecutor(max_workers=len(cities)) as executor:
+            results = list(executor.map(self.fetch_weather_for_city, cities))
+        return [data for data in results if data]
+    
     def fetch_average_weather(self):
         """
         Fetch weather data from multiple Indian cities and return average.
@@ -78,13 +90,13 @@ class WeatherFetcher:
             print("⚠️  OpenWeather API key not configured")
             return self._get_fallback_weather()
         
-        weather_data = []
-        
-        for city in self.indian_cities[:5]:
-            data = self.fetch_weather_for_city(city)
-            if data:
-                weather_data.append(data)
-        
+        return self.average_weather(self.fetch_cities(self.indian_cities[:5]))
+    
+    def average_weather(self, weather_data):
+        """
+        Average per-city readings into one national reading.
+        Falls back to seasonal averages when no city answered.
+        """
         if not weather_data:
             print("⚠️  No weather data fetched, using fallback")
             return self._get_fallback_weather()
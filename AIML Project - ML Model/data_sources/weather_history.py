@@ -0,0 +1,246 @@
+"""
+Historical weather feature store, keyed by (region, date).
+
+Every weather refresh folds the reading of each of the WeatherFetcher cities,
+and of the national average, into one document per region and day in the
+`weather_history` collection. The document keeps running sums, so a day's
+value is the mean of all readings taken that day. backfill_from_sales fills
+the national region for the days before the store existed, using the
+temperature and rainfall already stored on the sales records.
+
+For training, weather_features turns the history into a small daily frame
+per region with lagged and rolling features, and attach_weather_features
+joins it onto the sales rows with a vectorized as-of join. No lookups are
+made per row, so this scales to millions of rows.
+
+Usage (from the "AIML Project - ML Model" directory):
+    python -m data_sources.weather_history --backfill
+"""
+import argparse
+import os
+import time
+from datetime import datetime
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from data_sources.sales_storage import get_sales_collection, translate_pipeline
+
+load_dotenv()
+
+WEATHER_HISTORY_COLLECTION = "weather_history"
+NATIONAL_REGION = "national"
+READING_FIELDS = ("temperature", "rainfall", "humidity")
+FEATURE_FIELDS = ("temperature", "rainfall")
+FEATURE_LAGS = (1, 7)
+FEATURE_WINDOWS = (7, 30)
+JOIN_TOLERANCE = pd.Timedelta(days=3)
+
+
+def ensure_weather_history_indexes(collection):
+    collection.create_index([("region", 1), ("date", 1)], unique=True)
+    collection.create_index([("date", 1)])
+
+
+def _day(when):
+    return when.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def record_readings(database, readings, when=None):
+    """
+    Add readings ({region, temperature, rainfall, humidity}) to the day of
+    `when` (now by default). Missing fields are simply not counted.
+    """
+    collection = database[WEATHER_HISTORY_COLLECTION]
+    when = when or datetime.now()
+    day = _day(when)
+    for reading in readings:
+        increments = {}
+        for field in READING_FIELDS:
+            value = reading.get(field)
+            if value is not None:
+                increments[f"{field}_sum"] = float(value)
+                increments[f"{field}_count"] = 1
+        if not increments:
+            continue
+        collection.update_one(
+            {"region": reading["region"], "date": day},
+            {"$inc": increments, "$set": {"updated_at": when}},
+            upsert=True,
+        )
+
+
+def backfill_from_sales(database):
+    """
+    Fill the national region from the daily mean temperature and rainfall of
+    the sales records. Days the store already has are left alone. Returns
+    the number of days added.
+    """
+    sales = get_sales_collection(database)
+    history = database[WEATHER_HISTORY_COLLECTION]
+    ensure_weather_history_indexes(history)
+    pipeline = translate_pipeline(sales, [
+        {"$match": {"temperature": {"$ne": None}}},
+        {"$group": {
+            "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$date"}},
+            "temperature": {"$avg": "$temperature"},
+            "rainfall": {"$avg": "$rainfall"},
+        }},
+    ])
+    added = 0
+    now = datetime.now()
+    for day in sales.aggregate(pipeline, allowDiskUse=True):
+        document = {"updated_at": now}
+        for field in FEATURE_FIELDS:
+            if day.get(field) is not None:
+                document[f"{field}_sum"] = float(day[field])
+                document[f"{field}_count"] = 1
+        result = history.update_one(
+            {"region": NATIONAL_REGION, "date": datetime.strptime(day["_id"], "%Y-%m-%d")},
+            {"$setOnInsert": document},
+            upsert=True,
+        )
+        added += result.upserted_id is not None
+    return added
+
+
+def load_weather_history(database, regions=None, start=None, end=None):
+    """Daily means as a DataFrame [region, date, temperature, rainfall, humidity], sorted by region and date."""
+    query = {}
+    if regions is not None:
+        query["region"] = {"$in": list(regions)}
+    if start is not None or end is not None:
+        query["date"] = {}
+        if start is not None:
+            query["date"]["$gte"] = start
+        if end is not None:
+            query["date"]["$lte"] = end
+    projection = {"_id": 0, "region": 1, "date": 1}
+    for field in READING_FIELDS:
+        projection[f"{field}_sum"] = 1
+        projection[f"{field}_count"] = 1
+
+    df = pd.DataFrame(list(database[WEATHER_HISTORY_COLLECTION].find(query, projection)))
+    if df.empty:
+        return pd.DataFrame(columns=["region", "date", *READING_FIELDS])
+    for field in READING_FIELDS:
+        if f"{field}_sum" in df.columns:
+            df[field] = df[f"{field}_sum"] / df[f"{field}_count"]
+        else:
+            df[field] = float("nan")
+    df["date"] = pd.to_datetime(df["date"])
+    return df[["region", "date", *READING_FIELDS]].sort_values(["region", "date"], ignore_index=True)
+
+
+def weather_features(history, lags=FEATURE_LAGS, windows=FEATURE_WINDOWS):
+    """
+    Daily weather features per region: the day's value plus lagged values
+    and rolling means, named weather_<field>, weather_<field>_lag_<n> and
+    weather_<field>_rolling_<n>. Days missing from the history are treated
+    as missing values, so lags are always calendar days.
+    """
+    columns = ["region", "date"]
+    if history.empty:
+        return pd.DataFrame(columns=columns)
+    dates = pd.date_range(history["date"].min(), history["date"].max(), freq="D")
+
+    features = {}
+    for field in FEATURE_FIELDS:
+        # One column per region: shift and rolling then run over every region at once.
+        wide = history.pivot_table(index="date", columns="region", values=field, aggfunc="mean").reindex(dates)
+        features[f"weather_{field}"] = wide
+        for lag in lags:
+            features[f"weather_{field}_lag_{lag}"] = wide.shift(lag)
+        for window in windows:
+            features[f"weather_{field}_rolling_{window}"] = wide.rolling(window, min_periods=1).mean()
+
+    frame = pd.concat(features, axis=1)
+    frame.columns = frame.columns.set_names(["feature", "region"])
+    frame.index.name = "date"
+    frame = frame.stack("region", future_stack=True).reset_index()
+    frame.columns.name = None
+    frame = frame.dropna(subset=list(features), how="all")
+    return frame[columns + list(features)].sort_values("date", ignore_index=True)
+
+
+def attach_weather_features(df, features, region_column="region", tolerance=JOIN_TOLERANCE):
+    """
+    Join weather features onto df with an as-of join on date: each row gets
+    the newest features of its region at most `tolerance` old. Rows without
+    a region column use the national region. Where the store has no value,
+    the features are computed the same way from the rows' own daily
+    temperature / rainfall, so a lag or rolling column never holds the
+    same-day reading. Returns a new DataFrame with the rows in their
+    original order.
+    """
+    if features is None or features.empty:
+        return df
+    feature_columns = [column for column in features.columns if column not in ("region", "date")]
+
+    dates = pd.to_datetime(df["date"]).astype("datetime64[ns]")
+    regions = df[region_column].astype(str) if region_column in df.columns else pd.Series(NATIONAL_REGION, index=df.index)
+    left = pd.DataFrame({
+        "date": dates,
+        "region": regions,
+        "_row": range(len(df)),
+    }).sort_values("date", kind="stable")
+    right = features.assign(
+        date=pd.to_datetime(features["date"]).astype("datetime64[ns]"),
+        region=features["region"].astype(str),
+    ).sort_values("date", kind="stable")
+
+    joined = pd.merge_asof(left, right, on="date", by="region", direction="backward", tolerance=tolerance)
+    joined = joined.sort_values("_row")[feature_columns].reset_index(drop=True)
+    joined.index = df.index
+
+    own_fields = [field for field in FEATURE_FIELDS if field in df.columns]
+    if own_fields and joined.isna().any().any():
+        days = dates.dt.normalize()
+        history = pd.DataFrame({"region": regions.values, "date": days.values})
+        for field in FEATURE_FIELDS:
+            values = pd.to_numeric(df[field], errors="coerce") if field in own_fields else pd.Series(float("nan"), index=df.index)
+            history[field] = values.astype(float).values
+        history = history.dropna(subset=own_fields, how="all")
+        own = weather_features(history)
+        if not own.empty:
+            keys = pd.DataFrame({"region": regions.values, "date": days.values})
+            own = keys.merge(own.astype({"date": "datetime64[ns]"}), on=["region", "date"], how="left")
+            own.index = df.index
+            for column in feature_columns:
+                if column in own.columns and column.startswith(tuple(f"weather_{field}" for field in own_fields)):
+                    joined[column] = joined[column].fillna(own[column])
+
+    return pd.concat([df.drop(columns=feature_columns, errors="ignore"), joined], axis=1)
+
+
+def load_weather_features(database=None):
+    """Weather features for the whole history, ready for create_features(df, weather=...)."""
+    if database is None:
+        from pymongo import MongoClient
+        database = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))["market_analyzer"]
+    return weather_features(load_weather_history(database))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the historical weather feature store")
+    parser.add_argument("--backfill", action="store_true", help="Fill the national region from the sales records")
+    args = parser.parse_args()
+    if not args.backfill:
+        parser.error("nothing to do: pass --backfill")
+
+    from pymongo import MongoClient
+
+    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))
+    database = client["market_analyzer"]
+
+    print("\n" + "=" * 70)
+    print(f"🌦️  BACKFILLING market_analyzer.{WEATHER_HISTORY_COLLECTION}")
+    print("=" * 70)
+    started = time.perf_counter()
+    added = backfill_from_sales(database)
+    print(f"✅ Added {added:,} national days in {time.perf_counter() - started:.1f}s")
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,175 +2,86 @@
 Fix Unrealistic Prices in MongoDB
 This script corrects any products with unrealistic prices (>₹1000/kg for common items)
 """
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
 from datetime import datetime
 import os
 from dotenv import load_dotenv
+from data_sources.mongodb_utils import refresh_collection_stats, replace_collection_with_batches
+from data_sources.price_catalog import infer_category, infer_price_range
+from data_sources.product_catalog import TRACKED_PRODUCTS
+from data_sources.rollups import refresh_product_rollups
+from data_sources.sales_schema import decode_records, decode_values, decoded_field, match_values
+from data_sources.sales_storage import (
+    from_storage_documents,
+    get_sales_collection,
+    is_timeseries,
+    to_storage_documents,
+    translate_field,
+    translate_filter,
+    translate_pipeline,
+)
 
 load_dotenv()
 
-# Realistic price ranges for Indian market (₹/kg)
-REALISTIC_PRICE_RANGES = {
-    # Common Vegetables (₹20-100/kg)
-    'Onion': (25, 60),
-    'Red Onion': (25, 60),
-    'White Onion': (30, 65),
-    'Yellow Onion': (25, 60),
-    'Pearl Onion': (40, 80),
-    'Potato': (25, 45),
-    'Red Potato': (30, 50),
-    'White Potato': (25, 45),
-    'Yellow Potato': (28, 48),
-    'Russet Potato': (35, 60),
-    'Tomato': (30, 80),
-    'Cherry Tomato': (80, 150),
-    'Carrot': (40, 75),
-    'Cabbage': (25, 50),
-    'Cauliflower': (40, 80),
-    'Brinjal': (40, 75),
-    'Cucumber': (30, 60),
-    'Radish': (30, 60),
-    'White Radish': (30, 60),
-    'Black Radish': (35, 65),
-    'Red Radish': (30, 60),
-    'Daikon': (35, 65),
-    'Beetroot': (45, 80),
-    'Pumpkin': (25, 50),
-    'Spinach': (25, 50),
-    'Lady Finger': (45, 90),
-    
-    # Leafy Vegetables (₹20-80/kg)
-    'Coriander Leaves': (40, 80),
-    'Mint Leaves': (50, 100),
-    'Curry Leaves': (60, 120),
-    'Fenugreek Leaves': (30, 65),
-    'Amaranth Leaves': (25, 55),
-    'Mustard Greens': (25, 55),
-    'Kale': (80, 150),
-    
-    # Gourds (₹25-80/kg)
-    'Bottle Gourd': (30, 60),
-    'Ridge Gourd': (40, 70),
-    'Bitter Gourd': (45, 80),
-    'Snake Gourd': (40, 70),
-    'Ash Gourd': (25, 50),
-    'Sponge Gourd': (35, 70),
-    'Ivy Gourd': (40, 75),
-    'Pointed Gourd': (40, 75),
-    
-    # Beans & Peas (₹50-130/kg)
-    'French Beans': (60, 110),
-    'Cluster Beans': (50, 95),
-    'Broad Beans': (80, 130),
-    'Green Peas': (60, 120),
-    'Green Beans': (55, 105),
-    
-    # Premium Vegetables (₹80-350/kg)
-    'Capsicum': (80, 150),
-    'Green Chilli': (50, 120),
-    'Garlic': (100, 180),
-    'Ginger': (80, 150),
-    'Broccoli': (100, 180),
-    'Mushroom': (200, 350),
-    'Baby Corn': (120, 220),
-    'Lettuce': (80, 150),
-    'Zucchini': (90, 160),
-    
-    # Common Fruits (₹30-100/kg)
-    'Banana': (50, 80),
-    'Papaya': (40, 70),
-    'Watermelon': (25, 50),
-    'Muskmelon': (40, 70),
-    'Guava': (50, 80),
-    'Sapota': (50, 90),
-    'Coconut': (40, 70),
-    'Sweet Lime': (50, 90),
-    
-    # Mid-Range Fruits (₹80-200/kg)
-    'Apple': (140, 220),
-    'Mango': (80, 180),
-    'Orange': (60, 100),
-    'Pineapple': (50, 90),
-    'Grapes': (80, 160),
-    'Custard Apple': (80, 140),
-    'Jackfruit': (40, 80),
-    'Pear': (120, 200),
-    'Star Fruit': (100, 180),
-    
-    # Premium Fruits (₹150-600/kg)
-    'Pomegranate': (150, 280),
-    'Lychee': (150, 250),
-    'Strawberry': (300, 500),
-    'Peach': (150, 250),
-    'Plum': (180, 280),
-    'Apricot': (200, 350),
-    'Kiwi': (250, 400),
-    'Dragon Fruit': (200, 350),
-    'Passion Fruit': (250, 400),
-    'Fig': (400, 600),
-    'Dates': (350, 550),
-    'Avocado': (350, 550),
-    'Persimmon': (200, 320),
-    
-    # Imported/Exotic Fruits (₹400-1000/kg)
-    'Blueberry': (600, 1000),
-    'Blackberry': (400, 700),
-    'Cherry': (500, 800),
-    'Rambutan': (250, 400),
-}
-
 def fix_prices():
     """Fix unrealistic prices in the database"""
     mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
     client = MongoClient(mongo_uri)
     db = client["market_analyzer"]
-    collection = db["sales"]
+    collection = get_sales_collection(db)
     
     print("\n" + "=" * 70)
     print("🔧 FIXING UNREALISTIC PRICES")
     print("=" * 70)
     
     # Find all products with unrealistic prices
-    unrealistic_products = collection.find({
+    unrealistic_products = collection.find(translate_filter(collection, {
         "$or": [
             {"price": {"$gt": 1000}},  # More than ₹1000/kg
             {"price": {"$lt": 10}}      # Less than ₹10/kg
         ]
-    })
+    }), {"_id": 1, "product": 1, "meta": 1, "price": 1})
     
     fixed_count = 0
     products_fixed = set()
+    fixed_prices = {}
+    updates = []
     
-    for record in unrealistic_products:
+    for record in decode_records(db, from_storage_documents(list(unrealistic_products))):
         product_name = record['product']
         old_price = record['price']
         
-        # Get realistic price range
-        if product_name in REALISTIC_PRICE_RANGES:
-            min_price, max_price = REALISTIC_PRICE_RANGES[product_name]
-        else:
-            # Default range for unknown products
-            category = record.get('category', 'vegetable')
-            if category == 'fruit':
-                min_price, max_price = (60, 150)
-            else:
-                min_price, max_price = (30, 80)
+        # Get realistic price range from the shared catalog
+        min_price, max_price = infer_price_range(product_name)
         
         # Calculate new realistic price (use middle of range)
         new_price = (min_price + max_price) / 2
         
-        # Update the record
-        collection.update_one(
+        # Queue the update; all corrections go out in one unordered bulk write
+        updates.append(UpdateOne(
             {"_id": record['_id']},
             {"$set": {"price": round(new_price, 2)}}
-        )
+        ))
         
+        fixed_prices[record['_id']] = round(new_price, 2)
         products_fixed.add(product_name)
         fixed_count += 1
         
         if old_price > 1000:
             print(f"   ⚠️  {product_name}: ₹{old_price:.2f} → ₹{new_price:.2f}/kg")
     
+    if updates and is_timeseries(collection):
+        # Time-series measurements cannot be $set: delete and reinsert the history
+        # of the affected products with the corrected prices instead.
+        query = translate_filter(collection, {"product": match_values(db, "product", sorted(products_fixed))})
+        history = decode_records(db, from_storage_documents(list(collection.find(query))))
+        for record in history:
+            if record['_id'] in fixed_prices:
+                record['price'] = fixed_prices[record['_id']]
+        replace_collection_with_batches(collection, history)
+    elif updates:
+        collection.bulk_write(updates, ordered=False)
+    
     print(f"\n✅ Fixed {fixed_count} records")
     print(f"📦 Products corrected: {len(products_fixed)}")
     
@@ -178,14 +89,13 @@ def fix_prices():
         print("\n🔧 Products Fixed:")
         print("-" * 70)
         for product in sorted(products_fixed):
-            if product in REALISTIC_PRICE_RANGES:
-                min_p, max_p = REALISTIC_PRICE_RANGES[product]
-                print(f"   {product}: ₹{min_p}-₹{max_p}/kg")
+            min_p, max_p = infer_price_range(product)
+            print(f"   {product}: ₹{min_p}-₹{max_p}/kg")
     
     # Add missing products with realistic prices
     print("\n📝 Checking for missing products...")
-    existing_products = collection.distinct("product")
-    missing_products = set(REALISTIC_PRICE_RANGES.keys()) - set(existing_products)
+    existing_products = decode_values(db, "product", collection.distinct(translate_field(collection, "product")))
+    missing_products = set(TRACKED_PRODUCTS) - set(existing_products)
     
     if missing_products:
         print(f"   Found {len(missing_products)} missing products")
@@ -196,8 +106,8 @@ def fix_prices():
         current_date = datetime.now()
         
         for product_name in missing_products:
-            min_price, max_price = REALISTIC_PRICE_RANGES[product_name]
-            category = 'fruit' if any(x in product_name.lower() for x in ['apple', 'mango', 'berry', 'fruit']) else 'vegetable'
+            min_price, max_price = infer_price_range(product_name)
+            category = infer_category(product_name)
             
             for days_ago in range(30):
                 date = current_date - timedelta(days=days_ago)
@@ -221,9 +131,14 @@ def fix_prices():
                 records.append(record)
         
         if records:
-            collection.insert_many(records)
+            collection.insert_many(to_storage_documents(collection, records))
             print(f"   ✅ Added {len(records)} records for missing products")
     
+    # The rewritten and added rows change those products' rollups; the stats
+    # refresh bumps write_generation so cached summaries are recomputed.
+    refresh_product_rollups(collection, products_fixed | set(missing_products))
+    refresh_collection_stats(collection)
+    
     print("\n" + "=" * 70)
     print("✅ PRICE CORRECTION COMPLETE")
     print("=" * 70)
@@ -234,7 +149,7 @@ def fix_prices():
     
     pipeline = [
         {"$group": {
-            "_id": "$product",
+            "_id": decoded_field(db, "product"),
             "avg_price": {"$avg": "$price"},
             "min_price": {"$min": "$price"},
             "max_price": {"$max": "$price"}
@@ -244,7 +159,7 @@ def fix_prices():
     ]
     
     print("\n🔝 Top 10 Most Expensive Products:")
-    for doc in collection.aggregate(pipeline):
+    for doc in collection.aggregate(translate_pipeline(collection, pipeline)):
         print(f"   {doc['_id']}: ₹{doc['avg_price']:.2f}/kg (₹{doc['min_price']:.2f}-₹{doc['max_price']:.2f})")
     
     client.close()
@@ -3,10 +3,12 @@ import joblib
 from datetime import timedelta
 from preprocessing.feature_engineering import create_features
 from preprocessing.load_data import load_sales_data
+from data_sources.weather_history import load_weather_features
 def generate_forecast(days=7):
     model = joblib.load("models/demand_model.pkl")
     feature_columns = joblib.load("models/demand_feature_columns.pkl")
     df = load_sales_data()
+    weather = load_weather_features()
     df["date"] = pd.to_datetime(df["date"])
     forecast_results = []
     last_date = df["date"].max()
@@ -19,7 +21,7 @@ def generate_forecast(days=7):
             new_row = last_row.copy()
             new_row["date"] = future_date
             temp_df = pd.concat([product_df, pd.DataFrame([new_row])])
-            temp_df = create_features(temp_df)
+            temp_df = create_features(temp_df, weather=weather)
             temp_df = temp_df.dropna()
             temp_df = pd.get_dummies(temp_df, columns=["product", "season"], drop_first=True)
             X_future = temp_df.iloc[-1].drop(["date", "demand"])
@@ -1,28 +1,30 @@
 """
 Migration script to transfer CSV data to MongoDB.
 Run this once to populate MongoDB with existing CSV data.
+
+A thin wrapper around data_sources.bulk_import, which reads the file in
+chunks, resumes after an interruption and swaps the result in atomically:
+    python -m data_sources.bulk_import data/sales_data.csv --rename demand=quantity
 """
-import pandas as pd
 from pymongo import MongoClient
 import os
 from dotenv import load_dotenv
+from data_sources.bulk_import import import_file
+from data_sources.mongodb_utils import print_write_report
+from data_sources.sales_storage import get_sales_collection
 load_dotenv()
 def migrate_csv_to_mongodb():
     """
-    Reads sales_data.csv and inserts all records into MongoDB.
+    Reads sales_data.csv and replaces the MongoDB sales history with it.
     """
     mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
     client = MongoClient(mongo_uri)
     db = client["market_analyzer"]
-    collection = db["sales"]
-    collection.delete_many({})
-    print("Cleared existing MongoDB data")
-    df = pd.read_csv("data/sales_data.csv")
-    df.rename(columns={"demand": "quantity"}, inplace=True)
-    records = df.to_dict(orient="records")
-    result = collection.insert_many(records)
-    print(f"✅ Successfully migrated {len(result.inserted_ids)} records to MongoDB")
+    collection = get_sales_collection(db)
+    report = import_file("data/sales_data.csv", collection, rename={"demand": "quantity"})
+    print(f"✅ Successfully migrated {report['rows_total']} records to MongoDB")
+    print_write_report(report["writer"])
     print(f"Database: market_analyzer")
-    print(f"Collection: sales")
+    print(f"Collection: {collection.name}")
 if __name__ == "__main__":
-    migrate_csv_to_mongodb()
\ No newline at end of file
+    migrate_csv_to_mongodb()
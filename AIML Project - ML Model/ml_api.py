@@ -1,13 +1,32 @@
-from fastapi import FastAPI, Query, BackgroundTasks, HTTPException, Header
+from fastapi import FastAPI, Query, BackgroundTasks, HTTPException, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Optional
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from typing import Annotated, Dict, List, Optional
+from pydantic import BaseModel, Field
 from pymongo import MongoClient
 import os
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 import threading
 import time
-from data_sources.mongodb_utils import sanitize_market_record
+import pandas as pd
+from data_sources.cache_utils import TTLCache
+from data_sources.mongodb_utils import (
+    SCHEMA_VERSION_FIELD,
+    get_collection_stats,
+    migrate_sanitized_schema,
+    refresh_collection_stats,
+    sanitize_stale_records,
+)
+from data_sources.rollups import ensure_rollup_indexes, rebuild_rollups, recent_product_summary, rollups_available
+from data_sources.sales_schema import decode_records, decode_values, decoded_field, match_regex, match_values
+from data_sources.sales_storage import (
+    get_sales_collection,
+    sales_indexes,
+    translate_field,
+    translate_pipeline,
+)
+from monitoring.metrics import REGISTRY, REQUEST_LATENCY, timed_job, timed_query
 load_dotenv()
 app = FastAPI(title="Market Intelligence ML API")
 app.add_middleware(
@@ -17,21 +36,49 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Record per-route latency histograms, labelled by route template."""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        REQUEST_LATENCY.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status,
+        )
 mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
 mongo_client = MongoClient(mongo_uri)
 db = mongo_client["market_analyzer"]
-collection = db["sales"]
+collection = get_sales_collection(db)
 
 # Create indexes for better query performance
 try:
-    collection.create_index([("product", 1), ("date", -1)])
-    collection.create_index([("category", 1), ("date", -1)])
-    collection.create_index([("date", -1)])
+    for keys in sales_indexes(collection):
+        collection.create_index(keys)
+    ensure_rollup_indexes(collection)
     print("✅ MongoDB indexes created successfully")
 except Exception as e:
     print(f"⚠️ Index creation warning: {e}")
 
 ADMIN_API_KEY = os.getenv("ADMIN_API_KEY", "cropintelhub_admin")
+health_details_cache = TTLCache(ttl=int(os.getenv("HEALTH_DETAILS_TTL", 300)), maxsize=1, name="health_details")
+gap_report_cache = TTLCache(ttl=int(os.getenv("GAP_REPORT_TTL", 3600)), maxsize=32, name="gap_report")
+forecast_cache = TTLCache(ttl=int(os.getenv("FORECAST_CACHE_TTL", 300)), maxsize=2048, name="product_forecast")
+MAX_FORECAST_DAYS = int(os.getenv("MAX_FORECAST_DAYS", 365))
+MAX_FORECAST_PRODUCTS = int(os.getenv("MAX_FORECAST_PRODUCTS", 250))
+
+def run_aggregation(name, pipeline, **kwargs):
+    """Run an aggregation on the sales collection and record its latency under name."""
+    with timed_query(name):
+        return list(collection.aggregate(translate_pipeline(collection, pipeline), **kwargs))
 
 def verify_admin_key(api_key: str = Header(None, alias="X-API-Key")):
     """Verify admin API key for protected endpoints"""
@@ -47,7 +94,8 @@ def auto_update_data():
             
             from data_sources.comprehensive_market_fetcher import ComprehensiveMarketFetcher
             fetcher = ComprehensiveMarketFetcher()
-            saved_count = fetcher.update_all_products(days=7)
+            with timed_job("auto_update"):
+                saved_count = fetcher.update_all_products(days=7)
             
             print(f"✅ Auto-updated {saved_count} records")
         except Exception as e:
@@ -56,12 +104,37 @@ def auto_update_data():
                 print("🔄 Falling back to alternative data source...")
                 from data_sources.alternative_fetcher import AlternativeMarketDataFetcher
                 alt_fetcher = AlternativeMarketDataFetcher()
-                alt_fetcher.update_market_data(days=7)
+                with timed_job("auto_update_fallback"):
+                    alt_fetcher.update_market_data(days=7)
             except Exception as fallback_error:
                 print(f"❌ Fallback also failed: {str(fallback_error)}")
         
         time.sleep(24 * 60 * 60)
 
+def migrate_sales_schema():
+    """Background task that brings old documents up to the current sanitized schema"""
+    try:
+        print("\n🧹 Migrating sales documents to the current sanitized schema...")
+        with timed_job("schema_migration"):
+            updated = migrate_sanitized_schema(collection, batch_size=1000, pause=0.1)
+        print(f"✅ Schema migration complete: {updated} documents updated")
+    except Exception as e:
+        print(f"❌ Schema migration error: {str(e)}")
+
+def build_missing_rollups():
+    """Background task that builds the analytics rollups of an existing collection once"""
+    try:
+        if rollups_available(collection) or not collection.find_one({}, {"_id": 1}):
+            return
+        print("\n📊 Building sales rollups...")
+        with timed_job("rollup_rebuild"):
+            rows = rebuild_rollups(collection)
+        # New write_generation: drop quality summaries and gap reports cached from the raw fallback.
+        refresh_collection_stats(collection)
+        print(f"✅ Rolled up {rows} records")
+    except Exception as e:
+        print(f"❌ Rollup build error: {str(e)}")
+
 @app.on_event("startup")
 async def startup_event():
     """Run on application startup"""
@@ -74,6 +147,11 @@ async def startup_event():
     update_thread.start()
     print("✅ Scheduler started")
     
+    migration_thread = threading.Thread(target=migrate_sales_schema, daemon=True)
+    migration_thread.start()
+    rollup_thread = threading.Thread(target=build_missing_rollups, daemon=True)
+    rollup_thread.start()
+    
     print("\n📊 Initial data population will happen in background...")
     print("💡 Use /data/populate endpoint to populate data manually")
     
@@ -88,42 +166,99 @@ def root():
         "data_source": "Real-time Market Data + MongoDB",
         "endpoints": {
             "health": "/health",
+            "health_live": "/health/live",
+            "health_ready": "/health/ready",
+            "health_details": "/health/details",
+            "metrics": "/metrics",
             "docs": "/docs",
             "products": "/products/latest"
         }
     }
 
+def _ready_payload():
+    """Readiness summary built from a ping plus the ingestion-maintained stats document."""
+    try:
+        with timed_query("ping"):
+            mongo_client.admin.command("ping")
+    except Exception as e:
+        return {
+            "status": "unavailable",
+            "timestamp": datetime.now().isoformat(),
+            "service": "ml_api",
+            "database": {"status": f"error: {str(e)}"}
+        }
+
+    with timed_query("collection_stats"):
+        stats = get_collection_stats(collection) or {}
+    latest_date = stats.get("latest_date")
+    updated_at = stats.get("updated_at")
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "service": "ml_api",
+        "database": {
+            "status": "connected",
+            "products_tracked": stats.get("products_tracked", 0),
+            "recent_records": stats.get("recent_records", 0),
+            "latest_date": latest_date.isoformat() if isinstance(latest_date, datetime) else latest_date,
+            "stats_updated_at": updated_at.isoformat() if isinstance(updated_at, datetime) else updated_at,
+            "stats_available": bool(stats)
+        },
+        "uptime": "running"
+    }
+
 @app.get("/health")
 def health_check():
-    """Health check endpoint for monitoring services"""
-    try:
-        # Check MongoDB connection
-        db_status = "connected"
-        product_count = 0
-        try:
-            product_count = len(collection.distinct("product"))
-            db_status = "connected"
-        except Exception as e:
-            db_status = f"error: {str(e)}"
-        
-        # Check if we have recent data
+    """Health check endpoint for monitoring services (no collection scans)"""
+    return _ready_payload()
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus text exposition of request, query, cache and ingestion metrics"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/health/live")
+def health_live():
+    """Liveness probe: answers without touching the database"""
+    return {
+        "status": "alive",
+        "timestamp": datetime.now().isoformat(),
+        "service": "ml_api"
+    }
+
+@app.get("/health/ready")
+def health_ready():
+    """Readiness probe: MongoDB ping plus the cached ingestion stats"""
+    payload = _ready_payload()
+    if payload["status"] != "healthy":
+        return JSONResponse(status_code=503, content=payload)
+    return payload
+
+def _compute_health_details():
+    with timed_query("health_details"):
+        product_count = len(decode_values(db, "product", collection.distinct(translate_field(collection, "product"))))
         recent_data = collection.count_documents({
             "date": {"$gte": datetime.now() - timedelta(days=7)}
         })
-        
-        health = {
-            "status": "healthy" if db_status == "connected" else "degraded",
+        total_records = collection.estimated_document_count()
+    return {
+        "products_tracked": product_count,
+        "recent_records": recent_data,
+        "total_records": total_records,
+        "computed_at": datetime.now().isoformat()
+    }
+
+@app.get("/health/details")
+def health_details():
+    """Detailed database statistics, cached for HEALTH_DETAILS_TTL seconds"""
+    try:
+        details = health_details_cache.get_or_set("details", _compute_health_details)
+        return {
+            "status": "healthy",
             "timestamp": datetime.now().isoformat(),
             "service": "ml_api",
-            "database": {
-                "status": db_status,
-                "products_tracked": product_count,
-                "recent_records": recent_data
-            },
-            "uptime": "running"
+            "database": {"status": "connected", **details}
         }
-        
-        return health
     except Exception as e:
         return {
             "status": "error",
@@ -148,9 +283,9 @@ def get_latest_products(
         # Apply filters first to reduce dataset size
         match_stage = {}
         if category:
-            match_stage["category"] = category
+            match_stage["category"] = match_values(db, "category", category)
         if search:
-            match_stage["product"] = {"$regex": search, "$options": "i"}
+            match_stage.update(match_regex(db, "product", search))
         
         if match_stage:
             pipeline.append({"$match": match_stage})
@@ -160,25 +295,26 @@ def get_latest_products(
             {"$sort": {"date": -1}},
             {
                 "$group": {
-                    "_id": "$product",
+                    "_id": decoded_field(db, "product"),
                     "product": {"$first": "$product"},
                     "category": {"$first": "$category"},
                     "price": {"$first": "$price"},
                     "quantity": {"$first": "$quantity"},
                     "stock": {"$first": "$stock"},
                     "date": {"$first": "$date"},
-                    "source": {"$first": "$source"}
+                    "source": {"$first": "$source"},
+                    SCHEMA_VERSION_FIELD: {"$first": f"${SCHEMA_VERSION_FIELD}"}
                 }
             },
             {"$limit": limit if limit else 200}  # Default limit to prevent huge responses
         ])
         
         # Execute with timeout
-        results = list(collection.aggregate(pipeline, maxTimeMS=25000))  # 25 second timeout
+        results = run_aggregation("products_latest", pipeline, maxTimeMS=25000)  # 25 second timeout
         
         products = []
-        for item in results:
-            safe_item = sanitize_market_record(item)
+        # Documents stamped at write time skip sanitizing entirely
+        for safe_item in sanitize_stale_records(decode_records(db, results)):
             products.append({
                 "product": safe_item["product"],
                 "category": safe_item.get("category", "fruit"),
@@ -193,55 +329,151 @@ def get_latest_products(
     except Exception as e:
         print(f"❌ Error in /products/latest: {str(e)}")
         return {"error": str(e), "products": []}
+def _forecast_rows_to_records(rows_by_product, horizons):
+    """
+    Turn the latest history rows of many products into forecast records in one
+    vectorized pass. rows_by_product maps product -> rows sorted newest first.
+    """
+    frames = [
+        pd.DataFrame(rows).assign(product=product)
+        for product, rows in rows_by_product.items() if rows
+    ]
+    if not frames:
+        return {}
+
+    df = pd.concat(frames, ignore_index=True)
+    df["horizon"] = df["product"].map(horizons)
+    df = df[df.groupby("product").cumcount() < df["horizon"]]
+
+    df["date"] = df["date"].map(lambda value: value.isoformat() if isinstance(value, datetime) else str(value))
+    df["predicted_price"] = pd.to_numeric(df["price"], errors="coerce").astype(float)
+    if "quantity" not in df.columns:
+        df["quantity"] = 100
+    df["predicted_demand"] = pd.to_numeric(df["quantity"], errors="coerce").fillna(100).astype(float)
+
+    columns = ["date", "predicted_price", "predicted_demand", "product"]
+    # Unparseable prices are NaN, which is not valid JSON.
+    df = df[columns].astype(object).where(df[columns].notna(), None)
+    return {
+        product: group.to_dict(orient="records")
+        for product, group in df.groupby("product", sort=False)
+    }
+
+def _load_forecasts(horizons):
+    """
+    Return {product: forecasts} for the requested horizons, serving cached
+    products from forecast_cache and fetching the newest `days` rows of the rest.
+    """
+    results = {}
+    pending = {}
+    for product, days in horizons.items():
+        cached = forecast_cache.get((product, days))
+        if cached is not None:
+            results[product] = cached
+        else:
+            pending[product] = days
+
+    if pending:
+        # One aggregation for every pending product: $topN keeps the newest rows of
+        # each product up to the longest horizon, _forecast_rows_to_records trims the rest.
+        pipeline = [
+            {"$match": {"product": match_values(db, "product", list(pending))}},
+            {"$sort": {"product": 1, "date": -1}},
+            {"$group": {
+                "_id": decoded_field(db, "product"),
+                "rows": {"$topN": {
+                    "n": max(pending.values()),
+                    "sortBy": {"date": -1},
+                    "output": {"date": "$date", "price": "$price", "quantity": "$quantity"},
+                }},
+            }},
+        ]
+        fetched = {
+            group["_id"]: group["rows"]
+            for group in run_aggregation("product_forecast", pipeline, maxTimeMS=25000)
+        }
+        computed = _forecast_rows_to_records(fetched, pending)
+        for product, days in pending.items():
+            if product in computed:
+                forecast_cache.set((product, days), computed[product])
+                results[product] = computed[product]
+
+    return results
+
 @app.get("/products/{product_name}/forecast")
-def get_product_forecast(product_name: str, days: int = 7):
+def get_product_forecast(
+    product_name: str,
+    days: int = Query(7, ge=1, le=MAX_FORECAST_DAYS, description="Number of days of history to return")
+):
     """
     Fast endpoint to get forecast for a specific product.
     Only processes one product at a time.
     """
     try:
-        historical = list(collection.find(
-            {"product": product_name}
-        ).sort("date", -1).limit(30))
-        if not historical:
+        forecasts = _load_forecasts({product_name: days}).get(product_name)
+        if not forecasts:
             return {"error": "Product not found", "forecasts": []}
-        price_pipeline = [
-            {"$match": {"product": product_name}},
-            {"$sort": {"date": -1}},
-            {"$limit": days}
-        ]
-        price_data = list(collection.aggregate(price_pipeline))
-        forecasts = []
-        for item in price_data:
-            forecasts.append({
-                "date": item["date"].isoformat() if isinstance(item["date"], datetime) else str(item["date"]),
-                "predicted_price": float(item["price"]),
-                "predicted_demand": float(item.get("quantity", 100)),
-                "product": product_name
-            })
         return forecasts
     except Exception as e:
         return {"error": str(e), "forecasts": []}
+
+class ForecastBatchRequest(BaseModel):
+    products: List[str] = Field(..., max_length=MAX_FORECAST_PRODUCTS)
+    days: int = Field(7, ge=1, le=MAX_FORECAST_DAYS)
+    horizons: Optional[Dict[str, Annotated[int, Field(ge=1, le=MAX_FORECAST_DAYS)]]] = Field(
+        None, max_length=MAX_FORECAST_PRODUCTS
+    )
+
+@app.post("/products/forecast:batch")
+def get_product_forecasts_batch(request: ForecastBatchRequest):
+    """
+    Forecasts for many products in one call.
+    Uses `days` for every product unless overridden in `horizons`.
+    """
+    try:
+        horizons = {product: request.days for product in request.products}
+        horizons.update(request.horizons or {})
+        forecasts = _load_forecasts(horizons)
+        return {
+            "forecasts": forecasts,
+            "missing": [product for product in horizons if product not in forecasts]
+        }
+    except Exception as e:
+        return {"error": str(e), "forecasts": {}, "missing": []}
+def _product_summary(name, days, raw_limit):
+    """
+    Per-product average price, quantity and stock over the last `days` days,
+    read from the daily rollups. Falls back to grouping the newest raw_limit
+    rows when no rollups have been built yet.
+    """
+    with timed_query(f"{name}_rollup"):
+        summary = recent_product_summary(collection, days)
+    if summary:
+        return summary
+
+    pipeline = [
+        {"$sort": {"date": -1}},
+        {"$limit": raw_limit},
+        {
+            "$group": {
+                "_id": decoded_field(db, "product"),
+                "product": {"$first": "$product"},
+                "avg_price": {"$avg": "$price"},
+                "avg_quantity": {"$avg": "$quantity"},
+                "avg_stock": {"$avg": "$stock"},
+                "category": {"$first": "$category"}
+            }
+        }
+    ]
+    return decode_records(db, run_aggregation(name, pipeline))
+
 @app.get("/forecast/demand")
 def demand(days: int = 7):
     """
     Get demand forecast using simple moving average from historical data.
     """
     try:
-        pipeline = [
-            {"$sort": {"date": -1}},
-            {"$limit": days * 50},
-            {
-                "$group": {
-                    "_id": "$product",
-                    "product": {"$first": "$product"},
-                    "avg_quantity": {"$avg": "$quantity"},
-                    "category": {"$first": "$category"}
-                }
-            }
-        ]
-        
-        results = list(collection.aggregate(pipeline))
+        results = _product_summary("forecast_demand", days, days * 50)
         
         forecast_data = []
         for item in results[:20]:
@@ -262,20 +494,7 @@ def price(days: int = 7):
     Get price forecast using simple moving average from historical data.
     """
     try:
-        pipeline = [
-            {"$sort": {"date": -1}},
-            {"$limit": days * 50},
-            {
-                "$group": {
-                    "_id": "$product",
-                    "product": {"$first": "$product"},
-                    "avg_price": {"$avg": "$price"},
-                    "category": {"$first": "$category"}
-                }
-            }
-        ]
-        
-        results = list(collection.aggregate(pipeline))
+        results = _product_summary("forecast_price", days, days * 50)
         
         forecast_data = []
         for item in results[:20]:
@@ -296,21 +515,7 @@ def stock(days: int = 7):
     Get stock optimization recommendations based on average demand.
     """
     try:
-        pipeline = [
-            {"$sort": {"date": -1}},
-            {"$limit": days * 50},
-            {
-                "$group": {
-                    "_id": "$product",
-                    "product": {"$first": "$product"},
-                    "avg_quantity": {"$avg": "$quantity"},
-                    "avg_stock": {"$avg": "$stock"},
-                    "category": {"$first": "$category"}
-                }
-            }
-        ]
-        
-        results = list(collection.aggregate(pipeline))
+        results = _product_summary("analysis_stock", days, days * 50)
         
         stock_data = []
         for item in results[:20]:
@@ -332,21 +537,7 @@ def elasticity():
     Get price elasticity analysis based on price-quantity correlation.
     """
     try:
-        pipeline = [
-            {"$sort": {"date": -1}},
-            {"$limit": 1000},
-            {
-                "$group": {
-                    "_id": "$product",
-                    "product": {"$first": "$product"},
-                    "avg_price": {"$avg": "$price"},
-                    "avg_quantity": {"$avg": "$quantity"},
-                    "category": {"$first": "$category"}
-                }
-            }
-        ]
-        
-        results = list(collection.aggregate(pipeline))
+        results = _product_summary("analysis_elasticity", 7, 1000)
         
         elasticity_data = []
         for item in results[:20]:
@@ -373,8 +564,9 @@ def update_market_data(api_key: str = Header(None, alias="X-API-Key")):
     try:
         from data_sources.api_fetcher import MarketDataFetcher
         fetcher = MarketDataFetcher()
-        records = fetcher.fetch_all_products()
-        saved_count = fetcher.save_to_mongodb(records)
+        with timed_job("manual_update"):
+            records = fetcher.fetch_all_products()
+            saved_count = fetcher.save_to_mongodb(records)
         return {
             "status": "success",
             "message": f"Updated {saved_count} records from real-time sources",
@@ -399,7 +591,8 @@ def populate_sample_data(api_key: str = Header(None, alias="X-API-Key")):
         from data_sources.comprehensive_market_fetcher import ComprehensiveMarketFetcher
         
         fetcher = ComprehensiveMarketFetcher()
-        saved_count = fetcher.update_all_products(days=30)
+        with timed_job("populate"):
+            saved_count = fetcher.update_all_products(days=30)
         
         product_count = len(fetcher.products_180)
         
@@ -416,6 +609,38 @@ def populate_sample_data(api_key: str = Header(None, alias="X-API-Key")):
             "status": "error",
             "message": str(e)
         }
+@app.get("/data/export")
+def export_history(
+    format: str = Query("parquet", pattern="^(parquet|arrow)$", description="parquet or arrow (Arrow IPC stream)"),
+    product: Optional[List[str]] = Query(None, description="Only these products (repeat the parameter for several)"),
+    source: Optional[List[str]] = Query(None, description="Only these sources, e.g. agmarknet"),
+    start: Optional[str] = Query(None, description="First date, YYYY-MM-DD"),
+    end: Optional[str] = Query(None, description="Last date (inclusive), YYYY-MM-DD"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns (default: all)"),
+    api_key: str = Header(None, alias="X-API-Key")
+):
+    """
+    Stream the sales history as Parquet or Arrow IPC.
+    Built from a projected cursor in bounded chunks, so exports of any size are safe.
+    Requires API key in X-API-Key header.
+    """
+    verify_admin_key(api_key)
+    from data_sources.exporter import EXPORT_FORMATS, export_filter, export_schema, iter_export_bytes, parse_date
+    try:
+        start_date, end_date = parse_date(start), parse_date(end)
+        columns = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+        export_schema(columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    query = export_filter(collection, products=product, start=start_date, end=end_date, sources=source)
+    filename = f"sales_export_{datetime.now():%Y%m%d_%H%M%S}.{EXPORT_FORMATS[format]['extension']}"
+    return StreamingResponse(
+        iter_export_bytes(collection, format, query, columns),
+        media_type=EXPORT_FORMATS[format]["media_type"],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
 @app.get("/data/sources")
 def get_data_sources():
     """
@@ -452,6 +677,30 @@ def get_data_sources():
             }
         ]
     }
+@app.get("/data/gaps")
+def data_gaps(
+    days: int = Query(90, ge=1, le=3660, description="Days of history to check, ending today"),
+    stale_days: int = Query(2, ge=0, description="Days without data before a product is stale"),
+    source: str = Query("auto", pattern="^(auto|raw|rollups)$", description="Bitmap source"),
+    limit: int = Query(50, ge=1, le=1000, description="Entries per list")
+):
+    """
+    Missing days, stale products and duplicate rows across the tracked catalog.
+    Cached until the next ingestion write.
+    """
+    try:
+        from data_sources.gap_detector import detect_gaps
+        stats = get_collection_stats(collection) or {}
+        key = (stats.get("write_generation"), datetime.now().date(), days, stale_days, source, limit)
+        with timed_query("data_gaps"):
+            return gap_report_cache.get_or_set(
+                key, lambda: detect_gaps(collection, days=days, stale_days=stale_days, source=source, limit=limit)
+            )
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": str(e)
+        }
 @app.get("/data/quality")
 def check_data_quality():
     """
@@ -459,13 +708,7 @@ def check_data_quality():
     """
     try:
         from data_sources.data_quality_checker import DataQualityChecker
-        checker = DataQualityChecker()
-        return {
-            "freshness": checker.check_data_freshness(),
-            "completeness": checker.check_data_completeness(),
-            "sources": checker.check_data_sources(),
-            "statistics": checker.get_statistics()
-        }
+        return DataQualityChecker().report()
     except Exception as e:
         return {
             "status": "error",
@@ -1,5 +1,11 @@
 import pandas as pd
-def create_features(df):
+from data_sources.weather_history import attach_weather_features
+def create_features(df, weather=None):
+    """
+    Calendar, season and demand lag features. Pass weather (from
+    data_sources.weather_history.load_weather_features) to also attach the
+    lagged and rolling weather features of each row's region.
+    """
     df["date"] = pd.to_datetime(df["date"])
     df["year"] = df["date"].dt.year
     df["month"] = df["date"].dt.month
@@ -18,4 +24,6 @@ def create_features(df):
     df["lag_1"] = df.groupby("product")["demand"].shift(1)
     df["lag_7"] = df.groupby("product")["demand"].shift(7)
     df["rolling_mean_7"] = df.groupby("product")["demand"].transform(lambda x: x.rolling(7).mean())
+    if weather is not None:
+        df = attach_weather_features(df, weather)
     return df
\ No newline at end of file
@@ -2,6 +2,8 @@ from pymongo import MongoClient
 import pandas as pd
 import os
 from dotenv import load_dotenv
+from data_sources.sales_schema import decode_frame
+from data_sources.sales_storage import from_storage_documents, get_sales_collection
 load_dotenv()
 def load_sales_data():
     """
@@ -11,11 +13,12 @@ def load_sales_data():
     mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
     client = MongoClient(mongo_uri)
     db = client["market_analyzer"]
-    collection = db["sales"]
-    data = list(collection.find())
+    collection = get_sales_collection(db)
+    data = from_storage_documents(list(collection.find()))
     if not data:
         return pd.DataFrame()
     df = pd.DataFrame(data)
+    decode_frame(db, df)
     if "_id" in df.columns:
         df.drop(columns=["_id"], inplace=True)
     if "quantity" in df.columns:
@@ -4,11 +4,13 @@ from datetime import timedelta
 from preprocessing.feature_engineering import create_features
 from forecasting.forecast_generator import generate_forecast
 from preprocessing.load_data import load_sales_data
+from data_sources.weather_history import load_weather_features
 def generate_price_forecast(days=7):
     price_model = joblib.load("models/price_model.pkl")
     feature_columns = joblib.load("models/price_feature_columns.pkl")
     demand_forecast = generate_forecast(days)
     df = load_sales_data()
+    weather = load_weather_features()
     df["date"] = pd.to_datetime(df["date"])
     results = []
     for _, row in demand_forecast.iterrows():
@@ -22,7 +24,7 @@ def generate_price_forecast(days=7):
         new_row["date"] = future_date
         new_row["demand"] = predicted_demand
         temp_df = pd.concat([product_df, pd.DataFrame([new_row])])
-        temp_df = create_features(temp_df)
+        temp_df = create_features(temp_df, weather=weather)
         temp_df = temp_df.dropna()
         temp_df = pd.get_dummies(temp_df, columns=["product", "season"], drop_first=True)
         X_future = temp_df.iloc[-1].drop(["date", "price"])
@@ -4,9 +4,10 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error
 from preprocessing.feature_engineering import create_features
 from preprocessing.load_data import load_sales_data
+from data_sources.weather_history import load_weather_features
 def train_price_model():
     df = load_sales_data()
-    df = create_features(df)
+    df = create_features(df, weather=load_weather_features())
     df = df.dropna()
     df = pd.get_dummies(df, columns=["product", "season"], drop_first=True)
     df = df.sort_values("date")
@@ -8,62 +8,23 @@ import os
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 import random
+from data_sources.mongodb_utils import print_write_report, rebuild_collection
+from data_sources.price_catalog import infer_category, infer_price_range
+from data_sources.sales_storage import get_sales_collection, translate_field
 
 load_dotenv()
 
-# Realistic products with proper price ranges (₹/kg)
-PRODUCTS_WITH_PRICES = {
-    # Vegetables (₹20-150/kg)
-    'Tomato': (30, 80),
-    'Potato': (25, 45),
-    'Onion': (25, 60),
-    'Red Onion': (25, 60),
-    'Carrot': (40, 75),
-    'Cabbage': (25, 50),
-    'Cauliflower': (40, 80),
-    'Brinjal': (40, 75),
-    'Capsicum': (80, 150),
-    'Green Chilli': (50, 120),
-    'Cucumber': (30, 60),
-    'Radish': (30, 60),
-    'Beetroot': (45, 80),
-    'Pumpkin': (25, 50),
-    'Spinach': (25, 50),
-    'Lady Finger': (45, 90),
-    'Bottle Gourd': (30, 60),
-    'Ridge Gourd': (40, 70),
-    'Bitter Gourd': (45, 80),
-    'French Beans': (60, 110),
-    'Green Peas': (60, 120),
-    'Garlic': (100, 180),
-    'Ginger': (80, 150),
-    'Coriander Leaves': (40, 80),
-    'Mint Leaves': (50, 100),
-    
-    # Fruits (₹30-500/kg)
-    'Apple': (140, 220),
-    'Banana': (50, 80),
-    'Mango': (80, 180),
-    'Orange': (60, 100),
-    'Papaya': (40, 70),
-    'Pineapple': (50, 90),
-    'Guava': (50, 80),
-    'Watermelon': (25, 50),
-    'Muskmelon': (40, 70),
-    'Pomegranate': (150, 280),
-    'Grapes': (80, 160),
-    'Sapota': (50, 90),
-    'Custard Apple': (80, 140),
-    'Jackfruit': (40, 80),
-    'Lychee': (150, 250),
-    'Strawberry': (300, 500),
-    'Pear': (120, 200),
-    'Peach': (150, 250),
-    'Kiwi': (250, 400),
-    'Dragon Fruit': (200, 350),
-    'Coconut': (40, 70),
-    'Sweet Lime': (50, 90),
-}
+# Common products for a quick populate; price ranges come from the shared catalog (₹/kg)
+QUICK_PRODUCTS = [
+    'Tomato', 'Potato', 'Onion', 'Red Onion', 'Carrot', 'Cabbage', 'Cauliflower',
+    'Brinjal', 'Capsicum', 'Green Chilli', 'Cucumber', 'Radish', 'Beetroot', 'Pumpkin',
+    'Spinach', 'Lady Finger', 'Bottle Gourd', 'Ridge Gourd', 'Bitter Gourd', 'French Beans',
+    'Green Peas', 'Garlic', 'Ginger', 'Coriander Leaves', 'Mint Leaves',
+    'Apple', 'Banana', 'Mango', 'Orange', 'Papaya', 'Pineapple', 'Guava', 'Watermelon',
+    'Muskmelon', 'Pomegranate', 'Grapes', 'Sapota', 'Custard Apple', 'Jackfruit', 'Lychee',
+    'Strawberry', 'Pear', 'Peach', 'Kiwi', 'Dragon Fruit', 'Coconut', 'Sweet Lime',
+]
+PRODUCTS_WITH_PRICES = {product: infer_price_range(product) for product in QUICK_PRODUCTS}
 
 def create_sample_data():
     """Create realistic market data for 50 products"""
@@ -74,12 +35,7 @@ def create_sample_data():
         current_date = start_date + timedelta(days=day)
         
         for product, (min_price, max_price) in PRODUCTS_WITH_PRICES.items():
-            # Determine category
-            category = 'fruit' if product in ['Apple', 'Banana', 'Mango', 'Orange', 'Papaya', 
-                                               'Pineapple', 'Guava', 'Watermelon', 'Muskmelon',
-                                               'Pomegranate', 'Grapes', 'Sapota', 'Custard Apple',
-                                               'Jackfruit', 'Lychee', 'Strawberry', 'Pear', 'Peach',
-                                               'Kiwi', 'Dragon Fruit', 'Coconut', 'Sweet Lime'] else 'vegetable'
+            category = infer_category(product)
             
             # Generate realistic price with daily variation
             base_price = (min_price + max_price) / 2
@@ -118,26 +74,21 @@ def main():
         print("\n🔄 Connecting to MongoDB...")
         client = MongoClient(mongo_uri, serverSelectionTimeoutMS=10000)
         db = client["market_analyzer"]
-        collection = db["sales"]
+        collection = get_sales_collection(db)
         print("✅ Connected successfully")
         
-        print("\n🗑️  Clearing existing data...")
-        collection.delete_many({})
-        print("✅ Cleared")
-        
         print("\n📊 Creating realistic market data...")
         records = create_sample_data()
         print(f"✅ Created {len(records)} records")
         print(f"   Products: {len(PRODUCTS_WITH_PRICES)}")
         print(f"   Days of history: 30")
         
-        print("\n💾 Inserting into MongoDB...")
-        result = collection.insert_many(records)
-        print(f"✅ Inserted {len(result.inserted_ids)} records")
+        print("\n💾 Loading into a shadow collection and swapping it in...")
+        print_write_report(rebuild_collection(collection, records))
         
         print("\n📈 Verification:")
         count = collection.count_documents({})
-        products = collection.distinct("product")
+        products = collection.distinct(translate_field(collection, "product"))
         
         # Calculate average price
         pipeline = [
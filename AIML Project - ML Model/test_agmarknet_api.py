@@ -2,6 +2,7 @@
 Test script to verify Agmarknet API key and endpoint.
 """
 import requests
+from data_sources import http_cache
 import os
 from dotenv import load_dotenv
 
@@ -39,7 +40,7 @@ def test_agmarknet_api():
         }
         
         try:
-            response = requests.get(url, params=params, headers=headers, timeout=15)
+            response = http_cache.get(url, params=params, headers=headers, timeout=15)
             
             print(f"Status Code: {response.status_code}")
             
@@ -83,7 +84,7 @@ def test_agmarknet_api():
     alt_url = "https://api.data.gov.in/catalog/9ef84268-d588-465a-a308-a864a43d0070"
     
     try:
-        response = requests.get(alt_url, params={"api-key": api_key, "format": "json"}, 
+        response = http_cache.get(alt_url, params={"api-key": api_key, "format": "json"}, 
                               headers=headers, timeout=15)
         print(f"Status Code: {response.status_code}")
         
@@ -1,7 +1,7 @@
 """
 Test OpenWeather API key
 """
-import requests
+from data_sources import http_cache
 import os
 from dotenv import load_dotenv
 
@@ -24,7 +24,7 @@ params = {
 }
 
 try:
-    response = requests.get(url, params=params, timeout=10)
+    response = http_cache.get(url, params=params, timeout=10)
     
     print(f"Status Code: {response.status_code}")
     print()
@@ -2,18 +2,24 @@
 from pymongo import MongoClient
 import os
 from dotenv import load_dotenv
+from data_sources.sales_schema import decode_values, match_values
+from data_sources.sales_storage import get_sales_collection, translate_field, translate_filter
 load_dotenv()
 client = MongoClient(os.getenv('MONGO_URI'))
 db = client['market_analyzer']
+collection = get_sales_collection(db)
 print("\n" + "=" * 70)
 print("📊 DATABASE VERIFICATION")
 print("=" * 70)
-products = db.sales.distinct('product')
+product_field = translate_field(collection, 'product')
+products = decode_values(db, 'product', collection.distinct(product_field))
 print(f"\n✅ Total Products: {len(products)}")
-total_records = db.sales.count_documents({})
+total_records = collection.count_documents({})
 print(f"✅ Total Records: {total_records}")
-fruits = db.sales.distinct('product', {'category': 'fruit'})
-vegetables = db.sales.distinct('product', {'category': 'vegetable'})
+fruits = decode_values(db, 'product', collection.distinct(
+    product_field, translate_filter(collection, {'category': match_values(db, 'category', 'fruit')})))
+vegetables = decode_values(db, 'product', collection.distinct(
+    product_field, translate_filter(collection, {'category': match_values(db, 'category', 'vegetable')})))
 print(f"\n🍎 Fruits: {len(fruits)}")
 print(f"🥬 Vegetables: {len(vegetables)}")
 print("\n💰 Sample Prices (Latest):")
@@ -21,10 +27,11 @@ print("-" * 70)
 sample_products = ['Apple', 'Banana', 'Mango', 'Tomato', 'Potato', 'Onion', 
                    'Mushroom', 'Avocado', 'Strawberry', 'Broccoli']
 for product in sample_products:
-    latest = db.sales.find_one({'product': product}, sort=[('date', -1)])
+    latest = collection.find_one(
+        translate_filter(collection, {'product': match_values(db, 'product', product)}), sort=[('date', -1)])
     if latest:
         print(f"   {product}: ₹{latest['price']:.2f}/kg")
 print("\n" + "=" * 70)
 print("✅ VERIFICATION COMPLETE")
 print("=" * 70)
-client.close()
\ No newline at end of file
+client.close()
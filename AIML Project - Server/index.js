@@ -411,6 +411,22 @@ app.get("/api/products/:productName/forecast", async (req, res) => {
     res.status(500).json({ error: "Failed to fetch forecast", message: error.message });
   }
 });
+app.post("/api/products/forecast/batch", async (req, res) => {
+  try {
+    const { products = [], days = 7, horizons } = req.body || {};
+    const response = await axios.post(`${ML_API}/products/forecast:batch`, {
+      products,
+      days,
+      horizons,
+    }, {
+      timeout: 15000,
+    });
+    res.json(response.data);
+  } catch (error) {
+    console.error("Batch Forecast Error:", error.message);
+    res.status(500).json({ error: "Failed to fetch forecasts", message: error.message });
+  }
+});
 app.get("/api/demand", async (req, res) => {
   try {
     const days = req.query.days || 7;
@@ -10,7 +10,7 @@ import sys
 
 # ⚠️ IMPORTANT: Replace these with your actual Render URLs
 BACKEND_URL = "https://your-backend.onrender.com/health"
-ML_API_URL = "https://your-ml-api.onrender.com/health"
+ML_API_URL = "https://your-ml-api.onrender.com/health/live"
 
 # Configuration
 PING_INTERVAL = 300  # 5 minutes (in seconds)
@@ -58,7 +58,7 @@ def validate_urls():
         print(f"  ML_API_URL = '{ML_API_URL}'")
         print("\nWith your actual Render URLs:")
         print("  BACKEND_URL = 'https://cropintelhub-backend.onrender.com/health'")
-        print("  ML_API_URL = 'https://cropintelhub-ml.onrender.com/health'")
+        print("  ML_API_URL = 'https://cropintelhub-ml.onrender.com/health/live'")
         print("\n" + "=" * 70 + "\n")
         sys.exit(1)
 